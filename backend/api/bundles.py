@@ -0,0 +1,186 @@
+"""
+Precompressed, content-addressed question bank bundles
+
+The whole bank and each subject are published as immutable JSON arrays named
+after the hash of their content, so clients can cache them forever and only
+download again when the manifest points at a new hash. Bundles are
+compressed once when they are built (gzip, plus brotli when the optional
+`brotli` package is installed) and served as-is. A bundle that drops out of
+the manifest is kept for QUESTION_BUNDLE_GRACE_SECONDS before its files are
+removed, so clients still holding the previous manifest do not get 404s.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .snapshot import get_question_snapshot
+from .versions import question_version
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+BUNDLE_URL_PREFIX = '/bundles/questions/'
+# Hash -> time it left the manifest; dot-prefixed like the temp files so it is never served or pruned
+RETIRED_FILE = '.retired.json'
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {'version': None, 'manifest': None}
+
+
+def bundle_dir():
+    return str(settings.QUESTION_BUNDLE_DIR)
+
+
+def available_encodings():
+    return ['br', 'gz'] if brotli is not None else ['gz']
+
+
+def bundle_file(bundle_hash, encoding):
+    return os.path.join(bundle_dir(), f'{bundle_hash}.json.{encoding}')
+
+
+def _write_bundle(content):
+    """Compress and store one bundle, returning its descriptor"""
+    bundle_hash = hashlib.sha256(content).hexdigest()[:20]
+    os.makedirs(bundle_dir(), exist_ok=True)
+    sizes = {}
+    for encoding in available_encodings():
+        path = bundle_file(bundle_hash, encoding)
+        if not os.path.exists(path):
+            if encoding == 'br':
+                compressed = brotli.compress(content, quality=11)
+            else:
+                compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            fd, tmp_path = tempfile.mkstemp(dir=bundle_dir(), prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        sizes[encoding] = os.path.getsize(path)
+    return {
+        'hash': bundle_hash,
+        'path': f'{BUNDLE_URL_PREFIX}{bundle_hash}.json.gz',
+        'bytes': sizes,
+    }
+
+
+def _bank_documents():
+    """Return (bank key, question IDs in list order, subject index, render function)"""
+    snapshot = get_question_snapshot()
+    if snapshot is not None:
+        return snapshot.version, snapshot.order, snapshot.subjects, snapshot.render
+
+    from .models import Question
+    from .serializers import QuestionSerializer
+
+    questions = list(Question.objects.order_by('subject', 'topic', 'question_id'))
+    documents = {
+        question.question_id: json.dumps(QuestionSerializer(question).data, separators=(',', ':')).encode('utf-8')
+        for question in questions
+    }
+    order = [question.question_id for question in questions]
+    subjects = {}
+    for position, question in enumerate(questions):
+        subjects.setdefault(question.subject, []).append(position)
+    key = hashlib.sha1(b''.join(documents[question_id] for question_id in order)).hexdigest()[:16]
+
+    def render(question_ids):
+        return b'[' + b','.join(documents[question_id] for question_id in question_ids) + b']'
+
+    return key, order, subjects, render
+
+
+def get_bundle_manifest():
+    """Current manifest of bank and per-subject bundles, building any missing bundle"""
+    # The bank is only serialized again when the question version moved;
+    # read the token first so the manifest is never newer than its cache key
+    version = question_version()
+    with _manifest_lock:
+        manifest = _manifest_cache['manifest']
+        if (manifest is not None and _manifest_cache['version'] == version
+                and os.path.exists(bundle_file(manifest['bank']['hash'], 'gz'))):
+            return manifest
+
+    key, order, subjects, render = _bank_documents()
+    bank = _write_bundle(render(order))
+    bank['count'] = len(order)
+    subject_bundles = {}
+    for subject, positions in subjects.items():
+        descriptor = _write_bundle(render([order[pos] for pos in positions]))
+        descriptor['count'] = len(positions)
+        subject_bundles[subject] = descriptor
+
+    manifest = {
+        'version': key,
+        'encodings': available_encodings(),
+        'bank': bank,
+        'subjects': subject_bundles,
+    }
+    with _manifest_lock:
+        _manifest_cache['version'] = version
+        _manifest_cache['manifest'] = manifest
+    prune_bundles(manifest)
+    return manifest
+
+
+def _read_retired():
+    try:
+        with open(os.path.join(bundle_dir(), RETIRED_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_retired(retired):
+    fd, tmp_path = tempfile.mkstemp(dir=bundle_dir(), prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(retired, f)
+    os.replace(tmp_path, os.path.join(bundle_dir(), RETIRED_FILE))
+
+
+def prune_bundles(manifest, now=None):
+    """Remove bundle files the manifest has not referenced for QUESTION_BUNDLE_GRACE_SECONDS"""
+    now = time.time() if now is None else now
+    keep = {manifest['bank']['hash']}
+    keep.update(descriptor['hash'] for descriptor in manifest['subjects'].values())
+    files = {}
+    for name in os.listdir(bundle_dir()):
+        if not name.startswith('.'):
+            files.setdefault(name.split('.', 1)[0], []).append(name)
+
+    retired = _read_retired()
+    # Unreferenced hashes keep the time they were first seen unreferenced; one back in the manifest is forgotten
+    pruned = {
+        bundle_hash: retired.get(bundle_hash, now)
+        for bundle_hash in files if bundle_hash not in keep
+    }
+    for bundle_hash, retired_at in list(pruned.items()):
+        if now - retired_at < settings.QUESTION_BUNDLE_GRACE_SECONDS:
+            continue
+        for name in files[bundle_hash]:
+            try:
+                os.unlink(os.path.join(bundle_dir(), name))
+            except FileNotFoundError:
+                pass
+        del pruned[bundle_hash]
+    if pruned != retired:
+        _write_retired(pruned)
+
+
+def read_bundle(bundle_hash, encoding):
+    """Compressed bundle bytes, or None if no such bundle exists"""
+    if encoding not in available_encodings() or not bundle_hash.isalnum():
+        return None
+    try:
+        with open(bundle_file(bundle_hash, encoding), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,77 @@
+"""
+Exam membership queries
+
+Exam.question_ids stays the source of truth for exam order; ExamQuestion
+mirrors it so subject breakdowns, subject practice and "which exams contain
+this question" are indexed JOINs instead of scans over every JSON list.
+Every Exam save (API, admin, migration script) resyncs it once the save
+commits, from the post_save handler in signals.py.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from .models import Attempt, Exam, ExamQuestion
+from .question_cache import unique_ids
+
+
+def sync_exam_questions(exam):
+    """Rewrite an exam's ExamQuestion rows from its question_ids"""
+    question_ids = unique_ids(exam.question_ids or [])
+    with transaction.atomic():
+        ExamQuestion.objects.filter(exam_id=exam.exam_id).delete()
+        ExamQuestion.objects.bulk_create([
+            ExamQuestion(exam_id=exam.exam_id, question_id=question_id, position=position)
+            for position, question_id in enumerate(question_ids)
+        ], batch_size=500)
+
+
+def resync_exam_questions(exam_id):
+    """Rewrite an exam's ExamQuestion rows from its committed question_ids (no-op once it is deleted)"""
+    exam = Exam.objects.filter(exam_id=exam_id).only('exam_id', 'question_ids').first()
+    if exam is not None:
+        sync_exam_questions(exam)
+
+
+def exam_summaries(exams):
+    """
+    Per-subject question counts for several exams with one grouped query
+
+    Returns:
+        dict: examId -> {totalQuestions, subjects, missingCount}
+    """
+    totals = {exam.exam_id: len(unique_ids(exam.question_ids or [])) for exam in exams}
+    subjects = defaultdict(dict)
+    rows = (ExamQuestion.objects.filter(exam_id__in=list(totals))
+            .values('exam_id', 'question__subject')
+            .annotate(count=Count('id'))
+            .order_by('exam_id', 'question__subject'))
+    for row in rows:
+        subjects[row['exam_id']][row['question__subject']] = row['count']
+    return {
+        exam_id: {
+            'totalQuestions': total,
+            'subjects': subjects[exam_id],
+            'missingCount': total - sum(subjects[exam_id].values()),
+        }
+        for exam_id, total in totals.items()
+    }
+
+
+def exam_question_ids(exam_id, subject=None, topic=None, seen=None):
+    """
+    An exam's question IDs in exam order, optionally limited to a subject/topic
+
+    Args:
+        seen: True for answered questions only, False for never-answered ones
+    """
+    memberships = ExamQuestion.objects.filter(exam_id=exam_id)
+    if subject:
+        memberships = memberships.filter(question__subject=subject)
+    if topic:
+        memberships = memberships.filter(question__topic=topic)
+    if seen is not None:
+        answered = Exists(Attempt.objects.filter(question_id=OuterRef('question_id')))
+        memberships = memberships.filter(answered if seen else ~answered)
+    return list(memberships.order_by('position').values_list('question_id', flat=True))
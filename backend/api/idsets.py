@@ -0,0 +1,186 @@
+"""
+Compact encodings for question ID lists
+
+Question IDs (q_<16 hex>) are mapped to ordinals, i.e. their position in the
+question bank sorted by ID. The ordinal dictionary is served once from
+/api/questions/dictionary/ and ID lists are then sent as base64 payloads:
+
+- delta-varint:        sorted ordinals, gaps encoded as LEB128 varints (sets)
+- zigzag-delta-varint: ordinals in original order, signed gaps (ordered lists)
+- bitmap:              one bit per ordinal, used when a set is dense enough
+
+Clients opt in with `Accept: application/json; idset=compact` or `?idset=compact`.
+Lists containing IDs that are not in the dictionary are sent as plain JSON.
+"""
+import base64
+import hashlib
+import threading
+
+from .models import Question
+from .versions import question_version
+
+COMPACT_IDSET = 'compact'
+
+_dictionary_lock = threading.Lock()
+_dictionary_cache = {'version': None, 'dictionary': None}
+
+
+class QuestionDictionary:
+    """Sorted question IDs with a reverse lookup from ID to ordinal"""
+
+    def __init__(self, question_ids):
+        self.question_ids = list(question_ids)
+        self.ordinals = {question_id: idx for idx, question_id in enumerate(self.question_ids)}
+        digest = hashlib.sha1('\n'.join(self.question_ids).encode('utf-8')).hexdigest()
+        self.version = digest[:16]
+
+    def to_ordinals(self, question_ids):
+        """Map IDs to ordinals, or return None if any ID is unknown"""
+        ordinals = []
+        for question_id in question_ids:
+            ordinal = self.ordinals.get(question_id)
+            if ordinal is None:
+                return None
+            ordinals.append(ordinal)
+        return ordinals
+
+
+def get_question_dictionary():
+    """Return the current ordinal dictionary, rebuilding it only when the question version moves"""
+    # Read the token first: IDs loaded after it are at least as new as the version they are cached under
+    version = question_version()
+    with _dictionary_lock:
+        if _dictionary_cache['version'] == version:
+            return _dictionary_cache['dictionary']
+    question_ids = Question.objects.order_by('question_id').values_list('question_id', flat=True)
+    dictionary = QuestionDictionary(question_ids)
+    with _dictionary_lock:
+        _dictionary_cache['version'] = version
+        _dictionary_cache['dictionary'] = dictionary
+    return dictionary
+
+
+def wants_compact_ids(request):
+    """Check whether the client negotiated compact ID sets"""
+    if request is None:
+        return False
+    if request.query_params.get('idset') == COMPACT_IDSET:
+        return True
+    accept = request.META.get('HTTP_ACCEPT', '')
+    return f'idset={COMPACT_IDSET}' in accept.replace(' ', '')
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data):
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = 0
+            shift = 0
+    return values
+
+
+def encode_delta_varint(ordinals, ordered=False):
+    """Encode ordinals as varint gaps; ordered lists keep their order via zigzag gaps"""
+    out = bytearray()
+    previous = 0
+    for ordinal in ordinals if ordered else sorted(ordinals):
+        delta = ordinal - previous
+        if ordered:
+            delta = (delta << 1) ^ (delta >> 63)
+        _write_varint(out, delta)
+        previous = ordinal
+    return bytes(out)
+
+
+def decode_delta_varint(data, ordered=False):
+    ordinals = []
+    previous = 0
+    for delta in _read_varints(data):
+        if ordered:
+            delta = (delta >> 1) ^ -(delta & 1)
+        previous += delta
+        ordinals.append(previous)
+    return ordinals
+
+
+def encode_bitmap(ordinals):
+    """Encode a set of ordinals as a little-endian bitmap"""
+    if not ordinals:
+        return b''
+    bitmap = bytearray(max(ordinals) // 8 + 1)
+    for ordinal in ordinals:
+        bitmap[ordinal >> 3] |= 1 << (ordinal & 7)
+    return bytes(bitmap)
+
+
+def decode_bitmap(data):
+    return [
+        (idx << 3) + bit
+        for idx, byte in enumerate(data) if byte
+        for bit in range(8) if byte & (1 << bit)
+    ]
+
+
+def encode_id_list(question_ids, ordered=False, dictionary=None):
+    """
+    Encode a list of question IDs against the ordinal dictionary
+
+    Args:
+        question_ids: list of question IDs
+        ordered: keep the list order (exam/session/plan lists) instead of treating it as a set
+        dictionary: QuestionDictionary to use (defaults to the current one)
+
+    Returns:
+        dict payload, or the original list if some IDs are not in the dictionary
+    """
+    dictionary = dictionary or get_question_dictionary()
+    ordinals = dictionary.to_ordinals(question_ids)
+    if ordinals is None:
+        return list(question_ids)
+
+    if ordered:
+        encoding = 'zigzag-delta-varint'
+        data = encode_delta_varint(ordinals, ordered=True)
+    else:
+        ordinals = sorted(set(ordinals))
+        encoding = 'delta-varint'
+        data = encode_delta_varint(ordinals)
+        bitmap = encode_bitmap(ordinals)
+        if len(bitmap) < len(data):
+            encoding = 'bitmap'
+            data = bitmap
+
+    return {
+        'encoding': encoding,
+        'dictionary': dictionary.version,
+        'count': len(ordinals),
+        'data': base64.b64encode(data).decode('ascii'),
+    }
+
+
+def decode_id_list(payload, dictionary=None):
+    """Inverse of encode_id_list (plain lists are returned unchanged)"""
+    if isinstance(payload, list):
+        return payload
+    dictionary = dictionary or get_question_dictionary()
+    if payload['dictionary'] != dictionary.version:
+        raise ValueError('ID set was encoded against a different question dictionary')
+    data = base64.b64decode(payload['data'])
+    if payload['encoding'] == 'bitmap':
+        ordinals = decode_bitmap(data)
+    else:
+        ordinals = decode_delta_varint(data, ordered=payload['encoding'] == 'zigzag-delta-varint')
+    return [dictionary.question_ids[ordinal] for ordinal in ordinals]
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.snapshot import build_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = 'Write the memory-mapped question bank snapshot shared by all workers'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help=f'Output file (default: {snapshot_path()})')
+    
+    def handle(self, *args, **options):
+        result = build_snapshot(options.get('path'))
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {result['version']}: {result['questions']} questions, {result['bytes']} bytes"
+        ))
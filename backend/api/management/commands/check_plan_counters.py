@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from api.models import DailyPlan
+
+
+class Command(BaseCommand):
+    help = 'Compare stored daily plan counters with the counts derived from attempts'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only check plans with dateKey >= this value (YYYY-MM-DD)')
+        parser.add_argument('--fix', action='store_true', help='Overwrite mismatching counters with the derived counts')
+    
+    def handle(self, *args, **options):
+        plans = DailyPlan.objects.order_by('date_key')
+        if options['since']:
+            plans = plans.filter(date_key__gte=options['since'])
+        
+        checked = 0
+        mismatched = 0
+        for plan in plans.iterator():
+            checked += 1
+            answered, correct = plan.aggregate_counts()
+            if (plan.answered_count, plan.correct_count) == (answered, correct):
+                continue
+            mismatched += 1
+            self.stdout.write(
+                f"{plan.date_key}: stored answered={plan.answered_count} correct={plan.correct_count}, "
+                f"derived answered={answered} correct={correct}"
+            )
+            if options['fix']:
+                plan.set_counts(answered, correct)
+                plan.save()
+        
+        summary = f'{checked} plan(s) checked, {mismatched} mismatched'
+        if options['fix'] and mismatched:
+            summary += ' and fixed'
+        style = self.style.SUCCESS if not mismatched or options['fix'] else self.style.WARNING
+        self.stdout.write(style(summary))
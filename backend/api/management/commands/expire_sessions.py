@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.sessions import expire_sessions
+
+
+class Command(BaseCommand):
+    help = 'Archive incomplete exam sessions that have not been updated recently'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help=f'Inactivity threshold in days (default: {settings.SESSION_INCOMPLETE_EXPIRY_DAYS})')
+        parser.add_argument('--delete', action='store_true', help='Delete abandoned sessions instead of archiving them')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many sessions would be affected')
+    
+    def handle(self, *args, **options):
+        count = expire_sessions(options['days'], delete=options['delete'], dry_run=options['dry_run'])
+        action = 'deleted' if options['delete'] else 'archived'
+        if options['dry_run']:
+            action = f'would be {action}'
+        self.stdout.write(self.style.SUCCESS(f'{count} abandoned session(s) {action}'))
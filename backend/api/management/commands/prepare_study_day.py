@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.scheduler import prepare_study_day
+
+
+class Command(BaseCommand):
+    help = "Create the coming study day's plan ahead of the day boundary and warm question caches"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--date-key', default=None, help='Plan this dateKey instead of the day current after the lead')
+        parser.add_argument('--lead-minutes', type=int, default=None,
+                            help=f'Look this far ahead for the dateKey (default: {settings.STUDY_DAY_SCHEDULER_LEAD_MINUTES})')
+        parser.add_argument('--skip-warm', action='store_true', help='Only create the plan')
+    
+    def handle(self, *args, **options):
+        lead = timedelta(minutes=options['lead_minutes']) if options['lead_minutes'] is not None else None
+        result = prepare_study_day(lead, date_key=options['date_key'], warm=not options['skip_warm'])
+        state = 'created' if result['created'] else 'already existed'
+        self.stdout.write(self.style.SUCCESS(
+            f"Plan {result['dateKey']} ({result['focusSubject']}) {state}"
+        ))
+        for name, elapsed in result['warmed'].items():
+            self.stdout.write(f'  warmed {name} in {elapsed} ms')
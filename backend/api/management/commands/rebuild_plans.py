@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import DailyPlan
+from api.plans import merge_plans, rebuild_plan_counters
+
+
+class DryRun(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Recompute all daily plan counters from attempts, optionally merging misdated plans first'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild plans with dateKey >= this value (YYYY-MM-DD)')
+        parser.add_argument('--merge', action='append', default=[], metavar='SOURCE:TARGET',
+                            help='Merge the plan and attempts of SOURCE dateKey into TARGET (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes and roll them back')
+    
+    def handle(self, *args, **options):
+        merges = []
+        for value in options['merge']:
+            source, _, target = value.partition(':')
+            if not source or not target or source == target:
+                raise CommandError(f'--merge expects SOURCE:TARGET, got {value!r}')
+            merges.append((source, target))
+        
+        try:
+            with transaction.atomic():
+                for source, target in merges:
+                    moved = merge_plans(source, target)
+                    self.stdout.write(f'Merged {source} into {target} ({moved} attempt(s) moved)')
+                
+                changed = rebuild_plan_counters(options['since'], batch_size=options['batch_size'])
+                # Merge targets before --since still need fresh counters
+                for _, target in merges:
+                    if options['since'] and target < options['since']:
+                        plan = DailyPlan.objects.filter(date_key=target).first()
+                        if plan is not None:
+                            previous = (plan.answered_count, plan.correct_count)
+                            plan.recompute_stats()
+                            changed.append((plan, previous))
+                for plan, (answered, correct) in changed:
+                    self.stdout.write(
+                        f'{plan.date_key}: answered {answered} -> {plan.answered_count}, '
+                        f'correct {correct} -> {plan.correct_count}'
+                    )
+                if options['dry_run']:
+                    raise DryRun()
+        except DryRun:
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(changed)} plan(s) would change, nothing written'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'{len(changed)} plan(s) updated'))
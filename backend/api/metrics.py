@@ -0,0 +1,317 @@
+"""
+Built-in Prometheus metrics
+
+MetricsMiddleware counts requests, errors and latency per route (the URL
+name of the router action, e.g. question-bulk, analytics-subjects,
+session-progress). It also tracks database connections opened, cache
+hits and misses reported by the caches (record_cache), and the identity
+of the worker process.
+
+Counters are kept in per-thread shards, so the request path never takes a
+lock; a scrape sums the shards, folding those of finished threads into a
+retired shard so the list does not grow with every thread ever started.
+With METRICS_SHARED_DIR set, every worker periodically writes its totals
+to <dir>/worker-<pid>.json and GET /api/debug/metrics/ merges all fresh
+worker files, so any worker can answer for the whole gunicorn instance.
+Counters carry a pid label: when a worker exits and its file expires its
+series end, instead of the instance totals going down.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+# Latency histogram bucket bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()  # Shard registration and folding only, never per request
+_process = {'pid': os.getpid(), 'ppid': os.getppid(), 'server': '', 'startedAt': time.time()}
+_last_flush = {'at': 0.0}
+
+
+def _process_info():
+    # gunicorn --preload imports this module in the master before forking workers
+    if _process['pid'] != os.getpid():
+        _process.update(pid=os.getpid(), ppid=os.getppid(), startedAt=time.time())
+    return dict(_process)
+
+
+class _Shard:
+    """Counters written by one thread only"""
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.requests = {}  # (route, method, status) -> [count, seconds, per-bucket counts..., overflow]
+        self.caches = {}  # name -> [hits, misses]
+        self.connections_opened = 0
+
+    def add(self, other):
+        """Add another shard's counters to this one"""
+        for key, values in other.requests.copy().items():
+            total = self.requests.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+        for name, values in other.caches.copy().items():
+            total = self.caches.setdefault(name, [0, 0])
+            total[0] += values[0]
+            total[1] += values[1]
+        self.connections_opened += other.connections_opened
+
+
+# Counters of threads that have finished
+_retired = _Shard()
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def _retire_finished_shards():
+    """Fold the shards of finished threads into _retired (their threads no longer write to them)"""
+    with _shards_lock:
+        finished = [shard for shard in _shards if not shard.thread.is_alive()]
+        for shard in finished:
+            _retired.add(shard)
+            _shards.remove(shard)
+
+
+def _bucket_index(seconds):
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def record_request(route, method, status_code, seconds):
+    requests = _shard().requests
+    entry = requests.get((route, method, status_code))
+    if entry is None:
+        entry = requests[(route, method, status_code)] = [0, 0.0] + [0] * (len(LATENCY_BUCKETS) + 1)
+    entry[0] += 1
+    entry[1] += seconds
+    entry[2 + _bucket_index(seconds)] += 1
+
+
+def record_cache(name, hits=0, misses=0):
+    """Count lookups of an in-process cache"""
+    caches = _shard().caches
+    entry = caches.get(name)
+    if entry is None:
+        entry = caches[name] = [0, 0]
+    entry[0] += hits
+    entry[1] += misses
+
+
+def _connection_created(sender, connection, **kwargs):
+    _shard().connections_opened += 1
+
+
+connection_created.connect(_connection_created)
+
+
+def snapshot():
+    """This process's counters as a JSON-serializable dict"""
+    _retire_finished_shards()
+    total = _Shard()
+    with _shards_lock:
+        total.add(_retired)
+        shards = list(_shards)
+    for shard in shards:
+        total.add(shard)
+    return {
+        'process': _process_info(),
+        'requests': [[route, method, status, *values] for (route, method, status), values in total.requests.items()],
+        'caches': total.caches,
+        'connectionsOpened': total.connections_opened,
+        'writtenAt': time.time(),
+    }
+
+
+def _worker_file(directory, pid):
+    return os.path.join(directory, f'worker-{pid}.json')
+
+
+def flush_to_shared_dir():
+    """Write this process's snapshot to METRICS_SHARED_DIR (atomically)"""
+    directory = getattr(settings, 'METRICS_SHARED_DIR', '')
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = _worker_file(directory, os.getpid())
+    temp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(snapshot(), f)
+    os.replace(temp_path, path)
+    _last_flush['at'] = time.monotonic()
+
+
+def collect(merge=True):
+    """
+    Snapshots to report: this process only, or every worker with a fresh shared file
+
+    Returns:
+        list of snapshot dicts
+    """
+    directory = getattr(settings, 'METRICS_SHARED_DIR', '')
+    if not merge or not directory:
+        return [snapshot()]
+    flush_to_shared_dir()
+    cutoff = time.time() - settings.METRICS_STALE_SECONDS
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('worker-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get('writtenAt', 0) >= cutoff:
+            snapshots.append(data)
+    return snapshots
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshots):
+    """
+    Prometheus text exposition format (0.0.4) for merged snapshots
+
+    Counters are labelled with the worker pid (sum by the other labels for
+    instance totals); the ratio gauges cover all workers.
+    """
+    requests = {}
+    caches = {}
+    connections_opened = {}
+    for data in snapshots:
+        pid = data['process']['pid']
+        for route, method, status, *values in data['requests']:
+            total = requests.setdefault((route, method, status, pid), [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+        for name, (hits, misses) in data['caches'].items():
+            total = caches.setdefault((name, pid), [0, 0])
+            total[0] += hits
+            total[1] += misses
+        connections_opened[pid] = connections_opened.get(pid, 0) + data['connectionsOpened']
+
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    metric('exam_http_requests_total', 'counter', 'Requests by route, method and status code', [
+        f'exam_http_requests_total{_labels(route=route, method=method, status=status, pid=pid)} {values[0]}'
+        for (route, method, status, pid), values in sorted(requests.items())
+    ])
+
+    by_route = {}
+    for (route, method, status, pid), values in requests.items():
+        total = by_route.setdefault((route, method, pid), {'errors': 0, 'values': [0] * len(values)})
+        if status >= 500:
+            total['errors'] += values[0]
+        for index, value in enumerate(values):
+            total['values'][index] += value
+    metric('exam_http_request_errors_total', 'counter', 'Requests answered with a 5xx status', [
+        f'exam_http_request_errors_total{_labels(route=route, method=method, pid=pid)} {total["errors"]}'
+        for (route, method, pid), total in sorted(by_route.items())
+    ])
+
+    samples = []
+    for (route, method, pid), total in sorted(by_route.items()):
+        count, seconds, *buckets = total['values']
+        cumulative = 0
+        for bound, value in zip(LATENCY_BUCKETS, buckets):
+            cumulative += value
+            samples.append(f'exam_http_request_duration_seconds_bucket{_labels(route=route, method=method, pid=pid, le=bound)} {cumulative}')
+        samples.append(f'exam_http_request_duration_seconds_bucket{_labels(route=route, method=method, pid=pid, le="+Inf")} {count}')
+        samples.append(f'exam_http_request_duration_seconds_sum{_labels(route=route, method=method, pid=pid)} {_number(round(seconds, 6))}')
+        samples.append(f'exam_http_request_duration_seconds_count{_labels(route=route, method=method, pid=pid)} {count}')
+    metric('exam_http_request_duration_seconds', 'histogram', 'Request latency by route and method', samples)
+
+    request_count = sum(values[0] for values in requests.values())
+    metric('exam_db_connections_opened_total', 'counter', 'Database connections opened', [
+        f'exam_db_connections_opened_total{_labels(pid=pid)} {count}'
+        for pid, count in sorted(connections_opened.items())
+    ])
+    reuse = 1 - sum(connections_opened.values()) / request_count if request_count else 0
+    metric('exam_db_connection_reuse_ratio', 'gauge', 'Share of requests served on an already open connection',
+           [f'exam_db_connection_reuse_ratio {_number(round(max(reuse, 0), 4))}'])
+
+    metric('exam_cache_requests_total', 'counter', 'In-process cache lookups by result', [
+        f'exam_cache_requests_total{_labels(cache=name, result=result, pid=pid)} {value}'
+        for (name, pid), (hits, misses) in sorted(caches.items())
+        for result, value in (('hit', hits), ('miss', misses))
+    ])
+    cache_totals = {}
+    for (name, pid), (hits, misses) in caches.items():
+        total = cache_totals.setdefault(name, [0, 0])
+        total[0] += hits
+        total[1] += misses
+    metric('exam_cache_hit_ratio', 'gauge', 'In-process cache hit ratio', [
+        f'exam_cache_hit_ratio{_labels(cache=name)} {_number(round(hits / (hits + misses), 4) if hits + misses else 0.0)}'
+        for name, (hits, misses) in sorted(cache_totals.items())
+    ])
+
+    metric('exam_worker_info', 'gauge', 'Worker processes included in this scrape', [
+        f'exam_worker_info{_labels(pid=data["process"]["pid"], ppid=data["process"]["ppid"], server=data["process"]["server"])} 1'
+        for data in snapshots
+    ])
+    metric('exam_worker_start_time_seconds', 'gauge', 'Worker process start time', [
+        f'exam_worker_start_time_seconds{_labels(pid=data["process"]["pid"])} {_number(round(data["process"]["startedAt"], 3))}'
+        for data in snapshots
+    ])
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Per-route request counts and latency (enabled with METRICS_ENABLED=True)"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if getattr(settings, 'METRICS_SHARED_DIR', ''):
+            atexit.register(flush_to_shared_dir)
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unmatched'
+        record_request(route, request.method, response.status_code, time.perf_counter() - start)
+        if not _process['server']:
+            _process['server'] = request.META.get('SERVER_SOFTWARE', '')
+        if (getattr(settings, 'METRICS_SHARED_DIR', '')
+                and time.monotonic() - _last_flush['at'] >= settings.METRICS_FLUSH_INTERVAL):
+            try:
+                flush_to_shared_dir()
+            except OSError:
+                _last_flush['at'] = time.monotonic()
+                logger.exception('Failed to write worker metrics')
+        return response
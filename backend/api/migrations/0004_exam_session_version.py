@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_subject_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsession',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_exam_session_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attempt',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_attempt_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsession',
+            name='results',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
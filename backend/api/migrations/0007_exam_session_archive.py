@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_exam_session_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsession',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, db_column='archivedAt', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(fields=['is_complete', 'archived_at', '-last_updated'], name='examSession_isCompl_81f5b7_idx'),
+        ),
+    ]
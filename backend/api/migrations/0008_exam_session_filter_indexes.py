@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_exam_session_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(fields=['exam_id', '-started_at'], name='examSession_examId_f31c4a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(fields=['mode', 'is_complete', '-started_at'], name='examSession_mode_cc2bdc_idx'),
+        ),
+    ]
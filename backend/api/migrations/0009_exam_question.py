@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_exam_session_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('exam', models.ForeignKey(db_column='examId', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='api.exam')),
+                ('question', models.ForeignKey(db_column='questionId', db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='exam_memberships', to='api.question')),
+            ],
+            options={
+                'db_table': 'examQuestions',
+                'ordering': ['exam', 'position'],
+                'indexes': [models.Index(fields=['exam', 'position'], name='examQuestio_examId_eb2167_idx'), models.Index(fields=['question'], name='examQuestio_questio_478fbb_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='examquestion',
+            constraint=models.UniqueConstraint(fields=('exam', 'question'), name='exam_question_unique'),
+        ),
+    ]
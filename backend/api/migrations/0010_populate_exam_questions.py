@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:04
+
+from django.db import migrations
+
+
+def populate_exam_questions(apps, schema_editor):
+    Exam = apps.get_model('api', 'Exam')
+    ExamQuestion = apps.get_model('api', 'ExamQuestion')
+    rows = []
+    for exam in Exam.objects.only('exam_id', 'question_ids').iterator():
+        seen = set()
+        for question_id in exam.question_ids or []:
+            if not isinstance(question_id, str) or question_id in seen:
+                continue
+            seen.add(question_id)
+            rows.append(ExamQuestion(exam_id=exam.exam_id, question_id=question_id, position=len(seen) - 1))
+        if len(rows) >= 1000:
+            ExamQuestion.objects.bulk_create(rows, batch_size=500)
+            rows = []
+    ExamQuestion.objects.bulk_create(rows, batch_size=500)
+
+
+def clear_exam_questions(apps, schema_editor):
+    apps.get_model('api', 'ExamQuestion').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_exam_question'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_exam_questions, clear_exam_questions),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_populate_exam_questions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attempt',
+            name='attempts_planDat_487a05_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['plan_date_key', 'question_id'], name='attempts_planDat_319d18_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:20
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def recompute_plan_counters(apps, schema_editor):
+    """
+    Recount every plan with DailyPlan.recompute_stats() semantics
+
+    Counters written before incremental maintenance counted raw attempts;
+    they now count distinct plan questions (correct if any attempt was).
+    Historical models have no methods, so the aggregate is repeated here.
+    """
+    DailyPlan = apps.get_model('api', 'DailyPlan')
+    Attempt = apps.get_model('api', 'Attempt')
+    plans = {plan.date_key: plan for plan in DailyPlan.objects.defer('motivational_quote')}
+    members = {key: set(plan.question_ids or []) for key, plan in plans.items()}
+    counts = {key: [0, 0] for key in plans}
+    rows = (Attempt.objects.filter(plan_date_key__isnull=False).exclude(plan_date_key='')
+            .values('plan_date_key', 'question_id')
+            .annotate(correct=Count('attempt_id', filter=Q(is_correct=True)))
+            .order_by())
+    for row in rows.iterator():
+        # Attempts may carry the dateKey of a plan that no longer exists
+        if row['question_id'] in members.get(row['plan_date_key'], ()):
+            counts[row['plan_date_key']][0] += 1
+            counts[row['plan_date_key']][1] += row['correct'] > 0
+
+    for key, (answered, correct) in counts.items():
+        plan = plans[key]
+        plan.answered_count = answered
+        plan.correct_count = correct
+        plan.wrong_count = answered - correct
+        plan.accuracy = (correct / answered * 100) if answered > 0 else 0
+        plan.is_complete = answered >= len(plan.question_ids or [])
+    DailyPlan.objects.bulk_update(
+        list(plans.values()),
+        ['answered_count', 'correct_count', 'wrong_count', 'accuracy', 'is_complete'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_data_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_plan_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_recompute_plan_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(fields=['exam_id', '-last_updated'], name='examSession_examId_863abf_idx'),
+        ),
+    ]
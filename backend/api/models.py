@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import json
 
 
@@ -35,6 +36,30 @@ class Exam(models.Model):
         return f"{self.exam_id}: {self.title}"
 
 
+class ExamQuestion(models.Model):
+    """Ordered exam membership, kept in sync with Exam.question_ids for indexed lookups"""
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='memberships', db_column='examId',
+                             db_index=False)
+    # No FK constraint: exams may reference questions that were removed from the bank
+    question = models.ForeignKey(Question, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+                                 related_name='exam_memberships', db_column='questionId')
+    position = models.IntegerField()
+    
+    class Meta:
+        db_table = 'examQuestions'
+        ordering = ['exam', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'question'], name='exam_question_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['exam', 'position']),
+            models.Index(fields=['question']),
+        ]
+    
+    def __str__(self):
+        return f"{self.exam_id} #{self.position}: {self.question_id}"
+
+
 class Attempt(models.Model):
     """Attempt model for storing user answer attempts"""
     attempt_id = models.CharField(max_length=255, primary_key=True, db_column='attemptId')
@@ -47,7 +72,7 @@ class Attempt(models.Model):
     exam_id = models.CharField(max_length=255, blank=True, null=True, db_column='examId')
     mode = models.CharField(max_length=50, blank=True, null=True)
     plan_date_key = models.CharField(max_length=50, blank=True, null=True, db_column='planDateKey')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Batch sync keeps the client's original time
     
     class Meta:
         db_table = 'attempts'
@@ -56,7 +81,7 @@ class Attempt(models.Model):
             models.Index(fields=['question_id']),
             models.Index(fields=['subject']),
             models.Index(fields=['subject', 'topic']),
-            models.Index(fields=['plan_date_key']),
+            models.Index(fields=['plan_date_key', 'question_id']),
         ]
     
     def __str__(self):
@@ -77,6 +102,9 @@ class ExamSession(models.Model):
     is_paused = models.BooleanField(default=False, db_column='isPaused')
     time_per_question = models.IntegerField(blank=True, null=True, db_column='timePerQuestion')
     plan_date_key = models.CharField(max_length=50, blank=True, null=True, db_column='planDateKey')
+    version = models.IntegerField(default=0)  # Bumped on every progress write (optimistic locking)
+    results = models.JSONField(blank=True, null=True)  # Results summary, stored when the session completes
+    archived_at = models.DateTimeField(blank=True, null=True, db_column='archivedAt')  # Set when an abandoned session is expired
     started_at = models.DateTimeField(auto_now_add=True, db_column='startedAt')
     last_updated = models.DateTimeField(auto_now=True, db_column='lastUpdated')
     
@@ -86,6 +114,10 @@ class ExamSession(models.Model):
         indexes = [
             models.Index(fields=['is_complete']),
             models.Index(fields=['plan_date_key']),
+            models.Index(fields=['is_complete', 'archived_at', '-last_updated']),
+            models.Index(fields=['exam_id', '-started_at']),
+            models.Index(fields=['exam_id', '-last_updated']),
+            models.Index(fields=['mode', 'is_complete', '-started_at']),
         ]
     
     def __str__(self):
@@ -114,6 +146,37 @@ class DailyPlan(models.Model):
     
     def __str__(self):
         return f"{self.date_key}: {self.focus_subject} - {self.answered_count}/{len(self.question_ids)}"
+    
+    def set_counts(self, answered_count, correct_count):
+        """Set answered/correct counters and the values derived from them (the caller saves)"""
+        self.answered_count = answered_count
+        self.correct_count = correct_count
+        self.wrong_count = self.answered_count - self.correct_count
+        self.accuracy = (self.correct_count / self.answered_count * 100) if self.answered_count > 0 else 0
+        self.is_complete = self.answered_count >= len(self.question_ids)
+    
+    def aggregate_counts(self):
+        """
+        Count this plan's answered and correctly answered questions in one query
+        
+        Each plan question counts once, however often it was attempted; a
+        question counts as correct if any of its attempts was correct.
+        
+        Returns:
+            tuple: (answered_count, correct_count)
+        """
+        totals = Attempt.objects.filter(
+            plan_date_key=self.date_key, question_id__in=self.question_ids
+        ).aggregate(
+            answered=models.Count('question_id', distinct=True),
+            correct=models.Count('question_id', distinct=True, filter=models.Q(is_correct=True)),
+        )
+        return totals['answered'], totals['correct']
+    
+    def recompute_stats(self):
+        """Recompute answered/correct/wrong counters from this plan's attempts"""
+        self.set_counts(*self.aggregate_counts())
+        self.save()
 
 
 class ThemePreferences(models.Model):
@@ -163,3 +226,15 @@ class SubjectPriority(models.Model):
     
     def __str__(self):
         return f"{self.subject}: Priority {self.priority_order}, Round {self.round_number}, {'Completed' if self.is_completed else 'Active'}"
+
+
+class DataVersion(models.Model):
+    """Change counter for a data set, used as the key of caches derived from it"""
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'dataVersions'
+    
+    def __str__(self):
+        return f"{self.name}: {self.version}"
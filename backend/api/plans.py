@@ -0,0 +1,234 @@
+"""
+Server-side daily plan generation
+
+Mirrors getOrCreateDailyPlan from the frontend's dailyPlanService.js; the
+focus subject is picked by api/scoring.py. getSeed and seededShuffle are
+reproduced bit for bit (32-bit string hash, rng = (rng * 9301 + 49297) %
+233280), so a plan built here selects the same questions the client would
+have selected from the same subject list.
+
+Plan counters are maintained incrementally by the attempt write paths
+(plan_counters); DailyPlan.recompute_stats() rebuilds them from attempts.
+"""
+import math
+import random
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Attempt, DailyPlan
+from .question_cache import chunked, get_subject_question_ids
+from .quotes import motivational_quotes
+from .scoring import select_focus_subject
+from .utils import OFFICIAL_SUBJECTS
+
+MAX_PLANNED_QUESTIONS = 35
+RECENT_QUOTE_DAYS = 14
+
+
+def _to_int32(value):
+    return (value + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+def get_seed(date_key, subject):
+    """Numeric seed from dateKey + subject (JavaScript string hash)"""
+    text = f"{date_key}_{subject}"
+    code_units = text.encode('utf-16-le')
+    hash_value = 0
+    for i in range(0, len(code_units), 2):
+        char = code_units[i] | (code_units[i + 1] << 8)  # charCodeAt: UTF-16 code units
+        hash_value = _to_int32(_to_int32(hash_value << 5) - hash_value + char)
+    return abs(hash_value)
+
+
+def seeded_shuffle(items, seed):
+    """Deterministic shuffle using a seed (for consistent daily selection)"""
+    shuffled = list(items)
+    rng = seed
+    for i in range(len(shuffled) - 1, 0, -1):
+        rng = (rng * 9301 + 49297) % 233280
+        j = math.floor((rng / 233280) * (i + 1))
+        shuffled[i], shuffled[j] = shuffled[j], shuffled[i]
+    return shuffled
+
+
+def choose_quote(candidates, rng=random):
+    """First candidate quote not used by a recent plan (any candidate if all were used)"""
+    candidates = [quote for quote in candidates or [] if isinstance(quote, str) and quote.strip()]
+    if not candidates:
+        return None
+    recent = set(
+        DailyPlan.objects.order_by('-date_key')
+        .exclude(motivational_quote__isnull=True)
+        .values_list('motivational_quote', flat=True)[:RECENT_QUOTE_DAYS]
+    )
+    fresh = [quote for quote in candidates if quote not in recent]
+    return rng.choice(fresh or candidates)
+
+
+def build_daily_plan(date_key, focus_subject, quote_candidates=None):
+    """Unsaved DailyPlan with a deterministic question selection for date_key"""
+    subject_ids = get_subject_question_ids(focus_subject)
+    shuffled = seeded_shuffle(subject_ids, get_seed(date_key, focus_subject))
+    return DailyPlan(
+        date_key=date_key,
+        focus_subject=focus_subject,
+        total_available_in_subject=len(subject_ids),
+        max_planned_questions=MAX_PLANNED_QUESTIONS,
+        question_ids=shuffled[:MAX_PLANNED_QUESTIONS],
+        motivational_quote=choose_quote(quote_candidates),
+    )
+
+
+def ensure_daily_plan(date_key, fallback_subject=None, quote_candidates=None):
+    """
+    Get the plan for date_key, generating and inserting it if it does not exist
+
+    Returns:
+        tuple: (plan, whether this call created it)
+    """
+    plan = DailyPlan.objects.filter(date_key=date_key).first()
+    if plan is not None:
+        return plan, False
+    focus_subject = select_focus_subject(OFFICIAL_SUBJECTS) or fallback_subject or OFFICIAL_SUBJECTS[0]
+    # Plans generated without client candidates (scheduler, cron) pick from the shared list
+    return insert_plan(build_daily_plan(date_key, focus_subject, quote_candidates or motivational_quotes()))
+
+
+def insert_plan(plan):
+    """
+    Insert a plan unless one already exists for its dateKey (INSERT ... ON CONFLICT DO NOTHING)
+
+    Returns:
+        tuple: (stored plan, whether this call created it)
+    """
+    DailyPlan.objects.bulk_create([plan], ignore_conflicts=True)
+    stored = DailyPlan.objects.get(date_key=plan.date_key)
+    # created_at is set on our instance by bulk_create; a concurrent winner has its own
+    return stored, stored.created_at == plan.created_at
+
+
+def plan_question_states(date_key, question_ids):
+    """{questionId: answered correctly at least once} for the given questions attempted under a plan"""
+    states = {}
+    for chunk in chunked(list(question_ids)):
+        rows = (Attempt.objects.filter(plan_date_key=date_key, question_id__in=chunk)
+                .values('question_id')
+                .annotate(correct=Count('attempt_id', filter=Q(is_correct=True)))
+                .order_by())
+        states.update((row['question_id'], row['correct'] > 0) for row in rows)
+    return states
+
+
+@contextmanager
+def plan_counters(question_ids_by_plan):
+    """
+    Keep DailyPlan counters current for attempts written inside the block
+
+    The affected plans are locked, the per-question state of the given plan
+    questions is read before and after the block, and each plan's counters are
+    moved by the difference. Counts match DailyPlan.aggregate_counts().
+
+    Args:
+        question_ids_by_plan: {planDateKey: question IDs whose attempts the block writes}
+
+    Yields:
+        dict: planDateKey -> locked DailyPlan (only plans that exist)
+    """
+    with transaction.atomic():
+        keys = sorted(key for key in question_ids_by_plan if key)
+        plans = {plan.date_key: plan for plan in DailyPlan.objects.select_for_update().filter(date_key__in=keys)}
+        tracked = {}
+        for key, plan in plans.items():
+            members = set(plan.question_ids)
+            tracked[key] = [qid for qid in dict.fromkeys(question_ids_by_plan[key]) if qid in members]
+        before = {key: plan_question_states(key, ids) for key, ids in tracked.items() if ids}
+        
+        yield plans
+        
+        for key, states_before in before.items():
+            states_after = plan_question_states(key, tracked[key])
+            answered_delta = len(states_after) - len(states_before)
+            correct_delta = sum(states_after.values()) - sum(states_before.values())
+            if answered_delta or correct_delta:
+                plan = plans[key]
+                plan.set_counts(plan.answered_count + answered_delta, plan.correct_count + correct_delta)
+                plan.save()
+
+
+def rebuild_plan_counters(since=None, batch_size=500):
+    """
+    Recompute the counters of every plan (or plans with dateKey >= since)
+
+    Attempts are read with one query grouped by (planDateKey, questionId) and
+    changed plans are written back with bulk_update.
+
+    Returns:
+        list: (plan, (old answered, old correct)) for each plan whose counters changed
+    """
+    plans = DailyPlan.objects.order_by('date_key')
+    attempts = Attempt.objects.exclude(plan_date_key__isnull=True).exclude(plan_date_key='')
+    if since:
+        plans = plans.filter(date_key__gte=since)
+        attempts = attempts.filter(plan_date_key__gte=since)
+    plans = {plan.date_key: plan for plan in plans.defer('motivational_quote')}
+    members = {key: set(plan.question_ids) for key, plan in plans.items()}
+
+    counts = {key: [0, 0] for key in plans}
+    rows = (attempts.values('plan_date_key', 'question_id')
+            .annotate(correct=Count('attempt_id', filter=Q(is_correct=True)))
+            .order_by())
+    for row in rows.iterator():
+        key = row['plan_date_key']
+        if key in members and row['question_id'] in members[key]:
+            counts[key][0] += 1
+            counts[key][1] += row['correct'] > 0
+
+    changed = []
+    for key, (answered, correct) in counts.items():
+        plan = plans[key]
+        previous = (plan.answered_count, plan.correct_count)
+        if previous != (answered, correct):
+            plan.set_counts(answered, correct)
+            changed.append((plan, previous))
+    DailyPlan.objects.bulk_update(
+        [plan for plan, _ in changed],
+        ['answered_count', 'correct_count', 'wrong_count', 'accuracy', 'is_complete'],
+        batch_size=batch_size,
+    )
+    return changed
+
+
+def merge_plans(source_date_key, target_date_key):
+    """
+    Fold a misdated plan into the plan of another day
+
+    Attempts tagged with the source dateKey are moved to the target, the
+    target's question list is extended with the source's questions (target
+    order first) and the source plan is deleted. The target is created from
+    the source if it does not exist. Counters are left to the caller.
+
+    Returns:
+        int: number of attempts moved
+    """
+    with transaction.atomic():
+        source = DailyPlan.objects.select_for_update().filter(date_key=source_date_key).first()
+        target = DailyPlan.objects.select_for_update().filter(date_key=target_date_key).first()
+        if target is None and source is not None:
+            target = DailyPlan(
+                date_key=target_date_key,
+                focus_subject=source.focus_subject,
+                total_available_in_subject=source.total_available_in_subject,
+                max_planned_questions=source.max_planned_questions,
+                question_ids=list(source.question_ids),
+                motivational_quote=source.motivational_quote,
+            )
+        moved = Attempt.objects.filter(plan_date_key=source_date_key).update(plan_date_key=target_date_key)
+        if source is not None:
+            target.question_ids = list(dict.fromkeys(list(target.question_ids) + list(source.question_ids)))
+            if not target.focus_subject:
+                target.focus_subject = source.focus_subject
+            target.save()
+            source.delete()
+        return moved
@@ -0,0 +1,86 @@
+"""
+Set-based subject priority operations
+
+Every write runs in one transaction with the priority rows locked in
+primary-key order, so concurrent reorders, toggles and round resets are
+serialized instead of interleaving row by row.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import SubjectPriority
+from .scoring import seeding_order
+from .utils import OFFICIAL_SUBJECTS
+
+
+def _lock_priorities():
+    """Lock every priority row (the table holds one row per subject)"""
+    return list(SubjectPriority.objects.select_for_update().order_by('subject'))
+
+
+def seed_priorities():
+    """
+    Create the initial priorities, weakest subject first, if none exist
+
+    Returns:
+        bool: whether rows were created
+    """
+    with transaction.atomic():
+        if SubjectPriority.objects.exists():
+            return False
+        ranked = seeding_order(OFFICIAL_SUBJECTS)
+        # A concurrent seed may win the race; its rows are kept
+        SubjectPriority.objects.bulk_create([
+            SubjectPriority(subject=subject, priority_order=idx, is_completed=False, round_number=1)
+            for idx, subject in enumerate(ranked)
+        ], ignore_conflicts=True)
+    return True
+
+
+def reorder_priorities(order):
+    """
+    Set priority_order to each subject's index in order with one UPDATE ... CASE
+
+    Subjects without a row are created. A subject listed twice keeps its last index.
+    """
+    positions = {subject: idx for idx, subject in enumerate(order)}
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {priority.subject: priority for priority in _lock_priorities()}
+        SubjectPriority.objects.bulk_create([
+            SubjectPriority(subject=subject, priority_order=idx, is_completed=False, round_number=1)
+            for subject, idx in positions.items() if subject not in existing
+        ], ignore_conflicts=True)
+        changed = []
+        for subject, idx in positions.items():
+            priority = existing.get(subject)
+            if priority is not None and priority.priority_order != idx:
+                priority.priority_order = idx
+                priority.last_updated = now
+                changed.append(priority)
+        SubjectPriority.objects.bulk_update(changed, ['priority_order', 'last_updated'])
+
+
+def toggle_priority(subject):
+    """
+    Flip a subject's completion status
+
+    Returns:
+        SubjectPriority or None if the subject has no row
+    """
+    with transaction.atomic():
+        priority = SubjectPriority.objects.select_for_update().filter(subject=subject).first()
+        if priority is None:
+            return None
+        priority.is_completed = not priority.is_completed
+        priority.save(update_fields=['is_completed', 'last_updated'])
+    return priority
+
+
+def start_next_round():
+    """Reset all completions and move every subject to the round after the highest one"""
+    with transaction.atomic():
+        _lock_priorities()
+        max_round = SubjectPriority.objects.aggregate(value=Max('round_number'))['value'] or 1
+        SubjectPriority.objects.update(is_completed=False, round_number=max_round + 1, last_updated=timezone.now())
@@ -0,0 +1,397 @@
+"""
+Opt-in request profiling
+
+With REQUEST_PROFILING_ENABLED set, RequestProfilingMiddleware records for
+every request the number of queries, time spent in the database, repeated
+query shapes (N+1 candidates), view and render time and total wall time.
+
+The figures are returned as a Server-Timing header (visible in the browser's
+network panel). Requests slower than REQUEST_PROFILING_SLOW_MS are logged
+with their slowest SQL and its EXPLAIN output and kept in a per-worker ring
+buffer that GET /api/debug/slow/ lists worst first. The endpoint is
+unauthenticated, so the buffer keeps the SQL with its placeholders only:
+bound parameters (answers, IDs) are never stored, and EXPLAIN plans, which
+show them inline, are only kept with DEBUG on.
+
+With PROFILE_CAPTURE_ENABLED set, ProfileCaptureMiddleware runs single
+flagged requests (X-Profile-Request header or ?_profile= query flag) under
+cProfile while a sampling thread records their stacks. The .pstats file and
+a collapsed-stack file (flamegraph.pl / speedscope input) are kept in a
+ring of PROFILE_CAPTURE_KEEP captures under PROFILE_CAPTURE_DIR and served
+by /api/debug/profiles/. Unflagged requests only pay for the flag check.
+"""
+import cProfile
+import itertools
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_SQL_LENGTH = 2000
+MAX_LOGGED_QUERIES = 10
+MAX_EXPLAINED_QUERIES = 3
+
+
+class QueryRecorder:
+    """execute_wrapper that times every query run on a connection"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': params if not many else None,
+                'many': many,
+                'ms': (time.perf_counter() - start) * 1000,
+            })
+
+
+class RequestProfile:
+    """Timings of one request"""
+
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.started_at = timezone.now()
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.view_end = None
+        self.render_end = None
+        self.recorders = [QueryRecorder(alias) for alias in connections]
+
+    @property
+    def queries(self):
+        return [query for recorder in self.recorders for query in recorder.queries]
+
+    def duplicates(self, threshold):
+        """Query shapes (SQL with placeholders) executed at least threshold times"""
+        counts = Counter((query['alias'], query['sql']) for query in self.queries)
+        return [
+            {'sql': sql[:MAX_SQL_LENGTH], 'count': count}
+            for (_, sql), count in counts.most_common() if count >= threshold
+        ]
+
+    def summary(self, status_code, end):
+        queries = self.queries
+        db_ms = sum(query['ms'] for query in queries)
+        view_ms = ((self.view_end or end) - self.view_start) * 1000 if self.view_start else 0
+        render_ms = (self.render_end - self.view_end) * 1000 if self.render_end and self.view_end else 0
+        return {
+            'method': self.method,
+            'path': self.path,
+            'status': status_code,
+            'startedAt': self.started_at.isoformat(),
+            'totalMs': round((end - self.start) * 1000, 2),
+            'dbMs': round(db_ms, 2),
+            'queryCount': len(queries),
+            # View time outside the database: Python work, mostly serialization
+            'appMs': round(max(view_ms - db_ms, 0), 2),
+            'renderMs': round(render_ms, 2),
+            'duplicateQueries': self.duplicates(settings.REQUEST_PROFILING_DUPLICATE_THRESHOLD),
+        }
+
+
+def server_timing(summary):
+    """Server-Timing header value for a request summary"""
+    duplicates = sum(item['count'] for item in summary['duplicateQueries'])
+    metrics = [
+        f'db;dur={summary["dbMs"]};desc="{summary["queryCount"]} queries, {duplicates} repeated"',
+        f'app;dur={summary["appMs"]}',
+        f'render;dur={summary["renderMs"]}',
+        f'total;dur={summary["totalMs"]}',
+    ]
+    return ', '.join(metrics)
+
+
+def explain(query):
+    """EXPLAIN output of a recorded SELECT, or None"""
+    if query['many'] or not query['sql'].lstrip().upper().startswith('SELECT'):
+        return None
+    connection = connections[query['alias']]
+    try:
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {query["sql"]}', query['params'])
+            return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+
+
+class SlowRequestLog:
+    """Ring buffer of the most recent slow requests in this worker"""
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=size)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def worst(self, limit=None):
+        with self._lock:
+            entries = sorted(self._entries, key=lambda entry: entry['totalMs'], reverse=True)
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_slow_log = None
+_slow_log_lock = threading.Lock()
+
+
+def get_slow_request_log():
+    """The worker's slow request log, or None when profiling is disabled"""
+    global _slow_log
+    if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+        return None
+    if _slow_log is None:
+        with _slow_log_lock:
+            if _slow_log is None:
+                _slow_log = SlowRequestLog(settings.REQUEST_PROFILING_KEEP)
+    return _slow_log
+
+
+class RequestProfilingMiddleware:
+    """Per-request SQL and latency profile (enabled by REQUEST_PROFILING_ENABLED)"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_PROFILING_SLOW_MS
+
+    def __call__(self, request):
+        profile = RequestProfile(request)
+        request._profile = profile
+        with ExitStack() as stack:
+            for recorder in profile.recorders:
+                stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        summary = profile.summary(response.status_code, end)
+        response['Server-Timing'] = server_timing(summary)
+        response['Timing-Allow-Origin'] = '*'
+        if summary['totalMs'] >= self.slow_ms:
+            self.record_slow(profile, summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profile.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        request._profile.view_end = time.perf_counter()
+        response.add_post_render_callback(self._rendered(request._profile))
+        return response
+
+    @staticmethod
+    def _rendered(profile):
+        def callback(response):
+            profile.render_end = time.perf_counter()
+        return callback
+
+    def record_slow(self, profile, summary):
+        slowest = sorted(profile.queries, key=lambda query: query['ms'], reverse=True)[:MAX_LOGGED_QUERIES]
+        queries = [
+            {
+                'sql': query['sql'][:MAX_SQL_LENGTH],
+                'ms': round(query['ms'], 2),
+                'explain': explain(query) if index < MAX_EXPLAINED_QUERIES else None,
+            }
+            for index, query in enumerate(slowest)
+        ]
+        stored = queries if settings.DEBUG else [{**query, 'explain': None} for query in queries]
+        get_slow_request_log().add({**summary, 'queries': stored})
+        logger.warning(
+            'Slow request %s %s: %.1f ms, %d queries (%.1f ms in db)%s',
+            summary['method'], summary['path'], summary['totalMs'], summary['queryCount'], summary['dbMs'],
+            ''.join(
+                f'\n  [{query["ms"]} ms] {query["sql"]}' + (f'\n    {query["explain"]}' if query['explain'] else '')
+                for query in queries
+            ),
+        )
+
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_REQUEST'
+PROFILE_QUERY_FLAG = '_profile'
+PROFILE_TOP_FUNCTIONS = 15
+
+_capture_ids = itertools.count(1)
+_capture_lock = threading.Lock()
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='request-profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._finished = threading.Event()
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ':')
+
+    def run(self):
+        while not self._finished.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._finished.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def profile_flagged(request):
+    """Whether the request asks to be profiled (and carries PROFILE_CAPTURE_TOKEN when one is set)"""
+    value = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_FLAG)
+    if not value:
+        return False
+    token = settings.PROFILE_CAPTURE_TOKEN
+    return value == token if token else value.lower() in ('1', 'true', 'yes')
+
+
+def _capture_paths(capture_id):
+    directory = settings.PROFILE_CAPTURE_DIR
+    return {kind: os.path.join(directory, f'{capture_id}.{kind}') for kind in ('json', 'pstats', 'collapsed')}
+
+
+def top_functions(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    """Functions with the highest cumulative time"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f'{name} ({os.path.basename(filename)}:{line})',
+            'calls': calls,
+            'totalMs': round(total * 1000, 2),
+            'cumulativeMs': round(cumulative * 1000, 2),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+def list_captures():
+    """Metadata of the stored captures, newest first"""
+    directory = settings.PROFILE_CAPTURE_DIR
+    if not os.path.isdir(directory):
+        return []
+    captures = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                captures.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return captures
+
+
+def capture_file(capture_id, kind):
+    """Path of a stored capture file, or None"""
+    if kind not in ('pstats', 'collapsed') or not capture_id.replace('-', '').isalnum():
+        return None
+    path = _capture_paths(capture_id)[kind]
+    return path if os.path.isfile(path) else None
+
+
+def _trim_captures(keep):
+    captures = list_captures()
+    for meta in captures[keep:]:
+        for path in _capture_paths(meta['id']).values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def store_capture(meta, profiler, sampler):
+    """Write a capture's files and drop the oldest captures beyond PROFILE_CAPTURE_KEEP"""
+    paths = _capture_paths(meta['id'])
+    with _capture_lock:
+        os.makedirs(settings.PROFILE_CAPTURE_DIR, exist_ok=True)
+        profiler.dump_stats(paths['pstats'])
+        with open(paths['collapsed'], 'w') as f:
+            f.write(sampler.collapsed())
+        # Metadata last: a capture is listed only once its files exist
+        with open(paths['json'], 'w') as f:
+            json.dump(meta, f)
+        _trim_captures(settings.PROFILE_CAPTURE_KEEP)
+
+
+class ProfileCaptureMiddleware:
+    """cProfile + stack sampling of flagged requests (enabled by PROFILE_CAPTURE_ENABLED)"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILE_CAPTURE_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profile_flagged(request):
+            return self.get_response(request)
+
+        started_at = timezone.now()
+        capture_id = f'{started_at:%Y%m%dT%H%M%S}-{os.getpid()}-{next(_capture_ids):06d}'
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_CAPTURE_SAMPLE_INTERVAL)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            sampler.stop()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        meta = {
+            'id': capture_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'startedAt': started_at.isoformat(),
+            'totalMs': round(elapsed_ms, 2),
+            'samples': sum(sampler.stacks.values()),
+            'top': top_functions(profiler),
+        }
+        try:
+            store_capture(meta, profiler, sampler)
+            response['X-Profile-Id'] = capture_id
+        except OSError:
+            logger.exception('Failed to store request profile %s', capture_id)
+        return response
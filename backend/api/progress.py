@@ -0,0 +1,169 @@
+"""
+Server-side merging of exam session progress
+
+A single answer only touches one key of ExamSession.answers and
+ExamSession.time_spent, so instead of rewriting both JSON columns the key is
+set in place with one UPDATE (json_set on SQLite, jsonb_set on Postgres).
+ExamSession.version is bumped by every write so clients can detect lost
+updates by sending the version they last saw.
+"""
+import json
+
+from django.db import NotSupportedError, connection, transaction
+from django.db.models import F, Func, IntegerField, JSONField
+from django.utils import timezone
+
+from .models import ExamSession
+
+
+def is_valid_json_key(key):
+    """Keys are embedded in a JSON path on SQLite, so quotes and backslashes are not allowed"""
+    return isinstance(key, str) and bool(key) and '"' not in key and '\\' not in key
+
+
+class JSONSet(Func):
+    """Set top-level keys of a JSON object column in place"""
+    output_field = JSONField()
+
+    def __init__(self, field_name, values):
+        for key in values:
+            if not is_valid_json_key(key):
+                raise ValueError(f'Unsupported JSON key: {key!r}')
+        self.values = dict(values)
+        super().__init__(F(field_name))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column_sql, params = compiler.compile(self.source_expressions[0])
+        pairs = ', '.join('%s, json(%s)' for _ in self.values)
+        params = list(params)
+        for key, value in self.values.items():
+            params += [f'$.{json.dumps(key)}', json.dumps(value)]
+        return f"json_set(COALESCE({column_sql}, '{{}}'), {pairs})", params
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column_sql, params = compiler.compile(self.source_expressions[0])
+        sql = f"COALESCE({column_sql}, '{{}}'::jsonb)"
+        params = list(params)
+        for key, value in self.values.items():
+            sql = f"jsonb_set({sql}, %s::text[], %s::jsonb, true)"
+            params += [[key], json.dumps(value)]
+        return sql, params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f'JSONSet is not implemented for {connection.vendor}')
+
+
+class JSONLength(Func):
+    """Number of elements in a JSON array column, or keys in a JSON object column"""
+    output_field = IntegerField()
+
+    def __init__(self, field_name, kind='array'):
+        if kind not in ('array', 'object'):
+            raise ValueError(f'Unsupported JSON kind: {kind!r}')
+        self.kind = kind
+        super().__init__(F(field_name))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column_sql, params = compiler.compile(self.source_expressions[0])
+        return f"(SELECT COUNT(*) FROM json_each(COALESCE({column_sql}, '[]')))", params
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column_sql, params = compiler.compile(self.source_expressions[0])
+        function = 'jsonb_array_elements' if self.kind == 'array' else 'jsonb_object_keys'
+        return f"(SELECT COUNT(*) FROM {function}({column_sql}))", params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f'JSONLength is not implemented for {connection.vendor}')
+
+
+class SessionNotFound(Exception):
+    pass
+
+
+class VersionConflict(Exception):
+    def __init__(self, current_version):
+        super().__init__(f'Session was modified (current version {current_version})')
+        self.current_version = current_version
+
+
+def _apply_python(session_id, answers, time_spent, current_index, expected_version, extra_updates):
+    """Fallback for databases without in-place JSON updates"""
+    with transaction.atomic():
+        session = ExamSession.objects.select_for_update().filter(session_id=session_id).first()
+        if session is None:
+            raise SessionNotFound(session_id)
+        if expected_version is not None and session.version != expected_version:
+            raise VersionConflict(session.version)
+        if answers:
+            session.answers = {**(session.answers or {}), **answers}
+        if time_spent:
+            session.time_spent = {**(session.time_spent or {}), **time_spent}
+        if current_index is not None:
+            session.current_index = current_index
+        for field_name, value in (extra_updates or {}).items():
+            setattr(session, field_name, value)
+        session.version += 1
+        session.save()
+
+
+def apply_progress(session_id, answers=None, time_spent=None, current_index=None,
+                   expected_version=None, extra_updates=None):
+    """
+    Merge answers and time spent into a session with a single UPDATE
+
+    Args:
+        session_id: ExamSession primary key
+        answers: {questionId: answer} merged into answers
+        time_spent: {questionId: seconds} merged into time_spent
+        current_index: new current_index (skipped if None)
+        expected_version: reject the write if the stored version differs
+        extra_updates: additional column updates for the same UPDATE
+
+    Returns:
+        dict: sessionId, version, currentIndex and lastUpdated after the write
+
+    Raises:
+        SessionNotFound, VersionConflict
+    """
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        _apply_python(session_id, answers, time_spent, current_index, expected_version, extra_updates)
+    else:
+        updates = {'version': F('version') + 1, 'last_updated': timezone.now()}
+        if answers:
+            updates['answers'] = JSONSet('answers', answers)
+        if time_spent:
+            updates['time_spent'] = JSONSet('time_spent', time_spent)
+        if current_index is not None:
+            updates['current_index'] = current_index
+        updates.update(extra_updates or {})
+
+        rows = ExamSession.objects.filter(session_id=session_id)
+        if expected_version is not None:
+            rows = rows.filter(version=expected_version)
+        if rows.update(**updates) == 0:
+            current = ExamSession.objects.filter(session_id=session_id).values_list('version', flat=True).first()
+            if current is None:
+                raise SessionNotFound(session_id)
+            raise VersionConflict(current)
+
+    state = ExamSession.objects.filter(session_id=session_id).values(
+        'version', 'current_index', 'last_updated'
+    ).first()
+    return {
+        'sessionId': session_id,
+        'version': state['version'],
+        'currentIndex': state['current_index'],
+        'lastUpdated': state['last_updated'],
+    }
+
+
+def merge_progress(session_id, question_id=None, answer=None, time_spent=None,
+                   current_index=None, expected_version=None, extra_updates=None):
+    """
+    Merge one answer into a session (see apply_progress)
+
+    answer and time_spent are stored under question_id; None values are skipped.
+    """
+    answers = {question_id: answer} if question_id is not None and answer is not None else None
+    times = {question_id: time_spent} if question_id is not None and time_spent is not None else None
+    return apply_progress(session_id, answers, times, current_index, expected_version, extra_updates)
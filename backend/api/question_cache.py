@@ -0,0 +1,288 @@
+"""
+Order-preserving bulk question lookup
+
+Large ID lists are split into chunks that stay well below SQLite's
+bound-variable limit, and serialized questions are kept in a small
+in-process LRU cache so repeated exam loads skip the database.
+
+Every cache here is tied to the shared question version (DataVersion
+'questions'): a lookup that sees the token move drops this worker's
+entries, so a question edited through any worker is never served or
+graded from a stale copy.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+
+from .metrics import record_cache
+from .models import Question
+from .serializers import QuestionSerializer
+from .snapshot import mark_stale
+from .versions import bump_question_version, question_version
+
+# SQLite allows 999 bound variables on older builds
+BULK_CHUNK_SIZE = 500
+CACHE_MAX_ENTRIES = 5000
+CACHE_TTL_SECONDS = 300
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()
+_answer_key = {'expires_at': 0, 'entries': {}}
+_subject_ids = {}
+_cache_version = {'version': None}
+
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def unique_ids(question_ids):
+    """Drop duplicates and non-string IDs, keeping the first occurrence order"""
+    seen = set()
+    result = []
+    for question_id in question_ids:
+        if isinstance(question_id, str) and question_id not in seen:
+            seen.add(question_id)
+            result.append(question_id)
+    return result
+
+
+def _clear_locked():
+    _cache.clear()
+    _answer_key['expires_at'] = 0
+    _answer_key['entries'] = {}
+    _subject_ids.clear()
+
+
+def clear_question_cache():
+    with _cache_lock:
+        _clear_locked()
+
+
+def _sync_version():
+    """
+    Drop this worker's entries if the question version moved
+
+    Returns the token read; data loaded after reading it is stored only while
+    the caches are still on that token.
+    """
+    version = question_version()
+    with _cache_lock:
+        if _cache_version['version'] != version:
+            _clear_locked()
+            _cache_version['version'] = version
+    return version
+
+
+def _drop_question_caches():
+    mark_stale()
+    clear_question_cache()
+
+
+def questions_changed():
+    """
+    Invalidate every question cache after a question write
+
+    The model signals call this; bulk_create, queryset.update() and raw SQL
+    writers must call it themselves. The version moves inside the write's
+    transaction, while the snapshot stamp and this worker's caches are only
+    dropped once it commits, so no worker can rebuild them from the rows the
+    write is about to replace.
+    """
+    bump_question_version()
+    transaction.on_commit(_drop_question_caches)
+
+
+def _cache_get_many(question_ids):
+    now = time.monotonic()
+    found = {}
+    with _cache_lock:
+        for question_id in question_ids:
+            entry = _cache.get(question_id)
+            if entry is None:
+                continue
+            expires_at, data = entry
+            if expires_at < now:
+                del _cache[question_id]
+                continue
+            _cache.move_to_end(question_id)
+            found[question_id] = data
+    record_cache('questions', hits=len(found), misses=len(question_ids) - len(found))
+    return found
+
+
+def _cache_set_many(documents, version):
+    expires_at = time.monotonic() + CACHE_TTL_SECONDS
+    with _cache_lock:
+        if _cache_version['version'] != version:
+            return
+        for question_id, data in documents.items():
+            _cache[question_id] = (expires_at, data)
+            _cache.move_to_end(question_id)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def fetch_questions(question_ids, queryset=None):
+    """
+    Fetch serialized questions in the requested order
+
+    Args:
+        question_ids: requested question IDs (duplicates are ignored)
+        queryset: optional filtered Question queryset; filtered lookups bypass the cache
+
+    Returns:
+        tuple: (list of serialized questions in request order, list of missing IDs)
+    """
+    question_ids = unique_ids(question_ids)
+    use_cache = queryset is None
+    version = _sync_version() if use_cache else None
+    documents = _cache_get_many(question_ids) if use_cache else {}
+    base = Question.objects.order_by() if queryset is None else queryset.order_by()
+
+    pending = [question_id for question_id in question_ids if question_id not in documents]
+    loaded = {}
+    for chunk in chunked(pending):
+        for question in base.filter(question_id__in=chunk):
+            loaded[question.question_id] = dict(QuestionSerializer(question).data)
+    if use_cache and loaded:
+        _cache_set_many(loaded, version)
+    documents.update(loaded)
+
+    questions = []
+    missing = []
+    for question_id in question_ids:
+        if question_id in documents:
+            questions.append(documents[question_id])
+        else:
+            missing.append(question_id)
+    return questions, missing
+
+
+def fetch_question_ids(question_ids, queryset):
+    """IDs from question_ids that match queryset, in request order"""
+    question_ids = unique_ids(question_ids)
+    matching = set()
+    for chunk in chunked(question_ids):
+        matching.update(queryset.order_by().filter(question_id__in=chunk).values_list('question_id', flat=True))
+    return [question_id for question_id in question_ids if question_id in matching]
+
+
+def get_answer_key(question_id):
+    """
+    Grading data for one question from the in-memory answer-key map
+
+    The whole map (questionId -> correct answer, subject, topic) is loaded in
+    one query and refreshed every CACHE_TTL_SECONDS or when the question
+    version moves.
+
+    Returns:
+        dict with correct_answer, subject and topic, or None if the question does not exist
+    """
+    return _get_answer_key(question_id, _sync_version())
+
+
+def _get_answer_key(question_id, version):
+    now = time.monotonic()
+    with _cache_lock:
+        fresh = _answer_key['expires_at'] > now
+        entry = _answer_key['entries'].get(question_id) if fresh else None
+    record_cache('answer_keys', hits=entry is not None, misses=entry is None)
+    if entry is not None:
+        return entry
+
+    if fresh:
+        rows = Question.objects.filter(question_id=question_id)
+    else:
+        rows = Question.objects.all()
+    entries = {
+        row['question_id']: row
+        for row in rows.order_by().values('question_id', 'correct_answer', 'subject', 'topic')
+    }
+    with _cache_lock:
+        if _cache_version['version'] == version:
+            if fresh:
+                _answer_key['entries'].update(entries)
+            else:
+                _answer_key['entries'] = entries
+                _answer_key['expires_at'] = now + CACHE_TTL_SECONDS
+    return entries.get(question_id)
+
+
+def get_answer_keys(question_ids):
+    """
+    Grading data for many questions (see get_answer_key)
+
+    IDs missing from the in-memory map are looked up in chunks rather than one
+    query each.
+
+    Returns:
+        dict: questionId -> answer-key entry, for the IDs that exist
+    """
+    question_ids = unique_ids(question_ids)
+    if not question_ids:
+        return {}
+    version = _sync_version()
+    _get_answer_key(question_ids[0], version)  # Loads or refreshes the map
+    with _cache_lock:
+        entries = _answer_key['entries']
+        found = {question_id: entries[question_id] for question_id in question_ids if question_id in entries}
+    pending = [question_id for question_id in question_ids if question_id not in found]
+    loaded = {}
+    for chunk in chunked(pending):
+        for row in Question.objects.filter(question_id__in=chunk).order_by().values(
+                'question_id', 'correct_answer', 'subject', 'topic'):
+            loaded[row['question_id']] = row
+    if loaded:
+        with _cache_lock:
+            if _cache_version['version'] == version:
+                _answer_key['entries'].update(loaded)
+        found.update(loaded)
+    return found
+
+
+def summarize_question_ids(question_ids):
+    """Question count per subject for a list of question IDs"""
+    question_ids = unique_ids(question_ids)
+    keys = get_answer_keys(question_ids)
+    subjects = {}
+    found = 0
+    for question_id in question_ids:
+        if question_id in keys:
+            found += 1
+            subject = keys[question_id]['subject']
+            subjects[subject] = subjects.get(subject, 0) + 1
+    return {
+        'totalQuestions': len(question_ids),
+        'subjects': dict(sorted(subjects.items())),
+        'missingCount': len(question_ids) - found,
+    }
+
+
+def get_subject_question_ids(subject):
+    """
+    All question IDs of a subject, ordered like GET /questions/?subject=
+
+    Cached per subject for CACHE_TTL_SECONDS and cleared when the question
+    version moves.
+    """
+    version = _sync_version()
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _subject_ids.get(subject)
+    hit = entry is not None and entry[0] > now
+    record_cache('subject_question_ids', hits=hit, misses=not hit)
+    if hit:
+        return entry[1]
+    question_ids = list(
+        Question.objects.filter(subject=subject)
+        .order_by('subject', 'topic', 'question_id')
+        .values_list('question_id', flat=True)
+    )
+    with _cache_lock:
+        if _cache_version['version'] == version:
+            _subject_ids[subject] = (now + CACHE_TTL_SECONDS, question_ids)
+    return question_ids
@@ -0,0 +1,26 @@
+"""
+Motivational quotes for daily plans
+
+data/motivationalQuotes.json (MOTIVATIONAL_QUOTES_PATH) is the one copy of
+the list; the frontend imports the same file. Quotes are grouped by theme
+and flattened in file order. Plans generated without a client pick from it.
+"""
+import functools
+import json
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def motivational_quotes():
+    """All quotes in file order (empty if the file cannot be read)"""
+    try:
+        with open(settings.MOTIVATIONAL_QUOTES_PATH, encoding='utf-8') as f:
+            groups = json.load(f)
+    except (OSError, ValueError):
+        logger.exception('Failed to load motivational quotes from %s', settings.MOTIVATIONAL_QUOTES_PATH)
+        return ()
+    return tuple(quote for quotes in groups.values() for quote in quotes)
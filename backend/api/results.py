@@ -0,0 +1,102 @@
+"""
+Exam session results summaries
+
+When a session is completed its score, per-subject and per-topic breakdown,
+time statistics and wrong-question list are computed once and stored on the
+session, so the results screen is a single primary-key read.
+"""
+from django.utils import timezone
+
+from .models import ExamSession
+from .question_cache import get_answer_keys
+
+
+def _bucket():
+    return {'total': 0, 'answered': 0, 'correct': 0, 'wrong': 0, 'accuracy': 0}
+
+
+def _finish_bucket(bucket):
+    if bucket['answered'] > 0:
+        bucket['accuracy'] = round(bucket['correct'] / bucket['answered'] * 100, 2)
+    return bucket
+
+
+def build_results_summary(question_ids, answers, time_spent):
+    """
+    Grade a session's answers and aggregate them
+
+    Args:
+        question_ids: session question IDs in exam order
+        answers: {questionId: selected answer}
+        time_spent: {questionId: seconds}
+
+    Returns:
+        dict: compact results summary
+    """
+    answers = answers or {}
+    time_spent = time_spent or {}
+    overall = _bucket()
+    by_subject = {}
+    by_topic = {}
+    wrong_question_ids = []
+    unanswered_question_ids = []
+    missing_question_ids = []
+
+    keys = get_answer_keys(question_ids)
+    for question_id in question_ids:
+        key = keys.get(question_id)
+        if key is None:
+            missing_question_ids.append(question_id)
+            continue
+        subject = key['subject']
+        topic = key['topic'] or 'Unknown'
+        buckets = (
+            overall,
+            by_subject.setdefault(subject, _bucket()),
+            by_topic.setdefault((subject, topic), _bucket()),
+        )
+        answer = answers.get(question_id)
+        for bucket in buckets:
+            bucket['total'] += 1
+        if not answer:
+            unanswered_question_ids.append(question_id)
+            continue
+        is_correct = answer == key['correct_answer']
+        for bucket in buckets:
+            bucket['answered'] += 1
+            bucket['correct' if is_correct else 'wrong'] += 1
+        if not is_correct:
+            wrong_question_ids.append(question_id)
+
+    times = [value for value in (time_spent.get(question_id) for question_id in question_ids)
+             if isinstance(value, (int, float))]
+    total_time = sum(times)
+
+    _finish_bucket(overall)
+    return {
+        **overall,
+        'unanswered': overall['total'] - overall['answered'],
+        'score': round(overall['correct'] / overall['total'] * 100, 2) if overall['total'] else 0,
+        'time': {
+            'total': total_time,
+            'average': round(total_time / len(times), 2) if times else 0,
+            'min': min(times) if times else 0,
+            'max': max(times) if times else 0,
+        },
+        'bySubject': {subject: _finish_bucket(bucket) for subject, bucket in sorted(by_subject.items())},
+        'byTopic': [
+            {'subject': subject, 'topic': topic, **_finish_bucket(bucket)}
+            for (subject, topic), bucket in sorted(by_topic.items())
+        ],
+        'wrongQuestionIds': wrong_question_ids,
+        'unansweredQuestionIds': unanswered_question_ids,
+        'missingQuestionIds': missing_question_ids,
+        'computedAt': timezone.now().isoformat(),
+    }
+
+
+def finalize_session(session):
+    """Compute and store the results summary of a completed session"""
+    session.results = build_results_summary(session.question_ids, session.answers, session.time_spent)
+    ExamSession.objects.filter(session_id=session.session_id).update(results=session.results)
+    return session.results
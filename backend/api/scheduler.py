@@ -0,0 +1,233 @@
+"""
+Pre-generation of the next study day
+
+The study day changes at DAY_BOUNDARY_HOUR Ethiopian time. Shortly before
+that, prepare_study_day() creates the coming day's DailyPlan and warms the
+question caches so the first request of the morning does not pay for them.
+
+It runs either from `manage.py prepare_study_day` (cron / worker dyno) or,
+with STUDY_DAY_SCHEDULER_ENABLED, from a daemon thread that exam_app/wsgi.py
+starts in the web workers. Every worker warms its own in-memory caches at
+startup, but only the process holding SchedulerLock prepares the day, so
+N gunicorn workers do not race to build the plan and rewrite the shared
+snapshot and bundle files. The lock is retried before each run, so a
+surviving worker takes over when the holder exits.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, close_old_connections, connections
+
+try:
+    import fcntl
+except ImportError:  # Windows: the SQLite lock file is not available
+    fcntl = None
+
+from .bundles import get_bundle_manifest
+from .idsets import get_question_dictionary
+from .plans import ensure_daily_plan
+from .question_cache import fetch_questions, get_answer_keys, get_subject_question_ids
+from .snapshot import get_question_snapshot
+from .utils import DAY_BOUNDARY_HOUR, ETHIOPIA_TIMEZONE_OFFSET, OFFICIAL_SUBJECTS, get_ethiopian_date_key
+
+logger = logging.getLogger(__name__)
+
+
+def next_boundary(now=None):
+    """UTC datetime of the next study-day boundary after now"""
+    now = now or datetime.now(timezone.utc)
+    local = now + ETHIOPIA_TIMEZONE_OFFSET
+    boundary = local.replace(hour=DAY_BOUNDARY_HOUR, minute=0, second=0, microsecond=0)
+    if boundary <= local:
+        boundary += timedelta(days=1)
+    return boundary - ETHIOPIA_TIMEZONE_OFFSET
+
+
+def warm_caches(plan=None):
+    """Load the snapshot, ID dictionary, bundles and answer keys, plus the plan's questions"""
+    timings = {}
+
+    def timed(name, func):
+        start = datetime.now(timezone.utc)
+        try:
+            func()
+        except Exception:
+            logger.exception('Failed to warm %s', name)
+        timings[name] = round((datetime.now(timezone.utc) - start).total_seconds() * 1000, 1)
+
+    timed('snapshot', get_question_snapshot)
+    timed('dictionary', get_question_dictionary)
+    timed('bundles', get_bundle_manifest)
+    timed('subjects', lambda: [get_subject_question_ids(subject) for subject in OFFICIAL_SUBJECTS])
+    if plan is not None:
+        timed('plan', lambda: (get_answer_keys(plan.question_ids), fetch_questions(plan.question_ids)))
+    return timings
+
+
+def prepare_study_day(lead=None, date_key=None, warm=True):
+    """
+    Create the plan of the study day that is current `lead` from now and warm caches
+
+    Args:
+        lead: timedelta added to now before taking the date key (default: the scheduler lead)
+        date_key: explicit dateKey, overrides lead
+        warm: also warm caches
+
+    Returns:
+        dict: dateKey, created, focusSubject and cache warm-up timings (ms)
+    """
+    if date_key is None:
+        lead = lead if lead is not None else timedelta(minutes=settings.STUDY_DAY_SCHEDULER_LEAD_MINUTES)
+        date_key = get_ethiopian_date_key(datetime.now(timezone.utc) + lead)
+    plan, created = ensure_daily_plan(date_key)
+    return {
+        'dateKey': date_key,
+        'created': created,
+        'focusSubject': plan.focus_subject,
+        'warmed': warm_caches(plan) if warm else {},
+    }
+
+
+# pg_try_advisory_lock key of the study-day scheduler
+SCHEDULER_LOCK_KEY = 0x53545544
+
+
+class SchedulerLock:
+    """
+    Process-lifetime lock electing one study-day scheduler per database
+
+    PostgreSQL: a session advisory lock held on a dedicated connection (this
+    needs a session-mode connection, not a transaction pooler). SQLite: an
+    flock on `path` (default: a file next to the database). In-memory SQLite
+    and other backends are not guarded. Only used from the scheduler thread.
+    """
+
+    def __init__(self, alias=DEFAULT_DB_ALIAS, path=None):
+        self.alias = alias
+        self.path = path
+        self._connection = None
+        self._file = None
+
+    def acquire(self):
+        """Take the lock without blocking, or check that it is still held; True if this process holds it"""
+        connection = connections[self.alias]
+        if connection.vendor == 'postgresql':
+            return self._acquire_advisory()
+        if connection.vendor == 'sqlite' and fcntl is not None and not connection.is_in_memory_db():
+            return self._acquire_file()
+        return True
+
+    def _acquire_advisory(self):
+        if self._connection is not None:
+            try:
+                with self._connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                return True
+            except DatabaseError:
+                # The lock went with the connection; another worker may hold it now
+                logger.warning('Scheduler lock connection lost, trying to take the lock again')
+                self._close_connection()
+        connection = connections[self.alias].copy()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [SCHEDULER_LOCK_KEY])
+                acquired = cursor.fetchone()[0]
+        except DatabaseError:
+            logger.exception('Failed to take the scheduler lock')
+            acquired = False
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def _close_connection(self):
+        try:
+            self._connection.close()
+        except DatabaseError:
+            pass
+        self._connection = None
+
+    def _acquire_file(self):
+        if self._file is not None:
+            return True
+        path = self.path or f"{connections[self.alias].settings_dict['NAME']}.scheduler.lock"
+        handle = open(path, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._file = handle
+        return True
+
+
+class StudyDayScheduler:
+    """Daemon thread that runs prepare_study_day() once per day, `lead` before the boundary"""
+
+    def __init__(self, lead):
+        self.lead = lead
+        self.lock = SchedulerLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_result = None
+
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        run_at = next_boundary(now) - self.lead
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        return (run_at - now).total_seconds()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='study-day-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run_once(self):
+        try:
+            # Key the plan on the coming boundary so an early or late wake-up still targets it
+            self.last_result = prepare_study_day(date_key=get_ethiopian_date_key(next_boundary()))
+            logger.info('Prepared study day %s', self.last_result)
+        except Exception:
+            logger.exception('Failed to prepare the next study day')
+        finally:
+            close_old_connections()
+
+    def _run(self):
+        # Warm this worker right away, then prepare each coming day ahead of the boundary
+        try:
+            warm_caches()
+        except Exception:
+            logger.exception('Failed to warm caches at startup')
+        finally:
+            close_old_connections()
+        while not self._stop.wait(self.seconds_until_next_run()):
+            self._tick()
+
+    def _tick(self):
+        if self.lock.acquire():
+            self._run_once()
+        else:
+            logger.info('Study day preparation left to the process holding the scheduler lock')
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Start this process's scheduler when STUDY_DAY_SCHEDULER_ENABLED is set"""
+    global _scheduler
+    if not getattr(settings, 'STUDY_DAY_SCHEDULER_ENABLED', False):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = StudyDayScheduler(timedelta(minutes=settings.STUDY_DAY_SCHEDULER_LEAD_MINUTES))
+            _scheduler.start()
+    return _scheduler
@@ -0,0 +1,173 @@
+"""
+Subject weakness scoring
+
+One implementation of the focus-subject formulas used by daily plans and
+priority seeding:
+
+- weakness score: (100 - accuracy) * log1p(totalAttempted)
+- priority boost: (15 - priorityOrder) * 2
+- focus pick: 60% / 30% / 10% among the three highest focus scores
+
+Per-subject attempt stats are computed with one grouped aggregate and cached
+in-process against the attempt version token (DataVersion 'attempts'), which
+every attempt write bumps. Priorities are applied per call, so reordering
+or completing subjects needs no invalidation.
+"""
+import math
+import random
+import threading
+
+from django.db.models import Count, Q
+
+from .metrics import record_cache
+from .models import Attempt, SubjectPriority
+from .utils import OFFICIAL_SUBJECTS
+from .versions import ATTEMPTS_VERSION, bump_version, current_version
+
+NO_ATTEMPTS_WEAKNESS = 1000  # Seeding puts subjects without attempts first
+FOCUS_WEIGHTS = (0.6, 0.3, 0.1)
+
+_stats_lock = threading.Lock()
+_stats_cache = {}
+
+
+def attempt_version():
+    """Current attempt version token (0 before the first attempt write)"""
+    return current_version(ATTEMPTS_VERSION)
+
+
+def bump_attempt_version():
+    """Invalidate everything cached against the attempt version"""
+    bump_version(ATTEMPTS_VERSION)
+
+
+def weakness_score(accuracy, total_attempted):
+    return (100 - accuracy) * math.log1p(total_attempted)
+
+
+def priority_boost(priority_order):
+    return (15 - priority_order) * 2
+
+
+def _load_subject_stats():
+    rows = (Attempt.objects.values('subject')
+            .annotate(total=Count('attempt_id'), correct=Count('attempt_id', filter=Q(is_correct=True)))
+            .order_by())
+    stats = {}
+    for row in rows:
+        accuracy = round(row['correct'] / row['total'] * 100, 2) if row['total'] > 0 else 0
+        stats[row['subject']] = {
+            'totalAttempted': row['total'],
+            'correctCount': row['correct'],
+            'accuracy': accuracy,
+            'weaknessScore': weakness_score(accuracy, row['total']),
+        }
+    return stats
+
+
+def subject_stats(subjects=None):
+    """
+    Attempt totals, accuracy and weakness score per subject
+
+    Args:
+        subjects: limit the result to these subjects (default: every attempted subject)
+
+    Returns:
+        dict: subject -> {totalAttempted, correctCount, accuracy, weaknessScore}, attempted subjects only
+    """
+    # Read the token first: stats computed after it are at least as new as the version they are cached under
+    version = attempt_version()
+    with _stats_lock:
+        cached = _stats_cache.get('stats') if _stats_cache.get('version') == version else None
+    record_cache('subject_stats', hits=cached is not None, misses=cached is None)
+    if cached is None:
+        cached = _load_subject_stats()
+        with _stats_lock:
+            _stats_cache.update(version=version, stats=cached)
+    if subjects is None:
+        return dict(cached)
+    return {subject: cached[subject] for subject in subjects if subject in cached}
+
+
+def seeding_order(subjects=OFFICIAL_SUBJECTS):
+    """Subjects ordered weakest first, subjects without attempts before all others"""
+    stats = subject_stats(subjects)
+    scores = {subject: stats[subject]['weaknessScore'] if subject in stats else NO_ATTEMPTS_WEAKNESS
+              for subject in subjects}
+    return sorted(subjects, key=lambda subject: scores[subject], reverse=True)
+
+
+def focus_scores(subjects=OFFICIAL_SUBJECTS, priorities=None):
+    """
+    Focus score of every attempted subject that is not completed, highest first
+
+    Returns:
+        list: dicts with subject, stats, priorityOrder, priorityBoost and score
+    """
+    if priorities is None:
+        priorities = list(SubjectPriority.objects.all().order_by('priority_order', 'subject'))
+    completed = {p.subject for p in priorities if p.is_completed}
+    priority_map = {p.subject: p.priority_order for p in priorities}
+    stats = subject_stats(subjects)
+    scores = []
+    for subject in subjects:
+        stat = stats.get(subject)
+        if stat is None or stat['totalAttempted'] == 0 or subject in completed:
+            continue
+        boost = priority_boost(priority_map.get(subject, 999))
+        scores.append({
+            'subject': subject,
+            **stat,
+            'priorityOrder': priority_map.get(subject),
+            'priorityBoost': boost,
+            'score': stat['weaknessScore'] + boost,
+        })
+    # Stable sort on score only, like Array.prototype.sort in the client
+    scores.sort(key=lambda item: item['score'], reverse=True)
+    return scores
+
+
+def focus_candidates(scores):
+    """The top three subjects with the probability select_focus_subject gives each"""
+    top = [item['subject'] for item in scores[:3]]
+    if not top:
+        return []
+    weights = [FOCUS_WEIGHTS[0], 0, 0][:len(top)]
+    if len(top) > 1:
+        weights[1] = FOCUS_WEIGHTS[1]
+    if len(top) > 2:
+        weights[2] = FOCUS_WEIGHTS[2]
+    else:
+        weights[0] += 1 - sum(weights)  # Missing ranks fall back to the top subject
+    return [{'subject': subject, 'weight': round(weight, 2)} for subject, weight in zip(top, weights)]
+
+
+def select_focus_subject(subjects=OFFICIAL_SUBJECTS, rng=random):
+    """
+    Select the focus subject using priorities and weakness scores
+
+    Top priority subjects get more consideration, but not always #1.
+
+    Args:
+        subjects: subjects eligible for stats-based selection
+        rng: random source for the weighted pick among the top three
+
+    Returns:
+        str or None
+    """
+    priorities = list(SubjectPriority.objects.all().order_by('priority_order', 'subject'))
+    scores = focus_scores(subjects, priorities)
+    if not scores:
+        first_active = next((p for p in priorities if not p.is_completed), None)
+        return first_active.subject if first_active else None
+
+    # 60% chance for #1, 30% for #2, 10% for #3
+    top = [item['subject'] for item in scores[:3]]
+    rand = rng.random()
+    if rand < FOCUS_WEIGHTS[0]:
+        return top[0]
+    if rand < FOCUS_WEIGHTS[0] + FOCUS_WEIGHTS[1] and len(top) > 1:
+        return top[1]
+    if len(top) > 2:
+        return top[2]
+    return top[0]
@@ -1,5 +1,23 @@
 from rest_framework import serializers
 from .models import Question, Exam, Attempt, ExamSession, DailyPlan, ThemePreferences, SubjectPriority
+from .idsets import encode_id_list, get_question_dictionary, wants_compact_ids
+
+
+class QuestionIdListField(serializers.ListField):
+    """Ordered list of question IDs, sent in compact form when the client negotiated it"""
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child', serializers.CharField())
+        super().__init__(**kwargs)
+    
+    def to_representation(self, data):
+        question_ids = super().to_representation(data)
+        if wants_compact_ids(self.context.get('request')):
+            # Resolve the dictionary once per response, not once per row
+            if 'question_dictionary' not in self.context:
+                self.context['question_dictionary'] = get_question_dictionary()
+            return encode_id_list(question_ids, ordered=True, dictionary=self.context['question_dictionary'])
+        return question_ids
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -28,7 +46,7 @@ class QuestionSerializer(serializers.ModelSerializer):
 
 class ExamSerializer(serializers.ModelSerializer):
     examId = serializers.CharField(source='exam_id', read_only=True)
-    questionIds = serializers.ListField(source='question_ids', child=serializers.CharField())
+    questionIds = QuestionIdListField(source='question_ids')
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     
     class Meta:
@@ -36,8 +54,15 @@ class ExamSerializer(serializers.ModelSerializer):
         fields = ['examId', 'title', 'questionIds', 'createdAt']
 
 
+def attempt_id_for_key(idempotency_key):
+    """Derive a stable attempt ID from a client idempotency key"""
+    import hashlib
+    return f"attempt_{hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()[:16]}"
+
+
 class AttemptSerializer(serializers.ModelSerializer):
     attemptId = serializers.CharField(source='attempt_id', read_only=True)
+    idempotencyKey = serializers.CharField(write_only=True, required=False, max_length=255)
     questionId = serializers.CharField(source='question_id')
     selectedAnswer = serializers.CharField(source='selected_answer')
     isCorrect = serializers.BooleanField(source='is_correct')
@@ -47,11 +72,17 @@ class AttemptSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Attempt
-        fields = ['attemptId', 'questionId', 'selectedAnswer', 'isCorrect', 'timeSpent', 
+        fields = ['attemptId', 'idempotencyKey', 'questionId', 'selectedAnswer', 'isCorrect', 'timeSpent', 
                   'subject', 'topic', 'examId', 'mode', 'planDateKey', 'timestamp']
         read_only_fields = ['attemptId', 'timestamp']
     
     def create(self, validated_data):
+        # Retries with the same idempotency key return the original attempt
+        idempotency_key = validated_data.pop('idempotencyKey', None)
+        if idempotency_key:
+            attempt_id = attempt_id_for_key(idempotency_key)
+            attempt, created = Attempt.objects.get_or_create(attempt_id=attempt_id, defaults=validated_data)
+            return attempt
         # Generate attempt_id if not provided
         import uuid
         attempt_id = f"attempt_{uuid.uuid4().hex[:16]}"
@@ -59,11 +90,26 @@ class AttemptSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class AttemptBatchItemSerializer(AttemptSerializer):
+    """One attempt in a batch upload: idempotency key required, original timestamp kept"""
+    idempotencyKey = serializers.CharField(write_only=True, max_length=255)
+    timestamp = serializers.DateTimeField(required=False)
+    
+    class Meta(AttemptSerializer.Meta):
+        read_only_fields = ['attemptId']
+    
+    def to_attempt(self):
+        """Build an unsaved Attempt from validated data"""
+        data = dict(self.validated_data)
+        data['attempt_id'] = attempt_id_for_key(data.pop('idempotencyKey'))
+        return Attempt(**data)
+
+
 class ExamSessionSerializer(serializers.ModelSerializer):
     sessionId = serializers.CharField(source='session_id', read_only=True)
     examId = serializers.CharField(source='exam_id', required=False, allow_blank=True, allow_null=True)
     currentIndex = serializers.IntegerField(source='current_index')
-    questionIds = serializers.ListField(source='question_ids', child=serializers.CharField())
+    questionIds = QuestionIdListField(source='question_ids')
     isComplete = serializers.BooleanField(source='is_complete')
     isPaused = serializers.BooleanField(source='is_paused')
     timeSpent = serializers.DictField(source='time_spent', child=serializers.IntegerField())
@@ -76,8 +122,8 @@ class ExamSessionSerializer(serializers.ModelSerializer):
         model = ExamSession
         fields = ['sessionId', 'examId', 'mode', 'config', 'currentIndex', 'questionIds', 
                   'answers', 'timeSpent', 'isComplete', 'isPaused', 'timePerQuestion', 
-                  'planDateKey', 'startedAt', 'lastUpdated']
-        read_only_fields = ['sessionId', 'startedAt', 'lastUpdated']
+                  'planDateKey', 'version', 'startedAt', 'lastUpdated']
+        read_only_fields = ['sessionId', 'version', 'startedAt', 'lastUpdated']
     
     def create(self, validated_data):
         # Generate session_id if not provided
@@ -93,7 +139,7 @@ class DailyPlanSerializer(serializers.ModelSerializer):
     focusSubject = serializers.CharField(source='focus_subject')
     totalAvailableInSubject = serializers.IntegerField(source='total_available_in_subject')
     maxPlannedQuestions = serializers.IntegerField(source='max_planned_questions')
-    questionIds = serializers.ListField(source='question_ids', child=serializers.CharField())
+    questionIds = QuestionIdListField(source='question_ids')
     answeredCount = serializers.IntegerField(source='answered_count')
     correctCount = serializers.IntegerField(source='correct_count')
     wrongCount = serializers.IntegerField(source='wrong_count')
@@ -0,0 +1,109 @@
+"""
+Slim exam session projections and expiry of abandoned sessions
+
+Session rows carry the full question list, answers, time spent and config as
+JSON. Listings such as the resume cards only need a handful of columns, so
+summaries select those plus the answer/question counts computed in SQL.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+
+from .models import ExamSession
+from .progress import JSONLength
+
+SUMMARY_COLUMNS = ['session_id', 'exam_id', 'mode', 'current_index', 'is_complete', 'is_paused',
+                   'plan_date_key', 'started_at', 'last_updated']
+
+
+def expiry_cutoff(days=None):
+    """last_updated before which an incomplete session counts as abandoned (None when expiry is disabled)"""
+    days = settings.SESSION_INCOMPLETE_EXPIRY_DAYS if days is None else days
+    if days <= 0:
+        return None
+    return timezone.now() - timedelta(days=days)
+
+
+def summary_queryset(queryset):
+    """Values queryset with only the columns needed by session_summary()"""
+    if connection.vendor in ('sqlite', 'postgresql'):
+        return queryset.annotate(
+            answered_count=JSONLength('answers', kind='object'),
+            total_questions=JSONLength('question_ids'),
+            config_subject=KeyTransform('subject', 'config'),
+            config_topics=KeyTransform('topics', 'config'),
+        ).values(*SUMMARY_COLUMNS, 'answered_count', 'total_questions', 'config_subject', 'config_topics')
+    # Counted in Python where the JSON length expression is not available
+    return queryset.values(*SUMMARY_COLUMNS, 'answers', 'question_ids', 'config')
+
+
+def session_summary(row):
+    """
+    Resume-card summary of one summary_queryset() row
+
+    Returns:
+        dict: sessionId, examId, mode, answeredCount, totalQuestions,
+        config (subject/topics only) and timestamps
+    """
+    if 'answers' in row:
+        config = row['config'] or {}
+        row = {
+            **row,
+            'answered_count': len(row['answers'] or {}),
+            'total_questions': len(row['question_ids'] or []),
+            'config_subject': config.get('subject'),
+            'config_topics': config.get('topics'),
+        }
+    return {
+        'sessionId': row['session_id'],
+        'examId': row['exam_id'],
+        'mode': row['mode'],
+        'currentIndex': row['current_index'],
+        'answeredCount': row['answered_count'],
+        'totalQuestions': row['total_questions'],
+        'isComplete': row['is_complete'],
+        'isPaused': row['is_paused'],
+        'planDateKey': row['plan_date_key'],
+        'config': {'subject': row['config_subject'], 'topics': row['config_topics'] or []},
+        'startedAt': row['started_at'],
+        'lastUpdated': row['last_updated'],
+    }
+
+
+def session_summaries(queryset):
+    """Summaries for every session in queryset"""
+    return [session_summary(row) for row in summary_queryset(queryset)]
+
+
+def incomplete_sessions(limit=None):
+    """Most recently updated incomplete sessions that are neither archived nor expired"""
+    queryset = ExamSession.objects.filter(is_complete=False, archived_at__isnull=True)
+    cutoff = expiry_cutoff()
+    if cutoff is not None:
+        queryset = queryset.filter(last_updated__gte=cutoff)
+    limit = settings.SESSION_INCOMPLETE_LIST_LIMIT if limit is None else limit
+    return session_summaries(queryset.order_by('-last_updated')[:limit])
+
+
+def expire_sessions(days=None, delete=False, dry_run=False):
+    """
+    Archive (or delete) incomplete sessions not updated for `days` days
+
+    Returns:
+        int: number of sessions affected
+    """
+    cutoff = expiry_cutoff(days)
+    if cutoff is None:
+        return 0
+    stale = ExamSession.objects.filter(is_complete=False, last_updated__lt=cutoff)
+    if not delete:
+        stale = stale.filter(archived_at__isnull=True)
+    if dry_run:
+        return stale.count()
+    if delete:
+        return stale.delete()[0]
+    # update() leaves last_updated (auto_now) untouched
+    return stale.update(archived_at=timezone.now())
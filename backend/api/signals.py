@@ -0,0 +1,34 @@
+"""
+Model signal handlers
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .exams import resync_exam_questions
+from .models import Attempt, Exam, Question
+from .question_cache import questions_changed
+from .scoring import bump_attempt_version
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, **kwargs):
+    """Invalidate the shared question snapshot and local caches once the change commits"""
+    questions_changed()
+
+
+@receiver(post_save, sender=Attempt)
+@receiver(post_delete, sender=Attempt)
+def attempt_changed(sender, **kwargs):
+    """Move the attempt version so cached subject scores are recomputed"""
+    bump_attempt_version()
+
+
+@receiver(post_save, sender=Exam)
+def exam_changed(sender, instance, update_fields=None, **kwargs):
+    """Mirror the exam's question_ids into ExamQuestion once the save commits"""
+    if update_fields is not None and 'question_ids' not in update_fields:
+        return
+    exam_id = instance.exam_id
+    transaction.on_commit(lambda: resync_exam_questions(exam_id))
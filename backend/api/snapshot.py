@@ -0,0 +1,215 @@
+"""
+Memory-mapped question bank snapshot
+
+The question bank is read far more often than it changes, so the serialized
+questions are written to a single file that every gunicorn worker maps
+read-only. Reads are then served straight from the page cache.
+
+File layout:
+    8 bytes   magic (QSNAP001)
+    4 bytes   header length (uint32, little endian)
+    header    JSON: stamp, version, order, offsets, subject/topic indexes
+    data      concatenated question JSON documents
+
+Any change to a question rewrites the stamp file; a snapshot whose stamp does
+not match is stale and gets rebuilt (written to a temp file and renamed into
+place, so readers never see a partial file).
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import uuid
+
+from django.conf import settings
+
+MAGIC = b'QSNAP001'
+HEADER_LENGTH = struct.Struct('<I')
+
+_snapshot_lock = threading.Lock()
+_current = {'snapshot': None}
+
+
+def snapshot_enabled():
+    return getattr(settings, 'QUESTION_SNAPSHOT_ENABLED', False)
+
+
+def snapshot_path():
+    return str(settings.QUESTION_SNAPSHOT_PATH)
+
+
+def stamp_path():
+    return f'{snapshot_path()}.stamp'
+
+
+def _atomic_write(path, payload):
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_stamp():
+    try:
+        with open(stamp_path(), 'rb') as f:
+            return f.read().decode('ascii')
+    except FileNotFoundError:
+        return None
+
+
+def mark_stale():
+    """Invalidate the snapshot for all workers (called whenever questions change)"""
+    if not snapshot_enabled():
+        return
+    try:
+        _atomic_write(stamp_path(), uuid.uuid4().hex.encode('ascii'))
+    except OSError:
+        # Without a writable stamp we cannot trust any snapshot
+        if os.path.exists(snapshot_path()):
+            os.unlink(snapshot_path())
+
+
+class QuestionSnapshot:
+    """Read-only view over a mapped snapshot file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.file_id = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a question snapshot')
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+        self.data_start = header_start + header_length
+        self.stamp = header['stamp']
+        self.version = header['version']
+        self.order = header['order']
+        self.offsets = header['offsets']
+        self.subjects = header['subjects']
+        self.topics = header['topics']
+        self.positions = {question_id: idx for idx, question_id in enumerate(self.order)}
+        self._view = memoryview(self._mmap)
+
+    def __len__(self):
+        return len(self.order)
+
+    def document(self, question_id):
+        """Serialized question JSON as a zero-copy memoryview (None if unknown)"""
+        offset = self.offsets.get(question_id)
+        if offset is None:
+            return None
+        start = self.data_start + offset[0]
+        return self._view[start:start + offset[1]]
+
+    def filter_ids(self, subject=None, topic=None):
+        """Question IDs in list order, optionally filtered by subject and topic"""
+        if subject is None and topic is None:
+            return self.order
+        positions = None
+        if subject is not None:
+            positions = self.subjects.get(subject, [])
+        if topic is not None:
+            topic_positions = self.topics.get(topic, [])
+            if positions is None:
+                positions = topic_positions
+            else:
+                topic_set = set(topic_positions)
+                positions = [pos for pos in positions if pos in topic_set]
+        return [self.order[pos] for pos in positions]
+
+    def render(self, question_ids):
+        """JSON array of the given questions (unknown IDs are skipped)"""
+        documents = [self.document(question_id) for question_id in question_ids]
+        return b'[' + b','.join(doc for doc in documents if doc is not None) + b']'
+
+
+def build_snapshot(path=None):
+    """
+    Serialize the whole question bank into a snapshot file
+
+    Returns:
+        dict: version, question count and file size of the new snapshot
+    """
+    from .models import Question
+    from .serializers import QuestionSerializer
+
+    path = path or snapshot_path()
+    # Read the stamp before the questions so a concurrent change leaves us stale
+    stamp = read_stamp()
+    if stamp is None:
+        stamp = uuid.uuid4().hex
+        _atomic_write(stamp_path(), stamp.encode('ascii'))
+
+    questions = Question.objects.order_by('subject', 'topic', 'question_id')
+    data = bytearray()
+    order = []
+    offsets = {}
+    subjects = {}
+    topics = {}
+    digest = hashlib.sha1()
+    for position, question in enumerate(questions.iterator()):
+        document = json.dumps(QuestionSerializer(question).data, separators=(',', ':')).encode('utf-8')
+        offsets[question.question_id] = [len(data), len(document)]
+        data += document
+        digest.update(document)
+        order.append(question.question_id)
+        subjects.setdefault(question.subject, []).append(position)
+        if question.topic is not None:
+            topics.setdefault(question.topic, []).append(position)
+
+    version = digest.hexdigest()[:16]
+    header = json.dumps({
+        'stamp': stamp,
+        'version': version,
+        'order': order,
+        'offsets': offsets,
+        'subjects': subjects,
+        'topics': topics,
+    }, separators=(',', ':')).encode('utf-8')
+    _atomic_write(path, MAGIC + HEADER_LENGTH.pack(len(header)) + header + bytes(data))
+    return {'version': version, 'questions': len(order), 'bytes': os.path.getsize(path)}
+
+
+def get_question_snapshot():
+    """
+    Return the current snapshot for this worker, rebuilding it if stale
+
+    Returns None when snapshots are disabled or cannot be built, in which case
+    callers fall back to the database.
+    """
+    if not snapshot_enabled():
+        return None
+    path = snapshot_path()
+    stamp = read_stamp()
+    snapshot = _current['snapshot']
+    try:
+        file_id = os.stat(path).st_ino
+    except FileNotFoundError:
+        file_id = None
+    if snapshot is not None and snapshot.file_id == file_id and snapshot.stamp == stamp:
+        return snapshot
+
+    with _snapshot_lock:
+        try:
+            snapshot = QuestionSnapshot(path) if file_id is not None else None
+            if snapshot is None or stamp is None or snapshot.stamp != stamp:
+                build_snapshot(path)
+                snapshot = QuestionSnapshot(path)
+        except (OSError, ValueError):
+            return None
+        _current['snapshot'] = snapshot
+    return snapshot
@@ -0,0 +1,14 @@
+"""Shared test helpers"""
+from api import idsets, question_cache
+
+
+def reset_question_caches():
+    """
+    Forget every per-process question cache
+
+    DataVersion rows roll back with each test, so a version token can repeat
+    across tests with different questions behind it.
+    """
+    question_cache.clear_question_cache()
+    question_cache._cache_version['version'] = None
+    idsets._dictionary_cache.update(version=None, dictionary=None)
@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Attempt, DailyPlan, ExamSession, Question
+from api.progress import SessionNotFound
+from api.serializers import attempt_id_for_key
+
+from .helpers import reset_question_caches
+
+
+def batch_item(key, question_id='q1', **extra):
+    item = {'questionId': question_id, 'selectedAnswer': 'A', 'isCorrect': True, 'timeSpent': 5,
+            'subject': 'Math', 'idempotencyKey': key}
+    item.update(extra)
+    return item
+
+
+class AttemptBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post_batch(self, attempts):
+        return self.client.post('/api/attempts/batch/', {'attempts': attempts}, format='json')
+
+    def test_retried_batch_creates_nothing(self):
+        attempts = [batch_item('s1:q1'), batch_item('s1:q2', question_id='q2')]
+        first = self.post_batch(attempts)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((first.data['created'], first.data['duplicates']), (2, 0))
+
+        retry = self.post_batch(attempts)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual((retry.data['created'], retry.data['duplicates']), (0, 2))
+        self.assertEqual(retry.data['attemptIds'], first.data['attemptIds'])
+        self.assertEqual(Attempt.objects.count(), 2)
+
+    def test_repeated_key_within_a_batch_counts_once(self):
+        response = self.post_batch([batch_item('s1:q1'), batch_item('s1:q1')])
+        self.assertEqual((response.data['created'], response.data['duplicates']), (1, 1))
+        self.assertEqual(list(Attempt.objects.values_list('attempt_id', flat=True)), [attempt_id_for_key('s1:q1')])
+
+    def test_unkeyed_items_are_rejected(self):
+        unkeyed = batch_item('unused')
+        del unkeyed['idempotencyKey']
+        response = self.post_batch([unkeyed, batch_item('s1:q2', question_id='q2')])
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0])
+        self.assertIn('idempotencyKey', response.data['errors'][0]['error'])
+
+    def test_client_timestamp_is_kept(self):
+        self.post_batch([batch_item('s1:q1', timestamp='2026-01-15T08:30:00Z')])
+        self.assertEqual(Attempt.objects.get().timestamp.isoformat(), '2026-01-15T08:30:00+00:00')
+
+    def test_batch_size_is_limited(self):
+        with mock.patch('api.views.ATTEMPT_BATCH_LIMIT', 2):
+            response = self.post_batch([batch_item(f'k{n}') for n in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post_batch([]).status_code, 400)
+        self.assertFalse(Attempt.objects.exists())
+
+    def test_single_post_with_a_key_returns_the_original(self):
+        first = self.client.post('/api/attempts/', batch_item('s1:q1'), format='json')
+        retry = self.client.post('/api/attempts/', batch_item('s1:q1', selectedAnswer='B'), format='json')
+        self.assertEqual(retry.data['attemptId'], first.data['attemptId'])
+        self.assertEqual(Attempt.objects.get().selected_answer, 'A')
+
+
+class AnswerEndpointTests(TestCase):
+    def setUp(self):
+        reset_question_caches()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            for question_id in ('q1', 'q2'):
+                Question.objects.create(question_id=question_id, question=f'{question_id}?', choices=['A', 'B'],
+                                        correct_answer='A', subject='Math', topic='Algebra')
+        self.plan = DailyPlan.objects.create(date_key='2026-01-15', focus_subject='Math', question_ids=['q1', 'q2'])
+        ExamSession.objects.create(session_id='s1', mode='daily', question_ids=['q1', 'q2'],
+                                   plan_date_key='2026-01-15')
+
+    def answer(self, question_id='q1', answer='A', session_id='s1', **extra):
+        return self.client.post(f'/api/sessions/{session_id}/answer/',
+                                {'questionId': question_id, 'answer': answer, 'timeSpent': 7, **extra}, format='json')
+
+    def test_grades_records_and_merges_in_one_call(self):
+        response = self.answer(answer='B', currentIndex=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attempt']['isCorrect'], False)
+        self.assertEqual(response.data['attempt']['correctAnswer'], 'A')
+        self.assertEqual(response.data['plan']['answeredCount'], 1)
+        self.assertEqual(response.data['plan']['correctCount'], 0)
+
+        session = ExamSession.objects.get(session_id='s1')
+        self.assertEqual((session.answers, session.time_spent, session.current_index), ({'q1': 'B'}, {'q1': 7}, 1))
+        attempt = Attempt.objects.get()
+        self.assertEqual(attempt.attempt_id, attempt_id_for_key('s1:q1'))
+        self.assertEqual((attempt.subject, attempt.topic, attempt.plan_date_key), ('Math', 'Algebra', '2026-01-15'))
+
+    def test_changed_answer_updates_the_same_attempt(self):
+        self.answer(answer='B')
+        response = self.answer(answer='A')
+        self.assertEqual(response.data['plan']['correctCount'], 1)
+        self.assertEqual(Attempt.objects.count(), 1)
+        self.assertTrue(Attempt.objects.get().is_correct)
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.answered_count, self.plan.correct_count), (1, 1))
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.answer(answer='').status_code, 400)
+        self.assertEqual(self.answer(currentIndex='1').status_code, 400)
+        self.assertEqual(self.answer(question_id='missing').status_code, 404)
+        self.assertEqual(self.answer(session_id='missing').status_code, 404)
+        self.assertFalse(Attempt.objects.exists())
+
+    def test_session_deleted_mid_answer_rolls_the_attempt_back(self):
+        with mock.patch('api.views.merge_progress', side_effect=SessionNotFound('s1')):
+            response = self.answer()
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Attempt.objects.exists())
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.answered_count, 0)
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from api import bundles
+from api.bundles import get_bundle_manifest, prune_bundles, read_bundle
+from api.models import Question
+
+from .helpers import reset_question_caches
+
+
+class BundleTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(QUESTION_BUNDLE_DIR=directory.name, QUESTION_BUNDLE_GRACE_SECONDS=60)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_question_caches()
+        bundles._manifest_cache.update(version=None, manifest=None)
+        self.addCleanup(bundles._manifest_cache.update, version=None, manifest=None)
+
+    def add_question(self, question_id, subject='Math', text='1 + 1?'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Question.objects.create(question_id=question_id, question=text, choices=['1', '2'],
+                                           correct_answer='2', subject=subject)
+
+    def bundle_ids(self, descriptor):
+        content = gzip.decompress(read_bundle(descriptor['hash'], 'gz'))
+        return [question['questionId'] for question in json.loads(content)]
+
+
+class BundleInvalidationTests(BundleTestCase):
+    def test_question_write_publishes_new_bundles(self):
+        self.add_question('q1')
+        first = get_bundle_manifest()
+        self.assertIs(get_bundle_manifest(), first)
+        self.assertEqual(self.bundle_ids(first['bank']), ['q1'])
+
+        self.add_question('q2', subject='Physics')
+        second = get_bundle_manifest()
+        self.assertNotEqual(second['bank']['hash'], first['bank']['hash'])
+        self.assertEqual(self.bundle_ids(second['bank']), ['q1', 'q2'])
+        self.assertEqual(self.bundle_ids(second['subjects']['Physics']), ['q2'])
+        # Unchanged subjects keep their hash, so clients keep their cached copy
+        self.assertEqual(second['subjects']['Math']['hash'], first['subjects']['Math']['hash'])
+
+    def test_previous_bank_stays_downloadable(self):
+        self.add_question('q1')
+        first = get_bundle_manifest()
+        self.add_question('q2')
+        get_bundle_manifest()
+        response = self.client.get(f'/api{first["bank"]["path"]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class PruneBundlesTests(BundleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_question('q1')
+        self.old = get_bundle_manifest()
+        self.add_question('q2')
+        self.new = get_bundle_manifest()
+        self.old_hash = self.old['bank']['hash']
+
+    def test_retired_bundles_are_kept_for_the_grace_period(self):
+        retired_at = bundles._read_retired()[self.old_hash]
+        prune_bundles(self.new, now=retired_at + 59)
+        self.assertIsNotNone(read_bundle(self.old_hash, 'gz'))
+
+        prune_bundles(self.new, now=retired_at + 60)
+        self.assertIsNone(read_bundle(self.old_hash, 'gz'))
+        self.assertNotIn(self.old_hash, bundles._read_retired())
+        self.assertIsNotNone(read_bundle(self.new['bank']['hash'], 'gz'))
+
+    def test_hash_back_in_the_manifest_is_not_deleted(self):
+        retired_at = bundles._read_retired()[self.old_hash]
+        prune_bundles(self.old, now=retired_at + 30)
+        self.assertNotIn(self.old_hash, bundles._read_retired())
+        prune_bundles(self.old, now=retired_at + 3600)
+        self.assertIsNotNone(read_bundle(self.old_hash, 'gz'))
+
+    def test_temporary_files_are_left_alone(self):
+        path = os.path.join(bundles.bundle_dir(), '.tmp-upload')
+        open(path, 'wb').close()
+        prune_bundles(self.new, now=float('inf'))
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,79 @@
+import base64
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from api import idsets
+from api.idsets import QuestionDictionary, decode_id_list, encode_id_list, get_question_dictionary
+from api.models import Question
+
+BANK = [f'q_{i:016x}' for i in range(500)]
+
+
+class IdSetCodecTests(SimpleTestCase):
+    def setUp(self):
+        self.dictionary = QuestionDictionary(BANK)
+
+    def round_trip(self, question_ids, ordered):
+        payload = encode_id_list(question_ids, ordered=ordered, dictionary=self.dictionary)
+        return payload, decode_id_list(payload, dictionary=self.dictionary)
+
+    def test_ordered_lists_keep_their_order(self):
+        question_ids = random.Random(7).sample(BANK, 60)
+        payload, decoded = self.round_trip(question_ids, ordered=True)
+        self.assertEqual(payload['encoding'], 'zigzag-delta-varint')
+        self.assertEqual(decoded, question_ids)
+
+    def test_sparse_sets_use_delta_varints(self):
+        question_ids = [BANK[5], BANK[400], BANK[120], BANK[5]]
+        payload, decoded = self.round_trip(question_ids, ordered=False)
+        self.assertEqual(payload['encoding'], 'delta-varint')
+        self.assertEqual(payload['count'], 3)
+        self.assertEqual(decoded, sorted(set(question_ids)))
+
+    def test_dense_sets_use_a_bitmap(self):
+        question_ids = BANK[::2]
+        payload, decoded = self.round_trip(question_ids, ordered=False)
+        self.assertEqual(payload['encoding'], 'bitmap')
+        self.assertEqual(len(base64.b64decode(payload['data'])), 63)
+        self.assertEqual(decoded, question_ids)
+
+    def test_empty_and_edge_ordinals(self):
+        # 128 is the first two-byte varint; 128 -> 0 is a negative gap
+        for question_ids in ([], [BANK[0]], [BANK[-1]], [BANK[128], BANK[0], BANK[127]]):
+            for ordered in (True, False):
+                with self.subTest(question_ids=question_ids, ordered=ordered):
+                    _, decoded = self.round_trip(question_ids, ordered)
+                    self.assertEqual(decoded, question_ids if ordered else sorted(question_ids))
+
+    def test_unknown_ids_are_sent_as_plain_lists(self):
+        question_ids = [BANK[1], 'q_unknown']
+        self.assertEqual(encode_id_list(question_ids, dictionary=self.dictionary), question_ids)
+        self.assertEqual(decode_id_list(question_ids, dictionary=self.dictionary), question_ids)
+
+    def test_payload_from_another_dictionary_is_rejected(self):
+        payload = encode_id_list(BANK[:3], dictionary=self.dictionary)
+        with self.assertRaises(ValueError):
+            decode_id_list(payload, dictionary=QuestionDictionary(BANK[1:]))
+
+
+class QuestionDictionaryVersionTests(TestCase):
+    def setUp(self):
+        # Versions restart with every test database transaction
+        idsets._dictionary_cache.update(version=None, dictionary=None)
+        for question_id in ('q_a', 'q_b', 'q_c'):
+            Question.objects.create(question_id=question_id, question='?', choices=['A', 'B'],
+                                    correct_answer='A', subject='Database Systems')
+
+    def tearDown(self):
+        idsets._dictionary_cache.update(version=None, dictionary=None)
+
+    def test_replacing_a_middle_question_rebuilds_the_dictionary(self):
+        before = get_question_dictionary()
+        self.assertIs(get_question_dictionary(), before)
+        Question.objects.filter(question_id='q_b').delete()
+        Question.objects.create(question_id='q_bb', question='?', choices=['A', 'B'],
+                                correct_answer='A', subject='Database Systems')
+        after = get_question_dictionary()
+        self.assertEqual(after.question_ids, ['q_a', 'q_bb', 'q_c'])
+        self.assertNotEqual(after.version, before.version)
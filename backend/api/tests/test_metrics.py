@@ -0,0 +1,51 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import metrics
+
+
+class ShardRetirementTests(SimpleTestCase):
+    def request_count(self, route):
+        return sum(row[3] for row in metrics.snapshot()['requests'] if row[0] == route)
+
+    def test_finished_threads_are_folded_without_losing_counts(self):
+        route = 'test-shard-retirement'
+        threads = [threading.Thread(target=metrics.record_request, args=(route, 'GET', 200, 0.01))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.request_count(route), 20)
+        self.assertFalse(any(shard.thread in threads for shard in metrics._shards))
+        self.assertEqual(self.request_count(route), 20)
+
+
+class RenderPrometheusTests(SimpleTestCase):
+    def test_counters_are_labelled_per_worker(self):
+        def worker(pid, count):
+            return {
+                'process': {'pid': pid, 'ppid': 1, 'server': '', 'startedAt': 0.0},
+                'requests': [['route', 'GET', 200, count, 0.1] + [count] + [0] * len(metrics.LATENCY_BUCKETS)],
+                'caches': {},
+                'connectionsOpened': 1,
+                'writtenAt': 0.0,
+            }
+        text = metrics.render_prometheus([worker(11, 3), worker(12, 5)])
+        self.assertIn('exam_http_requests_total{route="route",method="GET",status="200",pid="11"} 3', text)
+        self.assertIn('exam_http_requests_total{route="route",method="GET",status="200",pid="12"} 5', text)
+        self.assertIn('exam_db_connection_reuse_ratio 0.75', text)
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    def test_disabled_by_default(self):
+        response = APIClient().get('/api/debug/metrics/')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_served_when_enabled(self):
+        response = APIClient().get('/api/debug/metrics/?scope=worker')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('exam_worker_info', response.content.decode())
@@ -0,0 +1,91 @@
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from api.models import Attempt, DailyPlan
+from api.plans import get_seed, seeded_shuffle
+
+QUESTION_IDS = [f'q{i}' for i in range(12)]
+
+
+class SeededShuffleTests(SimpleTestCase):
+    """Expected values are the output of getSeed/seededShuffle from the frontend's dailyPlanService.js"""
+
+    def test_matches_frontend_selection(self):
+        cases = [
+            ('2026-01-15', 'Database Systems', 657735321,
+             ['q5', 'q9', 'q1', 'q7', 'q4', 'q0', 'q6', 'q3', 'q11', 'q2', 'q8', 'q10']),
+            ('2025-12-31', 'Computer Programming', 1661167413,
+             ['q6', 'q3', 'q4', 'q5', 'q2', 'q10', 'q8', 'q1', 'q7', 'q9', 'q11', 'q0']),
+            ('2026-03-01', 'Data Communication and Computer Networking', 269748433,
+             ['q0', 'q10', 'q9', 'q1', 'q6', 'q5', 'q8', 'q2', 'q11', 'q7', 'q3', 'q4']),
+        ]
+        for date_key, subject, seed, expected in cases:
+            with self.subTest(date_key=date_key, subject=subject):
+                self.assertEqual(get_seed(date_key, subject), seed)
+                self.assertEqual(seeded_shuffle(QUESTION_IDS, seed), expected)
+
+    def test_seed_hashes_utf16_code_units(self):
+        # charCodeAt() sees a surrogate pair for characters outside the BMP
+        self.assertEqual(get_seed('2026-01-15', 'Ünïcode ✓ 𝛑'), 222806361)
+
+
+class PlanCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.plan = DailyPlan.objects.create(
+            date_key='2026-01-15', focus_subject='Database Systems', question_ids=['q1', 'q2', 'q3']
+        )
+
+    def attempt(self, question_id, is_correct, plan_date_key='2026-01-15'):
+        response = self.client.post('/api/attempts/', {
+            'questionId': question_id,
+            'selectedAnswer': 'A',
+            'isCorrect': is_correct,
+            'timeSpent': 5,
+            'subject': 'Database Systems',
+            'planDateKey': plan_date_key,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['attemptId']
+
+    def assertCounts(self, answered, correct):
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.answered_count, self.plan.correct_count), (answered, correct))
+        self.assertEqual(self.plan.wrong_count, answered - correct)
+        self.assertEqual(self.plan.aggregate_counts(), (answered, correct))
+
+    def test_repeated_attempts_count_each_question_once(self):
+        self.attempt('q1', False)
+        self.assertCounts(1, 0)
+        self.attempt('q1', False)
+        self.assertCounts(1, 0)
+        self.attempt('q1', True)
+        self.assertCounts(1, 1)
+        self.attempt('q1', False)
+        self.assertCounts(1, 1)
+
+    def test_questions_outside_the_plan_are_ignored(self):
+        self.attempt('q9', True)
+        self.attempt('q2', True, plan_date_key='2026-01-16')
+        self.assertCounts(0, 0)
+
+    def test_deleting_the_last_correct_attempt_moves_counters_back(self):
+        self.attempt('q2', False)
+        correct_id = self.attempt('q2', True)
+        self.attempt('q3', True)
+        self.assertCounts(2, 2)
+        self.assertEqual(self.client.delete(f'/api/attempts/{correct_id}/').status_code, 204)
+        self.assertCounts(2, 1)
+
+    def test_batch_counts_distinct_questions(self):
+        attempts = [
+            {'questionId': question_id, 'selectedAnswer': 'A', 'isCorrect': is_correct, 'timeSpent': 5,
+             'subject': 'Database Systems', 'planDateKey': '2026-01-15', 'idempotencyKey': f'k{i}'}
+            for i, (question_id, is_correct) in enumerate([('q1', False), ('q1', True), ('q2', False), ('q3', True)])
+        ]
+        response = self.client.post('/api/attempts/batch/', {'attempts': attempts}, format='json')
+        self.assertIn(response.status_code, (200, 201))
+        self.assertCounts(3, 2)
+        self.plan.refresh_from_db()
+        self.assertTrue(self.plan.is_complete)
+        self.assertEqual(Attempt.objects.count(), 4)
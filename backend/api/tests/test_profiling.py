@@ -0,0 +1,54 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import profiling
+from api.models import ExamSession
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SLOW_MS=0)
+class RequestProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        profiling._slow_log = None
+        self.addCleanup(setattr, profiling, '_slow_log', None)
+        quiet = mock.patch.object(profiling.logger, 'disabled', True)
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        self.client = APIClient()
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1'])
+
+    def answer(self, value):
+        return self.client.patch('/api/sessions/s1/delta/', {'questionId': 'q1', 'answer': value}, format='json')
+
+    def test_server_timing_counts_queries(self):
+        response = self.answer('A')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries')
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_slow_log_does_not_keep_bound_parameters(self):
+        self.answer('secret-answer-7731')
+        data = self.client.get('/api/debug/slow/').json()
+        self.assertTrue(data['enabled'])
+        entry = next(request for request in data['requests'] if request['path'].endswith('/delta/'))
+        self.assertTrue(entry['queries'])
+        self.assertNotIn('secret-answer-7731', json.dumps(entry))
+        self.assertTrue(all('params' not in query and query['explain'] is None for query in entry['queries']))
+
+    @override_settings(DEBUG=True)
+    def test_explain_is_kept_with_debug(self):
+        ExamSession.objects.create(session_id='s2', mode='exam')
+        self.client.get('/api/sessions/s2/')
+        entry = self.client.get('/api/debug/slow/').json()['requests'][-1]
+        self.assertTrue(any(query['explain'] for query in entry['queries']))
+
+    def test_repeated_query_shapes_are_reported(self):
+        profile = profiling.RequestProfile(self.client.get('/api/debug/slow/').wsgi_request)
+        profile.recorders[0].queries = [
+            {'alias': 'default', 'sql': 'SELECT 1 WHERE id = %s', 'params': (n,), 'many': False, 'ms': 1.0}
+            for n in range(3)
+        ]
+        self.assertEqual(profile.duplicates(3), [{'sql': 'SELECT 1 WHERE id = %s', 'count': 3}])
+        self.assertEqual(profile.duplicates(4), [])
@@ -0,0 +1,80 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import ExamSession
+from api.progress import SessionNotFound, VersionConflict, merge_progress
+
+
+class MergeProgressTests(TestCase):
+    def setUp(self):
+        self.session = ExamSession.objects.create(
+            session_id='s1', mode='exam', question_ids=['q1', 'q2'],
+            answers={'q1': 'A'}, time_spent={'q1': 4},
+        )
+
+    def test_merges_one_answer_and_bumps_the_version(self):
+        state = merge_progress('s1', question_id='q2', answer='B', time_spent=7, current_index=1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.answers, {'q1': 'A', 'q2': 'B'})
+        self.assertEqual(self.session.time_spent, {'q1': 4, 'q2': 7})
+        self.assertEqual(self.session.current_index, 1)
+        self.assertEqual(state['version'], 1)
+
+    def test_stale_version_is_rejected_without_writing(self):
+        merge_progress('s1', question_id='q2', answer='B', expected_version=0)
+        with self.assertRaises(VersionConflict) as raised:
+            merge_progress('s1', question_id='q2', answer='C', expected_version=0)
+        self.assertEqual(raised.exception.current_version, 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.answers['q2'], 'B')
+
+    def test_missing_session(self):
+        with self.assertRaises(SessionNotFound):
+            merge_progress('missing', question_id='q1', answer='A')
+        with self.assertRaises(SessionNotFound):
+            merge_progress('missing', question_id='q1', answer='A', expected_version=0)
+
+
+class SessionDeltaTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1'])
+
+    def test_version_conflict_returns_409(self):
+        url = '/api/sessions/s1/delta/'
+        self.assertEqual(self.client.patch(url, {'questionId': 'q1', 'answer': 'A', 'version': 0},
+                                           format='json').status_code, 200)
+        response = self.client.patch(url, {'questionId': 'q1', 'answer': 'B', 'version': 0}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['version'], 1)
+
+    def test_missing_session_returns_404(self):
+        response = self.client.patch('/api/sessions/missing/delta/', {'questionId': 'q1', 'answer': 'A'},
+                                     format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class SessionUpdateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1', 'q2'], answers={'q1': 'A'})
+
+    def test_updates_bump_the_version(self):
+        response = self.client.patch('/api/sessions/s1/', {'answers': {'q1': 'B'}, 'version': 0}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['version'], 1)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').version, 1)
+
+    def test_stale_update_is_rejected(self):
+        merge_progress('s1', question_id='q2', answer='A')
+        response = self.client.patch('/api/sessions/s1/', {'answers': {}, 'version': 0}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['version'], 1)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').answers, {'q1': 'A', 'q2': 'A'})
+
+    def test_progress_with_a_version_older_than_an_update_conflicts(self):
+        full = self.client.get('/api/sessions/s1/').data
+        full['answers'] = {'q1': 'B'}
+        self.assertEqual(self.client.put('/api/sessions/s1/', full, format='json').status_code, 200)
+        response = self.client.patch('/api/sessions/s1/progress/', {'answers': {}, 'version': 0}, format='json')
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api import question_cache
+from api.models import Question
+from api.question_cache import fetch_question_ids, fetch_questions, get_answer_keys
+from api.versions import bump_question_version
+
+from .helpers import reset_question_caches
+
+
+def chunk_size(size):
+    """Patch chunked()'s default size, which is bound when the module loads"""
+    return mock.patch.object(question_cache.chunked, '__defaults__', (size,))
+
+
+class FetchQuestionsTests(TestCase):
+    def setUp(self):
+        reset_question_caches()
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.bulk_create([
+                Question(question_id=f'q{n}', question=f'Question {n}', choices=['A', 'B'], correct_answer='A',
+                         subject='Math' if n % 2 else 'Physics')
+                for n in range(7)
+            ])
+            bump_question_version()
+
+    def ids(self, questions):
+        return [question['questionId'] for question in questions]
+
+    def test_request_order_duplicates_and_missing_ids(self):
+        requested = ['q5', 'q1', 'missing', 'q5', 'q3', 7, 'q0']
+        with chunk_size(2):
+            questions, missing = fetch_questions(requested)
+        self.assertEqual(self.ids(questions), ['q5', 'q1', 'q3', 'q0'])
+        self.assertEqual(missing, ['missing'])
+
+    def test_chunks_stay_below_the_chunk_size(self):
+        requested = [f'q{n}' for n in reversed(range(7))]
+        with chunk_size(3), self.assertNumQueries(4):
+            # One version read, then ceil(7 / 3) chunks
+            questions, _ = fetch_questions(requested)
+        self.assertEqual(self.ids(questions), requested)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ids(fetch_questions(requested)[0]), requested)
+
+    def test_version_move_drops_cached_questions(self):
+        fetch_questions(['q1'])
+        Question.objects.filter(question_id='q1').update(question='Edited')
+        self.assertEqual(fetch_questions(['q1'])[0][0]['question'], 'Question 1')
+        bump_question_version()
+        self.assertEqual(fetch_questions(['q1'])[0][0]['question'], 'Edited')
+
+    def test_filtered_queryset_bypasses_the_cache(self):
+        fetch_questions(['q1', 'q2'])
+        questions, missing = fetch_questions(['q2', 'q1'], queryset=Question.objects.filter(subject='Math'))
+        self.assertEqual(self.ids(questions), ['q1'])
+        self.assertEqual(missing, ['q2'])
+
+    def test_fetch_question_ids_keeps_request_order(self):
+        with chunk_size(2):
+            matching = fetch_question_ids(['q5', 'q2', 'q1', 'q5', 'missing', 'q3'],
+                                          Question.objects.filter(subject='Math'))
+        self.assertEqual(matching, ['q5', 'q1', 'q3'])
+
+    def test_answer_keys_follow_the_version(self):
+        self.assertEqual(get_answer_keys(['q1', 'missing'])['q1']['correct_answer'], 'A')
+        Question.objects.filter(question_id='q1').update(correct_answer='B')
+        bump_question_version()
+        self.assertEqual(get_answer_keys(['q1'])['q1']['correct_answer'], 'B')
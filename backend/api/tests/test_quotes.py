@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.plans import ensure_daily_plan
+from api.quotes import motivational_quotes
+
+
+class MotivationalQuotesTests(SimpleTestCase):
+    def setUp(self):
+        motivational_quotes.cache_clear()
+        self.addCleanup(motivational_quotes.cache_clear)
+
+    def test_groups_are_flattened_in_file_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'quotes.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'Planning': ['a', 'b'], 'Action': ['c']}, f)
+            with override_settings(MOTIVATIONAL_QUOTES_PATH=path):
+                self.assertEqual(motivational_quotes(), ('a', 'b', 'c'))
+
+    def test_missing_file_gives_no_quotes(self):
+        with override_settings(MOTIVATIONAL_QUOTES_PATH='/nonexistent/quotes.json'), \
+                self.assertLogs('api.quotes', 'ERROR'):
+            self.assertEqual(motivational_quotes(), ())
+
+    def test_shared_list_is_loaded(self):
+        quotes = motivational_quotes()
+        self.assertTrue(quotes)
+        self.assertTrue(all(isinstance(quote, str) and quote.strip() for quote in quotes))
+
+
+class PlanQuoteTests(TestCase):
+    def test_plans_without_client_candidates_use_the_shared_list(self):
+        plan, created = ensure_daily_plan('2026-01-15', fallback_subject='Database Systems')
+        self.assertTrue(created)
+        self.assertIn(plan.motivational_quote, motivational_quotes())
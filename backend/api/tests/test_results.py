@@ -0,0 +1,81 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import ExamSession, Question
+from api.results import build_results_summary
+
+from .helpers import reset_question_caches
+
+
+def create_question(question_id, subject='Database Systems', topic='SQL', correct_answer='A'):
+    return Question.objects.create(question_id=question_id, question='?', choices=['A', 'B'],
+                                   correct_answer=correct_answer, subject=subject, topic=topic)
+
+
+class ResultsSummaryTests(TestCase):
+    def setUp(self):
+        reset_question_caches()
+        self.addCleanup(reset_question_caches)
+
+    def test_grades_and_groups_answers(self):
+        create_question('q1')
+        create_question('q2')
+        create_question('q3', subject='Operating System', topic=None, correct_answer='B')
+        summary = build_results_summary(
+            ['q1', 'q2', 'q3', 'gone'],
+            {'q1': 'A', 'q3': 'A'},
+            {'q1': 10, 'q3': 20, 'gone': 5},
+        )
+        self.assertEqual((summary['total'], summary['answered'], summary['correct'], summary['wrong']), (3, 2, 1, 1))
+        self.assertEqual(summary['score'], 33.33)
+        self.assertEqual(summary['accuracy'], 50.0)
+        self.assertEqual(summary['wrongQuestionIds'], ['q3'])
+        self.assertEqual(summary['unansweredQuestionIds'], ['q2'])
+        self.assertEqual(summary['missingQuestionIds'], ['gone'])
+        self.assertEqual(summary['time'], {'total': 35, 'average': 11.67, 'min': 5, 'max': 20})
+        self.assertEqual(summary['bySubject']['Database Systems'],
+                         {'total': 2, 'answered': 1, 'correct': 1, 'wrong': 0, 'accuracy': 100.0})
+        self.assertEqual(summary['byTopic'][1]['topic'], 'Unknown')
+
+    def test_query_count_does_not_grow_with_the_session(self):
+        question_ids = [f'q{i}' for i in range(40)]
+        for question_id in question_ids:
+            create_question(question_id)
+
+        def count_queries(ids):
+            reset_question_caches()
+            with CaptureQueriesContext(connection) as queries:
+                build_results_summary(ids, {question_id: 'A' for question_id in ids}, {})
+            return len(queries)
+
+        self.assertEqual(count_queries(question_ids[:3]), count_queries(question_ids))
+
+
+class SessionResultsEndpointTests(TestCase):
+    def setUp(self):
+        reset_question_caches()
+        self.addCleanup(reset_question_caches)
+        self.client = APIClient()
+        create_question('q1')
+        create_question('q2')
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1', 'q2'],
+                                   answers={'q1': 'A', 'q2': 'B'})
+
+    def test_completing_through_patch_stores_the_summary(self):
+        response = self.client.patch('/api/sessions/s1/', {'isComplete': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        stored = ExamSession.objects.get(session_id='s1').results
+        self.assertEqual(stored['wrongQuestionIds'], ['q2'])
+
+        response = self.client.get('/api/sessions/s1/results/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['isComplete'])
+        self.assertEqual(response.data['computedAt'], stored['computedAt'])
+
+    def test_in_progress_sessions_are_graded_on_the_fly(self):
+        response = self.client.get('/api/sessions/s1/results/')
+        self.assertFalse(response.data['isComplete'])
+        self.assertEqual(response.data['correct'], 1)
+        self.assertIsNone(ExamSession.objects.get(session_id='s1').results)
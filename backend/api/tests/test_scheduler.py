@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api import scheduler
+from api.scheduler import SchedulerLock, StudyDayScheduler, start_scheduler
+
+
+class FakeLock:
+    def __init__(self, held):
+        self.held = held
+
+    def acquire(self):
+        return self.held
+
+
+class StudyDaySchedulerTests(SimpleTestCase):
+    def test_only_the_lock_holder_prepares_the_day(self):
+        study_day = StudyDayScheduler(timedelta(minutes=15))
+        with mock.patch.object(scheduler, 'prepare_study_day', return_value={'dateKey': 'd'}) as prepare, \
+                mock.patch.object(scheduler, 'close_old_connections'):
+            study_day.lock = FakeLock(False)
+            study_day._tick()
+            prepare.assert_not_called()
+            study_day.lock = FakeLock(True)
+            study_day._tick()
+            prepare.assert_called_once()
+        self.assertEqual(study_day.last_result, {'dateKey': 'd'})
+
+    @override_settings(STUDY_DAY_SCHEDULER_ENABLED=False)
+    def test_disabled_by_default(self):
+        self.assertIsNone(start_scheduler())
+
+
+@unittest.skipUnless(scheduler.fcntl is not None, 'flock is not available')
+class FileSchedulerLockTests(SimpleTestCase):
+    def test_second_holder_is_refused_until_the_first_exits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'db.sqlite3.scheduler.lock')
+            first, second = SchedulerLock(path=path), SchedulerLock(path=path)
+            self.assertTrue(first._acquire_file())
+            self.assertTrue(first._acquire_file())
+            self.assertFalse(second._acquire_file())
+            first._file.close()  # The holder exits
+            self.assertTrue(second._acquire_file())
+            second._file.close()
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'advisory locks need PostgreSQL')
+class AdvisorySchedulerLockTests(TestCase):
+    def test_second_holder_is_refused_until_the_first_exits(self):
+        first, second = SchedulerLock(), SchedulerLock()
+        try:
+            self.assertTrue(first.acquire())
+            self.assertTrue(first.acquire())
+            self.assertFalse(second.acquire())
+            first._close_connection()  # The holder's session ends
+            self.assertTrue(second.acquire())
+        finally:
+            for lock in (first, second):
+                if lock._connection is not None:
+                    lock._close_connection()
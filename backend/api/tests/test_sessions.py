@@ -0,0 +1,61 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import ExamSession
+from api.sessions import expire_sessions
+
+
+@override_settings(SESSION_INCOMPLETE_EXPIRY_DAYS=30)
+class SessionExpiryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create('fresh', days_idle=1, answers={'q1': 'A'})
+        self.create('abandoned', days_idle=45)
+        self.create('finished', days_idle=45, is_complete=True)
+
+    @staticmethod
+    def create(session_id, days_idle, **fields):
+        ExamSession.objects.create(session_id=session_id, mode='exam', question_ids=['q1', 'q2'],
+                                   config={'subject': 'Math'}, **fields)
+        # last_updated is auto_now, so age the row with update()
+        ExamSession.objects.filter(session_id=session_id).update(
+            last_updated=timezone.now() - timedelta(days=days_idle))
+
+    def incomplete_ids(self):
+        return [summary['sessionId'] for summary in self.client.get('/api/sessions/incomplete/').data]
+
+    def test_incomplete_list_hides_expired_sessions(self):
+        response = self.client.get('/api/sessions/incomplete/')
+        self.assertEqual([summary['sessionId'] for summary in response.data], ['fresh'])
+        summary = response.data[0]
+        self.assertEqual((summary['answeredCount'], summary['totalQuestions']), (1, 2))
+        self.assertEqual(summary['config'], {'subject': 'Math', 'topics': []})
+
+    def test_expiry_archives_abandoned_sessions_only(self):
+        self.assertEqual(expire_sessions(dry_run=True), 1)
+        self.assertEqual(expire_sessions(), 1)
+        self.assertEqual(expire_sessions(), 0)
+        archived = ExamSession.objects.exclude(archived_at=None).values_list('session_id', flat=True)
+        self.assertEqual(list(archived), ['abandoned'])
+        # Archiving leaves last_updated alone
+        abandoned = ExamSession.objects.get(session_id='abandoned')
+        self.assertLess(abandoned.last_updated, timezone.now() - timedelta(days=44))
+
+    def test_archived_sessions_stay_hidden_with_expiry_disabled(self):
+        expire_sessions()
+        with override_settings(SESSION_INCOMPLETE_EXPIRY_DAYS=0):
+            self.assertEqual(self.incomplete_ids(), ['fresh'])
+            self.assertEqual(expire_sessions(), 0)
+
+    def test_command_deletes_with_a_custom_threshold(self):
+        out = StringIO()
+        call_command('expire_sessions', days=60, stdout=out)
+        self.assertIn('0 abandoned session(s) archived', out.getvalue())
+        call_command('expire_sessions', days=10, delete=True, stdout=out)
+        self.assertIn('1 abandoned session(s) deleted', out.getvalue())
+        self.assertEqual(sorted(ExamSession.objects.values_list('session_id', flat=True)), ['finished', 'fresh'])
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from api import snapshot
+from api.models import Question
+from api.snapshot import get_question_snapshot, read_stamp
+
+from .helpers import reset_question_caches
+
+
+class QuestionSnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(QUESTION_SNAPSHOT_ENABLED=True,
+                                              QUESTION_SNAPSHOT_PATH=os.path.join(directory.name, 'questions.bin'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_question_caches()
+        snapshot._current['snapshot'] = None
+        self.addCleanup(snapshot._current.update, snapshot=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_question('q1', 'Math', 'Algebra')
+            self.add_question('q2', 'Physics', 'Motion')
+            self.add_question('q3', 'Math', 'Geometry')
+
+    @staticmethod
+    def add_question(question_id, subject, topic):
+        return Question.objects.create(question_id=question_id, question=f'{question_id}?', choices=['A', 'B'],
+                                       correct_answer='A', subject=subject, topic=topic)
+
+    def test_documents_and_indexes(self):
+        current = get_question_snapshot()
+        self.assertEqual(current.order, ['q1', 'q3', 'q2'])
+        self.assertEqual(current.filter_ids(subject='Math'), ['q1', 'q3'])
+        self.assertEqual(current.filter_ids(subject='Math', topic='Geometry'), ['q3'])
+        self.assertEqual(json.loads(bytes(current.document('q2')))['questionId'], 'q2')
+        self.assertIsNone(current.document('missing'))
+        self.assertEqual([item['questionId'] for item in json.loads(current.render(['q2', 'missing', 'q1']))],
+                         ['q2', 'q1'])
+        self.assertIs(get_question_snapshot(), current)
+
+    def test_stamp_moves_only_once_the_write_commits(self):
+        before = get_question_snapshot()
+        stamp = read_stamp()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.add_question('q4', 'Physics', 'Optics')
+        # Until commit, other workers keep serving the snapshot of the committed rows
+        self.assertEqual(read_stamp(), stamp)
+        self.assertIs(get_question_snapshot(), before)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(read_stamp(), stamp)
+        self.assertIn('q4', get_question_snapshot().order)
+
+    def test_rolled_back_write_keeps_the_snapshot(self):
+        get_question_snapshot()
+        stamp = read_stamp()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.add_question('q4', 'Physics', 'Optics')
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(read_stamp(), stamp)
+        self.assertNotIn('q4', get_question_snapshot().order)
@@ -0,0 +1,94 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import writebehind
+from api.models import ExamSession
+from api.writebehind import ProgressBuffer
+
+
+def stop_buffer(buffer):
+    buffer._stop.set()
+    if buffer._thread is not None:
+        buffer._thread.join()
+
+
+class ProgressBufferTests(TestCase):
+    def setUp(self):
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1', 'q2', 'q3'])
+        self.buffer = ProgressBuffer(interval=3600, max_pending=5)
+        self.addCleanup(stop_buffer, self.buffer)
+
+    def test_updates_are_coalesced_into_one_write(self):
+        self.assertEqual(self.buffer.add('s1', current_index=1), 1)
+        self.assertEqual(self.buffer.add('s1', is_paused=True), 2)
+        self.assertEqual(self.buffer.add('s1', current_index=2), 3)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').current_index, 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 1)
+        session = ExamSession.objects.get(session_id='s1')
+        self.assertEqual((session.current_index, session.is_paused, session.version), (2, True, 1))
+        stats = self.buffer.snapshot_stats()
+        self.assertEqual((stats['received'], stats['written'], stats['savedWrites']), (3, 1, 2))
+        self.assertEqual((stats['pendingSessions'], stats['pendingUpdates']), (0, 0))
+
+    def test_flush_of_one_session_leaves_the_others_pending(self):
+        ExamSession.objects.create(session_id='s2', mode='exam')
+        self.buffer.add('s1', current_index=1)
+        self.buffer.add('s2', current_index=1)
+        self.assertEqual(self.buffer.flush('s1'), 1)
+        self.assertEqual(self.buffer.snapshot_stats()['pendingSessions'], 1)
+
+    def test_max_pending_forces_a_flush(self):
+        for index in range(5):
+            self.buffer.add('s1', current_index=index)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').current_index, 4)
+        self.assertEqual(self.buffer.snapshot_stats()['pendingUpdates'], 0)
+
+    def test_deleted_session_is_dropped_without_an_error(self):
+        self.buffer.add('s1', current_index=1)
+        ExamSession.objects.filter(session_id='s1').delete()
+        self.buffer.flush()
+        self.assertEqual(self.buffer.snapshot_stats()['errors'], 0)
+
+
+@override_settings(SESSION_WRITE_BEHIND_ENABLED=True, SESSION_WRITE_BEHIND_INTERVAL=3600)
+class WriteBehindEndpointTests(TestCase):
+    def setUp(self):
+        writebehind._buffer = None
+        self.addCleanup(self.reset_buffer)
+        self.client = APIClient()
+        ExamSession.objects.create(session_id='s1', mode='exam', question_ids=['q1', 'q2'])
+
+    @staticmethod
+    def reset_buffer():
+        if writebehind._buffer is not None:
+            stop_buffer(writebehind._buffer)
+        writebehind._buffer = None
+
+    def test_navigation_is_buffered_until_the_session_is_read(self):
+        response = self.client.patch('/api/sessions/s1/progress/', {'currentIndex': 1}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').current_index, 0)
+
+        self.assertEqual(self.client.get('/api/sessions/s1/').data['currentIndex'], 1)
+
+    def test_answers_are_never_buffered(self):
+        response = self.client.patch('/api/sessions/s1/delta/', {'questionId': 'q1', 'answer': 'A'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ExamSession.objects.get(session_id='s1').answers, {'q1': 'A'})
+
+    def test_versioned_write_flushes_first(self):
+        self.client.patch('/api/sessions/s1/delta/', {'currentIndex': 1}, format='json')
+        response = self.client.patch('/api/sessions/s1/delta/', {'questionId': 'q2', 'answer': 'B', 'version': 1},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        session = ExamSession.objects.get(session_id='s1')
+        self.assertEqual((session.current_index, session.version), (1, 2))
+
+    def test_missing_session_is_not_accepted(self):
+        response = self.client.patch('/api/sessions/missing/progress/', {'currentIndex': 1}, format='json')
+        self.assertEqual(response.status_code, 404)
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     QuestionViewSet, ExamViewSet, AttemptViewSet, 
     ExamSessionViewSet, DailyPlanViewSet, ThemePreferencesViewSet, AnalyticsViewSet, DebugViewSet,
-    SubjectPriorityViewSet
+    SubjectPriorityViewSet, QuestionBundleViewSet
 )
 
 router = DefaultRouter()
@@ -18,6 +18,8 @@ router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 router.register(r'debug', DebugViewSet, basename='debug')
 
 urlpatterns = [
+    path('bundles/questions/manifest/', QuestionBundleViewSet.as_view({'get': 'manifest'}), name='question-bundle-manifest'),
+    path('bundles/questions/<str:bundle_hash>.json.<str:encoding>', QuestionBundleViewSet.as_view({'get': 'download'}), name='question-bundle'),
     path('', include(router.urls)),
 ]
 
@@ -7,6 +7,25 @@ from datetime import datetime, timedelta, timezone
 ETHIOPIA_TIMEZONE_OFFSET = timedelta(hours=3)  # UTC+3
 DAY_BOUNDARY_HOUR = 6  # Day changes at 6 AM Ethiopian time
 
+# Official subjects list (from constants)
+OFFICIAL_SUBJECTS = [
+    'Computer Programming',
+    'Object Oriented Programming',
+    'Data Structures and Algorithms',
+    'Design and Analysis of Algorithms',
+    'Database Systems',
+    'Software Engineering',
+    'Web Programming',
+    'Operating System',
+    'Computer Organization and Architecture',
+    'Data Communication and Computer Networking',
+    'Computer Security',
+    'Network and System Administration',
+    'Introduction to Artificial Intelligence',
+    'Automata and Complexity Theory',
+    'Compiler Design'
+]
+
 
 def get_ethiopian_date_key(dt=None):
     """
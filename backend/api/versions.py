@@ -0,0 +1,41 @@
+"""
+Shared data version tokens
+
+Each cached data set has a DataVersion row whose version every write to that
+data bumps, in the same transaction as the write. Per-worker caches compare
+the token (one primary-key read) instead of the data, so a write made by any
+worker invalidates the caches of all of them.
+
+- attempts:  subject scores (scoring.py)
+- questions: ID dictionary, question and answer-key caches, bundles
+"""
+from django.db.models import F
+
+from .models import DataVersion
+
+ATTEMPTS_VERSION = 'attempts'
+QUESTIONS_VERSION = 'questions'
+
+
+def current_version(name):
+    """Current token of a data set (0 before its first write)"""
+    return DataVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def bump_version(name):
+    """Invalidate everything cached against a data set's token"""
+    if not DataVersion.objects.filter(name=name).update(version=F('version') + 1):
+        DataVersion.objects.get_or_create(name=name)
+        DataVersion.objects.filter(name=name).update(version=F('version') + 1)
+
+
+def question_version():
+    return current_version(QUESTIONS_VERSION)
+
+
+def bump_question_version():
+    """
+    Call after every question write that bypasses model signals
+    (queryset.update(), bulk_create, raw SQL)
+    """
+    bump_version(QUESTIONS_VERSION)
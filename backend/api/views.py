@@ -1,35 +1,56 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Q, Count, Avg
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Count, Avg, Exists, OuterRef
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from datetime import datetime, timedelta
 import json
+import os
 from .models import Question, Exam, Attempt, ExamSession, DailyPlan, ThemePreferences, SubjectPriority
 from .serializers import (
-    QuestionSerializer, ExamSerializer, AttemptSerializer, 
-    ExamSessionSerializer, DailyPlanSerializer, ThemePreferencesSerializer, SubjectPrioritySerializer
+    QuestionSerializer, ExamSerializer, AttemptSerializer, AttemptBatchItemSerializer,
+    ExamSessionSerializer, DailyPlanSerializer, ThemePreferencesSerializer, SubjectPrioritySerializer,
+    attempt_id_for_key
 )
-from .utils import get_ethiopian_date_key
-
-# Official subjects list (from constants)
-OFFICIAL_SUBJECTS = [
-    'Computer Programming',
-    'Object Oriented Programming',
-    'Data Structures and Algorithms',
-    'Design and Analysis of Algorithms',
-    'Database Systems',
-    'Software Engineering',
-    'Web Programming',
-    'Operating System',
-    'Computer Organization and Architecture',
-    'Data Communication and Computer Networking',
-    'Computer Security',
-    'Network and System Administration',
-    'Introduction to Artificial Intelligence',
-    'Automata and Complexity Theory',
-    'Compiler Design'
-]
+from .utils import OFFICIAL_SUBJECTS, get_ethiopian_date_key
+from .idsets import encode_id_list, get_question_dictionary, wants_compact_ids
+from .snapshot import get_question_snapshot
+from .bundles import get_bundle_manifest, read_bundle
+from .question_cache import (
+    fetch_question_ids, fetch_questions, get_answer_key, summarize_question_ids, unique_ids
+)
+from .progress import SessionNotFound, VersionConflict, is_valid_json_key, merge_progress
+from .writebehind import flush_session, get_progress_buffer
+from .results import build_results_summary, finalize_session
+from .sessions import incomplete_sessions, session_summary, summary_queryset
+from .exams import exam_question_ids, exam_summaries
+from .plans import ensure_daily_plan, insert_plan, plan_counters
+from .priorities import reorder_priorities, seed_priorities, start_next_round, toggle_priority
+from .metrics import collect, render_prometheus
+from .profiling import capture_file, get_slow_request_log, list_captures
+from .scoring import attempt_version, bump_attempt_version, focus_candidates, focus_scores, seeding_order
+
+
+# Maximum number of attempts accepted by /attempts/batch/
+ATTEMPT_BATCH_LIMIT = 1000
+
+# Sort keys accepted by /sessions/?ordering= (prefix with - for descending)
+SESSION_ORDERING_FIELDS = {
+    'last_updated': 'last_updated',
+    'lastUpdated': 'last_updated',
+    'started_at': 'started_at',
+    'startedAt': 'started_at',
+}
+
+# Largest /sessions/?limit= (one default page)
+SESSION_LIST_LIMIT = 100
 
 
 def calculate_status(accuracy):
@@ -50,12 +71,61 @@ def calculate_status(accuracy):
         return 'DEAD_ZONE'
 
 
+def query_flag(request, name):
+    """Read a boolean query parameter (true/1/yes)"""
+    value = request.query_params.get(name, '')
+    return str(value).lower() in ('true', '1', 'yes')
+
+
+def query_expand(request):
+    """Set of names requested with ?expand=a,b"""
+    value = request.query_params.get('expand', '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def expand_exam_payload(data, question_ids, expand):
+    """Add inline questions (expand=questions) and subject counts (expand=summary) to a serialized exam or session"""
+    if 'questions' in expand:
+        questions, missing = fetch_questions(question_ids or [])
+        data['questions'] = questions
+        data['missingQuestionIds'] = missing
+    if 'summary' in expand:
+        data['summary'] = summarize_question_ids(question_ids or [])
+    return data
+
+
+def query_datetime(request, name, end_of_day=False):
+    """Read an ISO date or datetime query parameter (dates cover the whole day when end_of_day is set)"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is not None:
+                parsed = datetime.combine(day, datetime.max.time() if end_of_day else datetime.min.time())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({'error': f'{name} must be an ISO date or datetime'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def json_bytes_response(content, status_code=200):
+    """Return pre-serialized JSON bytes without re-rendering them"""
+    return HttpResponse(content, content_type='application/json', status=status_code)
+
+
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
     
     def get_queryset(self):
-        queryset = Question.objects.all()
+        # Tie-break on questionId so pages are stable and match the snapshot order
+        queryset = Question.objects.order_by('subject', 'topic', 'question_id')
         subject = self.request.query_params.get('subject', None)
         topic = self.request.query_params.get('topic', None)
         
@@ -64,17 +134,108 @@ class QuestionViewSet(viewsets.ModelViewSet):
         if topic:
             queryset = queryset.filter(topic=topic)
         
+        # Seen/unseen filters run as a (NOT) EXISTS subquery on attempts.questionId
+        answered = Attempt.objects.filter(question_id=OuterRef('question_id'))
+        if query_flag(self.request, 'unseen'):
+            queryset = queryset.filter(~Exists(answered))
+        elif query_flag(self.request, 'seen'):
+            queryset = queryset.filter(Exists(answered))
+        
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def dictionary(self, request):
+        """Get the question ordinal dictionary used by compact ID sets"""
+        dictionary = get_question_dictionary()
+        etag = f'"{dictionary.version}"'
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response({
+            'version': dictionary.version,
+            'questionIds': dictionary.question_ids
+        }, headers={'ETag': etag})
+    
+    def get_snapshot(self):
+        """Shared question snapshot, if this request can be served from it"""
+        params = self.request.query_params
+        if any(query_flag(self.request, name) for name in ('seen', 'unseen', 'idsOnly')):
+            return None
+        if wants_compact_ids(self.request) or params.get('format'):
+            return None
+        return get_question_snapshot()
+    
+    def list(self, request, *args, **kwargs):
+        """List questions, or only their IDs when idsOnly=true"""
+        if query_flag(request, 'idsOnly'):
+            queryset = self.get_queryset().order_by()
+            return Response(list(queryset.values_list('question_id', flat=True)))
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
+            return self.list_from_snapshot(request, snapshot)
+        return super().list(request, *args, **kwargs)
+    
+    def list_from_snapshot(self, request, snapshot):
+        """Paginated question list rendered from the mapped snapshot"""
+        question_ids = snapshot.filter_ids(
+            subject=request.query_params.get('subject') or None,
+            topic=request.query_params.get('topic') or None,
+        )
+        paginator = self.paginator
+        page_size = paginator.get_page_size(request)
+        try:
+            page_number = int(request.query_params.get(paginator.page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        page_count = max(1, -(-len(question_ids) // page_size))
+        if page_number < 1 or page_number > page_count:
+            return Response({'detail': 'Invalid page.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        url = request.build_absolute_uri()
+        next_link = None
+        previous_link = None
+        if page_number < page_count:
+            next_link = replace_query_param(url, paginator.page_query_param, page_number + 1)
+        if page_number == 2:
+            previous_link = remove_query_param(url, paginator.page_query_param)
+        elif page_number > 2:
+            previous_link = replace_query_param(url, paginator.page_query_param, page_number - 1)
+        
+        start = (page_number - 1) * page_size
+        results = snapshot.render(question_ids[start:start + page_size])
+        envelope = json.dumps({
+            'count': len(question_ids),
+            'next': next_link,
+            'previous': previous_link,
+        }, separators=(',', ':')).encode('utf-8')
+        return json_bytes_response(envelope[:-1] + b',"results":' + results + b'}')
+    
     @action(detail=False, methods=['post'])
     def bulk(self, request):
         """Get multiple questions by IDs or create multiple questions"""
         if 'questionIds' in request.data:
-            # Get multiple questions by IDs
+            # Get multiple questions by IDs in request order (seen/unseen/idsOnly query params apply)
             question_ids = request.data.get('questionIds', [])
-            questions = Question.objects.filter(question_id__in=question_ids)
-            serializer = self.get_serializer(questions, many=True)
-            return Response(serializer.data)
+            if not isinstance(question_ids, list):
+                return Response({'error': 'questionIds must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+            with_missing = query_flag(request, 'withMissing')
+            if query_flag(request, 'idsOnly'):
+                return Response(fetch_question_ids(question_ids, self.get_queryset()))
+            
+            snapshot = self.get_snapshot()
+            if snapshot is not None:
+                requested = unique_ids(question_ids)
+                found = [question_id for question_id in requested if question_id in snapshot.positions]
+                missing = [question_id for question_id in requested if question_id not in snapshot.positions]
+                content = snapshot.render(found)
+                if with_missing:
+                    content = b'{"questions":' + content + b',"missing":' + json.dumps(missing).encode('utf-8') + b'}'
+                response = json_bytes_response(content)
+            else:
+                filtered = query_flag(request, 'seen') or query_flag(request, 'unseen')
+                questions, missing = fetch_questions(question_ids, self.get_queryset() if filtered else None)
+                response = Response({'questions': questions, 'missing': missing} if with_missing else questions)
+            response['X-Missing-Question-Count'] = str(len(missing))
+            return response
         elif 'questions' in request.data:
             # Bulk create questions
             questions_data = request.data.get('questions', [])
@@ -119,10 +280,62 @@ class ExamViewSet(viewsets.ModelViewSet):
     queryset = Exam.objects.all()
     serializer_class = ExamSerializer
     
+    def get_queryset(self):
+        queryset = Exam.objects.all()
+        # Exams that contain a given question (indexed on ExamQuestion.question)
+        question_id = self.request.query_params.get('containsQuestion', None)
+        if question_id:
+            queryset = queryset.filter(memberships__question_id=question_id)
+        return queryset
+    
     def perform_create(self, serializer):
         import uuid
         exam_id = f"exam_{uuid.uuid4().hex[:16]}"
+        # ExamQuestion rows are synced by the Exam post_save handler
         serializer.save(exam_id=exam_id)
+    
+    def list(self, request, *args, **kwargs):
+        """List exams; ?expand=summary adds per-exam subject counts"""
+        if 'summary' not in query_expand(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        exams = page if page is not None else list(queryset)
+        data = self.get_serializer(exams, many=True).data
+        summaries = exam_summaries(exams)
+        for item, exam in zip(data, exams):
+            item['summary'] = summaries[exam.exam_id]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get an exam; ?expand=questions inlines its questions in order, ?expand=summary adds subject counts"""
+        exam = self.get_object()
+        data = self.get_serializer(exam).data
+        expand = query_expand(request)
+        data = expand_exam_payload(data, exam.question_ids, expand - {'summary'})
+        if 'summary' in expand:
+            data['summary'] = exam_summaries([exam])[exam.exam_id]
+        return Response(data)
+    
+    @action(detail=True, methods=['get'], url_path='question-ids')
+    def question_ids(self, request, pk=None):
+        """Get the exam's question IDs in exam order, optionally filtered by subject, topic and seen/unseen"""
+        if not Exam.objects.filter(exam_id=pk).exists():
+            return Response({'error': 'Exam not found'}, status=status.HTTP_404_NOT_FOUND)
+        seen = None
+        if query_flag(request, 'unseen'):
+            seen = False
+        elif query_flag(request, 'seen'):
+            seen = True
+        question_ids = exam_question_ids(
+            pk,
+            subject=request.query_params.get('subject'),
+            topic=request.query_params.get('topic'),
+            seen=seen,
+        )
+        return Response({'examId': pk, 'questionIds': question_ids})
 
 
 class AttemptViewSet(viewsets.ModelViewSet):
@@ -144,44 +357,348 @@ class AttemptViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        with plan_counters({data.get('plan_date_key'): [data.get('question_id')]}):
+            serializer.save()
+    
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        question_ids_by_plan = {instance.plan_date_key: [instance.question_id]}
+        question_ids_by_plan.setdefault(data.get('plan_date_key', instance.plan_date_key), []).append(
+            data.get('question_id', instance.question_id))
+        with plan_counters(question_ids_by_plan):
+            serializer.save()
+    
+    def perform_destroy(self, instance):
+        with plan_counters({instance.plan_date_key: [instance.question_id]}):
+            instance.delete()
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Insert many attempts at once; retried items with a known idempotencyKey are ignored"""
+        items = request.data.get('attempts')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'attempts array required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > ATTEMPT_BATCH_LIMIT:
+            return Response({'error': f'At most {ATTEMPT_BATCH_LIMIT} attempts per batch'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        attempts = []
+        errors = []
+        for i, item in enumerate(items):
+            serializer = AttemptBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                attempts.append(serializer.to_attempt())
+            else:
+                errors.append({'index': i, 'error': serializer.errors})
+        
+        attempt_ids = list(dict.fromkeys(a.attempt_id for a in attempts))
+        question_ids_by_plan = {}
+        for attempt in attempts:
+            if attempt.plan_date_key:
+                question_ids_by_plan.setdefault(attempt.plan_date_key, []).append(attempt.question_id)
+        
+        # Plan counters move by the change in answered questions, once per affected plan
+        with plan_counters(question_ids_by_plan):
+            existing = set()
+            for start in range(0, len(attempt_ids), 500):
+                existing.update(Attempt.objects.filter(
+                    attempt_id__in=attempt_ids[start:start + 500]
+                ).values_list('attempt_id', flat=True))
+            Attempt.objects.bulk_create(attempts, batch_size=500, ignore_conflicts=True)
+            if len(existing) < len(attempt_ids):
+                bump_attempt_version()  # bulk_create sends no post_save
+        
+        created = len(set(attempt_ids) - existing)
+        return Response({
+            'received': len(items),
+            'created': created,
+            'duplicates': len(attempts) - created,
+            'attemptIds': [a.attempt_id for a in attempts],
+            'errors': errors if errors else None
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
     @action(detail=False, methods=['get'])
     def answered_ids(self, request):
         """Get all answered question IDs"""
-        answered_ids = Attempt.objects.values_list('question_id', flat=True).distinct()
-        return Response(list(answered_ids))
+        answered_ids = list(Attempt.objects.order_by().values_list('question_id', flat=True).distinct())
+        if wants_compact_ids(request):
+            return Response(encode_id_list(answered_ids))
+        return Response(answered_ids)
 
 
 class ExamSessionViewSet(viewsets.ModelViewSet):
-    queryset = ExamSession.objects.all()
+    queryset = ExamSession.objects.defer('results')
     serializer_class = ExamSessionSerializer
     
+    # Progress keys that may be buffered by the write-behind layer
+    BUFFERABLE_PROGRESS_KEYS = {'currentIndex', 'isPaused'}
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Reads and full writes of a session must see its buffered progress first
+        # (list views may lag by one flush interval, like reads on other workers)
+        if kwargs.get('pk') and self.action not in ('progress', 'delta'):
+            flush_session(kwargs['pk'])
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        
+        exam_id = params.get('examId')
+        if exam_id:
+            queryset = queryset.filter(exam_id=exam_id)
+        mode = params.get('mode')
+        if mode:
+            queryset = queryset.filter(mode=mode)
+        if params.get('isComplete') not in (None, ''):
+            queryset = queryset.filter(is_complete=query_flag(self.request, 'isComplete'))
+        started_after = query_datetime(self.request, 'startedAfter')
+        if started_after:
+            queryset = queryset.filter(started_at__gte=started_after)
+        started_before = query_datetime(self.request, 'startedBefore', end_of_day=True)
+        if started_before:
+            queryset = queryset.filter(started_at__lte=started_before)
+        ordering = params.get('ordering')
+        if ordering:
+            field = SESSION_ORDERING_FIELDS.get(ordering.lstrip('-'))
+            if field is None:
+                raise ValidationError({'error': f'ordering must be one of {", ".join(SESSION_ORDERING_FIELDS)}'})
+            direction = '-' if ordering.startswith('-') else ''
+            queryset = queryset.order_by(f'{direction}{field}', f'{direction}pk')
+        return queryset
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get a session; ?expand=questions inlines its questions in exam order"""
+        session = self.get_object()
+        data = self.get_serializer(session).data
+        return Response(expand_exam_payload(data, session.question_ids, query_expand(request)))
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List sessions; ?view=summary returns slim resume-card rows and
+        ?limit=N the first N rows as a plain list (no page walk for "latest session" lookups)
+        """
+        summary = request.query_params.get('view') == 'summary'
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            if not limit.isdigit() or int(limit) < 1:
+                return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = self.filter_queryset(self.get_queryset())
+            limit = min(int(limit), SESSION_LIST_LIMIT)
+            if summary:
+                return Response([session_summary(row) for row in summary_queryset(queryset)[:limit]])
+            return Response(self.get_serializer(queryset[:limit], many=True).data)
+        if not summary:
+            return super().list(request, *args, **kwargs)
+        rows = summary_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([session_summary(row) for row in page])
+        return Response([session_summary(row) for row in rows])
+    
+    def update(self, request, *args, **kwargs):
+        """Full or partial update under a row lock; a stale `version` gets a 409 like `progress`"""
+        partial = kwargs.pop('partial', False)
+        with transaction.atomic():
+            session = get_object_or_404(ExamSession.objects.select_for_update().defer('results'), session_id=kwargs['pk'])
+            expected_version = request.data.get('version')
+            if expected_version is not None and expected_version != session.version:
+                return Response({
+                    'error': 'Session was modified by another request',
+                    'version': session.version
+                }, status=status.HTTP_409_CONFLICT)
+            serializer = self.get_serializer(session, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+        return Response(serializer.data)
+    
+    def perform_update(self, serializer):
+        was_complete = serializer.instance.is_complete
+        session = serializer.save(version=F('version') + 1)
+        session.refresh_from_db(fields=['version'])
+        # Completing through PUT/PATCH stores the results summary like `progress` does
+        if session.is_complete and not was_complete:
+            finalize_session(session)
+    
     @action(detail=False, methods=['get'])
     def incomplete(self, request):
-        """Get all incomplete sessions"""
-        incomplete = ExamSession.objects.filter(is_complete=False)
-        serializer = self.get_serializer(incomplete, many=True)
-        return Response(serializer.data)
+        """Get resume-card summaries of recent incomplete sessions"""
+        return Response(incomplete_sessions())
     
     @action(detail=True, methods=['patch'])
     def progress(self, request, pk=None):
         """Save exam progress"""
-        session = self.get_object()
         data = request.data
         
-        if 'currentIndex' in data:
-            session.current_index = data['currentIndex']
-        if 'answers' in data:
-            session.answers = data['answers']
-        if 'timeSpent' in data:
-            session.time_spent = data['timeSpent']
-        if 'isComplete' in data:
-            session.is_complete = data['isComplete']
-        if 'isPaused' in data:
-            session.is_paused = data['isPaused']
-        
-        session.save()
+        buffer = get_progress_buffer()
+        if buffer is not None and data and set(data) <= self.BUFFERABLE_PROGRESS_KEYS:
+            if not ExamSession.objects.filter(session_id=pk).exists():
+                return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+            pending = buffer.add(pk, current_index=data.get('currentIndex'), is_paused=data.get('isPaused'))
+            return Response({'sessionId': pk, 'buffered': True, 'pending': pending}, status=status.HTTP_202_ACCEPTED)
+        flush_session(pk)
+        
+        with transaction.atomic():
+            session = get_object_or_404(ExamSession.objects.select_for_update().defer('results'), session_id=pk)
+            was_complete = session.is_complete
+            if data.get('version') is not None and data['version'] != session.version:
+                return Response({
+                    'error': 'Session was modified by another request',
+                    'version': session.version
+                }, status=status.HTTP_409_CONFLICT)
+            
+            if 'currentIndex' in data:
+                session.current_index = data['currentIndex']
+            if 'answers' in data:
+                session.answers = data['answers']
+            if 'timeSpent' in data:
+                session.time_spent = data['timeSpent']
+            if 'isComplete' in data:
+                session.is_complete = data['isComplete']
+            if 'isPaused' in data:
+                session.is_paused = data['isPaused']
+            
+            session.version += 1
+            session.save()
+            if session.is_complete and not was_complete:
+                finalize_session(session)
         serializer = self.get_serializer(session)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def results(self, request, pk=None):
+        """Get the stored results summary (computed on the fly while the session is in progress)"""
+        session = ExamSession.objects.filter(session_id=pk).values('is_complete', 'results').first()
+        if session is None:
+            return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+        if session['results'] is not None:
+            return Response({'sessionId': pk, 'isComplete': session['is_complete'], **session['results']})
+        
+        # Sessions completed before summaries existed, or still in progress
+        session = ExamSession.objects.get(session_id=pk)
+        if session.is_complete:
+            results = finalize_session(session)
+        else:
+            results = build_results_summary(session.question_ids, session.answers, session.time_spent)
+        return Response({'sessionId': pk, 'isComplete': session.is_complete, **results})
+    
+    @action(detail=True, methods=['patch'])
+    def delta(self, request, pk=None):
+        """Merge a single answer into the session progress in one UPDATE"""
+        data = request.data
+        question_id = data.get('questionId')
+        time_spent = data.get('timeSpent')
+        current_index = data.get('currentIndex')
+        expected_version = data.get('version')
+        
+        if question_id is None and current_index is None:
+            return Response({'error': 'questionId or currentIndex required'}, status=status.HTTP_400_BAD_REQUEST)
+        if question_id is not None and not is_valid_json_key(question_id):
+            return Response({'error': 'Invalid questionId'}, status=status.HTTP_400_BAD_REQUEST)
+        for name, value in (('timeSpent', time_spent), ('currentIndex', current_index), ('version', expected_version)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                return Response({'error': f'{name} must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Only navigation is buffered; answers and time spent feed the results
+        # summary, which another worker may finalize before this one flushes
+        buffer = get_progress_buffer()
+        if buffer is not None and expected_version is None and question_id is None:
+            if not ExamSession.objects.filter(session_id=pk).exists():
+                return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+            pending = buffer.add(pk, current_index=current_index)
+            return Response({'sessionId': pk, 'buffered': True, 'pending': pending}, status=status.HTTP_202_ACCEPTED)
+        flush_session(pk)
+        
+        try:
+            result = merge_progress(
+                pk,
+                question_id=question_id,
+                answer=data.get('answer'),
+                time_spent=time_spent,
+                current_index=current_index,
+                expected_version=expected_version,
+            )
+        except SessionNotFound:
+            return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+        except VersionConflict as e:
+            return Response({
+                'error': 'Session was modified by another request',
+                'version': e.current_version
+            }, status=status.HTTP_409_CONFLICT)
+        return Response(result)
+    
+    @action(detail=True, methods=['post'])
+    def answer(self, request, pk=None):
+        """Grade an answer, record the attempt, merge progress and update the plan in one transaction"""
+        data = request.data
+        question_id = data.get('questionId')
+        selected_answer = data.get('answer')
+        time_spent = data.get('timeSpent', 0)
+        current_index = data.get('currentIndex')
+        
+        if not is_valid_json_key(question_id) or not isinstance(selected_answer, str) or not selected_answer:
+            return Response({'error': 'questionId and answer required'}, status=status.HTTP_400_BAD_REQUEST)
+        for name, value in (('timeSpent', time_spent), ('currentIndex', current_index)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                return Response({'error': f'{name} must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        key = get_answer_key(question_id)
+        if key is None:
+            return Response({'error': 'Question not found'}, status=status.HTTP_404_NOT_FOUND)
+        is_correct = selected_answer == key['correct_answer']
+        
+        session = ExamSession.objects.filter(session_id=pk).values('mode', 'exam_id', 'plan_date_key', 'config').first()
+        if session is None:
+            return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+        plan_date_key = session['plan_date_key'] or (session['config'] or {}).get('planDateKey')
+        
+        # One attempt per session and question; changing the answer updates it
+        attempt_id = attempt_id_for_key(f'{pk}:{question_id}')
+        plan_data = None
+        try:
+            with plan_counters({plan_date_key: [question_id]}) as plans:
+                attempt = Attempt.objects.select_for_update().filter(attempt_id=attempt_id).first()
+                created = attempt is None
+                if created:
+                    attempt = Attempt(attempt_id=attempt_id, question_id=question_id, subject=key['subject'],
+                                      topic=key['topic'] or 'Unknown', exam_id=session['exam_id'],
+                                      mode=session['mode'], plan_date_key=plan_date_key)
+                attempt.selected_answer = selected_answer
+                attempt.is_correct = is_correct
+                attempt.time_spent = time_spent or 0
+                attempt.save(force_insert=created)
+                
+                progress = merge_progress(pk, question_id=question_id, answer=selected_answer,
+                                          time_spent=time_spent, current_index=current_index)
+        except SessionNotFound:
+            # Deleted after the check above; the attempt is rolled back with the transaction
+            return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        plan = plans.get(plan_date_key)
+        if plan is not None and question_id in plan.question_ids:
+            plan_data = {
+                'dateKey': plan.date_key,
+                'answeredCount': plan.answered_count,
+                'correctCount': plan.correct_count,
+                'wrongCount': plan.wrong_count,
+                'accuracy': plan.accuracy,
+                'isComplete': plan.is_complete
+            }
+        
+        return Response({
+            'progress': progress,
+            'attempt': {
+                'attemptId': attempt_id,
+                'questionId': question_id,
+                'isCorrect': is_correct,
+                'correctAnswer': key['correct_answer']
+            },
+            'plan': plan_data
+        })
 
 
 class DailyPlanViewSet(viewsets.ModelViewSet):
@@ -199,7 +716,7 @@ class DailyPlanViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     def create(self, request):
-        """Create a new daily plan (get_or_create logic)"""
+        """Create a new daily plan (returns the existing plan if dateKey is taken)"""
         date_key = request.data.get('dateKey')
         if not date_key:
             return Response({'error': 'dateKey is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -210,12 +727,32 @@ class DailyPlanViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(plan)
             return Response(serializer.data)
         except DailyPlan.DoesNotExist:
-            # Create new plan
+            # Create new plan; a concurrent create for the same dateKey wins without an IntegrityError
             serializer = self.get_serializer(data=request.data)
-            if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            plan, created = insert_plan(DailyPlan(**{'date_key': date_key, **serializer.validated_data}))
+            return Response(self.get_serializer(plan).data,
+                            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def today(self, request):
+        """
+        Get or generate the plan for today (or dateKey) on the server
+        
+        Body (all optional): dateKey, fallbackSubject (used when no focus subject
+        can be selected), quoteCandidates (motivational quotes to pick from).
+        """
+        date_key = request.data.get('dateKey') or get_ethiopian_date_key()
+        if not isinstance(date_key, str):
+            return Response({'error': 'dateKey must be a string'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        quote_candidates = request.data.get('quoteCandidates')
+        if not isinstance(quote_candidates, list):
+            quote_candidates = []
+        plan, created = ensure_daily_plan(date_key, request.data.get('fallbackSubject'), quote_candidates)
+        return Response(self.get_serializer(plan).data,
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
     
     def retrieve(self, request, date_key=None):
         """Get daily plan by date_key"""
@@ -231,18 +768,7 @@ class DailyPlanViewSet(viewsets.ModelViewSet):
         """Recompute daily plan stats"""
         try:
             plan = DailyPlan.objects.get(date_key=date_key)
-            # Get attempts for this plan
-            plan_attempts = Attempt.objects.filter(plan_date_key=date_key)
-            plan_question_ids = set(plan.question_ids)
-            
-            relevant_attempts = [a for a in plan_attempts if a.question_id in plan_question_ids]
-            
-            plan.answered_count = len(relevant_attempts)
-            plan.correct_count = sum(1 for a in relevant_attempts if a.is_correct)
-            plan.wrong_count = plan.answered_count - plan.correct_count
-            plan.accuracy = (plan.correct_count / plan.answered_count * 100) if plan.answered_count > 0 else 0
-            plan.is_complete = plan.answered_count >= len(plan.question_ids)
-            plan.save()
+            plan.recompute_stats()
             
             serializer = self.get_serializer(plan)
             return Response(serializer.data)
@@ -278,55 +804,9 @@ class SubjectPriorityViewSet(viewsets.ModelViewSet):
     
     def list(self, request):
         """Get all subject priorities, initialize if needed"""
-        priorities = list(SubjectPriority.objects.all())
-        
         # If no priorities exist, initialize them based on weakness scores
-        if not priorities:
-            # Calculate weakness scores for all subjects
-            all_attempts = Attempt.objects.all()
-            attempts_by_subject = {}
-            for attempt in all_attempts:
-                if attempt.subject not in attempts_by_subject:
-                    attempts_by_subject[attempt.subject] = []
-                attempts_by_subject[attempt.subject].append(attempt)
-            
-            # Calculate weakness score for each subject (matching frontend formula)
-            import math
-            subject_scores = []
-            for subject in OFFICIAL_SUBJECTS:
-                attempts = attempts_by_subject.get(subject, [])
-                if attempts:
-                    correct_count = sum(1 for a in attempts if a.is_correct)
-                    total = len(attempts)
-                    accuracy = (correct_count / total * 100) if total > 0 else 0
-                    # Match frontend formula: (100 - accuracy) * Math.log1p(totalAttempted)
-                    weakness_score = (100 - accuracy) * math.log1p(total)
-                else:
-                    weakness_score = 1000  # High score for subjects with no attempts
-                
-                subject_scores.append({
-                    'subject': subject,
-                    'weakness_score': weakness_score
-                })
-            
-            # Sort by weakness score (highest = weakest = highest priority)
-            subject_scores.sort(key=lambda x: x['weakness_score'], reverse=True)
-            
-            # Create SubjectPriority objects
-            for idx, item in enumerate(subject_scores):
-                SubjectPriority.objects.create(
-                    subject=item['subject'],
-                    priority_order=idx,
-                    is_completed=False,
-                    round_number=1
-                )
-            
-            priorities = list(SubjectPriority.objects.all().order_by('priority_order'))
-        else:
-            # Sort existing priorities by priority_order
-            priorities = sorted(priorities, key=lambda p: p.priority_order)
-        
-        serializer = self.get_serializer(priorities, many=True)
+        seed_priorities()
+        serializer = self.get_serializer(SubjectPriority.objects.order_by('priority_order', 'subject'), many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['patch'])
@@ -335,21 +815,10 @@ class SubjectPriorityViewSet(viewsets.ModelViewSet):
         order_data = request.data.get('order', [])
         if not order_data:
             return Response({'error': 'order array required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(order_data, list) or not all(isinstance(subject, str) for subject in order_data):
+            return Response({'error': 'order must be an array of subject names'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update priority order for each subject
-        for idx, subject_name in enumerate(order_data):
-            try:
-                priority = SubjectPriority.objects.get(subject=subject_name)
-                priority.priority_order = idx
-                priority.save()
-            except SubjectPriority.DoesNotExist:
-                # Create if doesn't exist
-                SubjectPriority.objects.create(
-                    subject=subject_name,
-                    priority_order=idx,
-                    is_completed=False,
-                    round_number=1
-                )
+        reorder_priorities(order_data)
         
         # Return updated list
         priorities = SubjectPriority.objects.all().order_by('priority_order')
@@ -359,25 +828,16 @@ class SubjectPriorityViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['patch'])
     def toggle(self, request, subject=None):
         """Toggle completion status for a subject"""
-        try:
-            priority = SubjectPriority.objects.get(subject=subject)
-            priority.is_completed = not priority.is_completed
-            priority.save()
-            serializer = self.get_serializer(priority)
-            return Response(serializer.data)
-        except SubjectPriority.DoesNotExist:
+        priority = toggle_priority(subject)
+        if priority is None:
             return Response({'error': 'Subject priority not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = self.get_serializer(priority)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def round_two(self, request):
         """Reset all completions and increment round number"""
-        priorities = SubjectPriority.objects.all()
-        max_round = max([p.round_number for p in priorities], default=1)
-        
-        for priority in priorities:
-            priority.is_completed = False
-            priority.round_number = max_round + 1
-            priority.save()
+        start_next_round()
         
         # Return updated list
         priorities = SubjectPriority.objects.all().order_by('priority_order')
@@ -385,9 +845,98 @@ class SubjectPriorityViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class QuestionBundleViewSet(viewsets.ViewSet):
+    """Immutable, precompressed question bank bundles"""
+    
+    def manifest(self, request):
+        """List the current bank and per-subject bundle hashes"""
+        manifest = get_bundle_manifest()
+        etag = f'"{manifest["version"]}"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(manifest, headers=headers)
+    
+    def download(self, request, bundle_hash=None, encoding=None):
+        """Serve a bundle by content hash with far-future cache headers"""
+        content = None
+        if encoding == 'gz' and 'br' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            content = read_bundle(bundle_hash, 'br')
+            if content is not None:
+                encoding = 'br'
+        if content is None:
+            content = read_bundle(bundle_hash, encoding)
+        if content is None:
+            return Response({'error': 'Bundle not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        response = HttpResponse(content, content_type='application/json')
+        response['Content-Encoding'] = 'br' if encoding == 'br' else 'gzip'
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        response['ETag'] = f'"{bundle_hash}.{encoding}"'
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+
 class DebugViewSet(viewsets.ViewSet):
     """Debug endpoints for monitoring"""
     
+    @action(detail=False, methods=['get'])
+    def write_behind(self, request):
+        """Get session write-behind buffer statistics for this worker"""
+        buffer = get_progress_buffer()
+        if buffer is None:
+            return Response({'enabled': False})
+        return Response({'enabled': True, **buffer.snapshot_stats()})
+    
+    @action(detail=False, methods=['get'])
+    def profiles(self, request):
+        """List captured request profiles, newest first"""
+        return Response({
+            'enabled': settings.PROFILE_CAPTURE_ENABLED,
+            'profiles': [
+                {
+                    **meta,
+                    'pstatsUrl': request.build_absolute_uri(f'{meta["id"]}.pstats/'),
+                    'collapsedUrl': request.build_absolute_uri(f'{meta["id"]}.collapsed/'),
+                }
+                for meta in list_captures()
+            ],
+        })
+    
+    @action(detail=False, methods=['get'], url_path=r'profiles/(?P<profile_id>[\w-]+)\.(?P<kind>pstats|collapsed)')
+    def profile_file(self, request, profile_id=None, kind=None):
+        """Download a capture's .pstats or collapsed-stack file"""
+        path = capture_file(profile_id, kind)
+        if path is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        content_type = 'application/octet-stream' if kind == 'pstats' else 'text/plain; charset=utf-8'
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path),
+                            content_type=content_type)
+    
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        """Prometheus metrics; ?scope=worker skips merging the other workers' files"""
+        if not settings.METRICS_ENABLED:
+            return Response({'error': 'Metrics are disabled'}, status=status.HTTP_404_NOT_FOUND)
+        snapshots = collect(merge=request.query_params.get('scope') != 'worker')
+        return HttpResponse(render_prometheus(snapshots), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    @action(detail=False, methods=['get', 'delete'])
+    def slow(self, request):
+        """Get (or DELETE to clear) this worker's slowest recent requests"""
+        log = get_slow_request_log()
+        if log is None:
+            return Response({'enabled': False})
+        if request.method == 'DELETE':
+            log.clear()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        limit = request.query_params.get('limit')
+        return Response({
+            'enabled': True,
+            'thresholdMs': settings.REQUEST_PROFILING_SLOW_MS,
+            'requests': log.worst(int(limit) if limit and limit.isdigit() else None),
+        })
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get table counts and connection status"""
@@ -466,6 +1015,20 @@ class AnalyticsViewSet(viewsets.ViewSet):
         
         return Response(subject_stats)
     
+    @action(detail=False, methods=['get'])
+    def focus(self, request):
+        """Focus scores, the weighted focus-subject candidates and the priority seeding order"""
+        priorities = list(SubjectPriority.objects.all().order_by('priority_order', 'subject'))
+        scores = focus_scores(OFFICIAL_SUBJECTS, priorities)
+        first_active = next((p.subject for p in priorities if not p.is_completed), None)
+        return Response({
+            'version': attempt_version(),
+            'scores': scores,
+            'candidates': focus_candidates(scores),
+            'fallbackSubject': None if scores else first_active,
+            'seedingOrder': seeding_order(OFFICIAL_SUBJECTS),
+        })
+    
     @action(detail=False, methods=['get'])
     def topics(self, request):
         """Calculate topic statistics for a subject"""
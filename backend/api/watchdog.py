@@ -0,0 +1,179 @@
+"""
+Slow-request watchdog
+
+gunicorn kills a worker whose request runs past --timeout (120 s in the
+Procfile) without saying where it was stuck. With REQUEST_WATCHDOG_ENABLED
+set, RequestWatchdogMiddleware registers every in-flight request and a
+daemon thread per worker checks them every REQUEST_WATCHDOG_INTERVAL
+seconds. A request running longer than REQUEST_WATCHDOG_THRESHOLD seconds
+gets its thread's Python stack (sys._current_frames) and the SQL it is
+currently executing, if any, logged as one JSON line. The dump repeats every
+REQUEST_WATCHDOG_REPEAT seconds while the request is still running, so the
+last one before a kill shows where it was stuck.
+"""
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_SQL_LENGTH = 4000
+
+
+class InFlightRequest:
+    """A running request as seen by the watchdog"""
+
+    def __init__(self, request):
+        self.thread_id = threading.get_ident()
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.started_at = timezone.now()
+        self.start = time.monotonic()
+        self.sql = None
+        self.sql_started = None
+        self.dumps = 0
+        self.next_dump = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: remember the statement while it runs
+        self.sql, self.sql_started = sql, time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql = self.sql_started = None
+
+
+class RequestWatchdog:
+    """Daemon thread that dumps the stacks of requests running past the threshold"""
+
+    def __init__(self, threshold, interval, repeat):
+        self.threshold = threshold
+        self.interval = interval
+        self.repeat = repeat
+        self._requests = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, entry):
+        entry.next_dump = entry.start + self.threshold
+        key = next(self._ids)
+        with self._lock:
+            self._requests[key] = entry
+        self._ensure_thread()
+        return key
+
+    def unregister(self, key, status_code=None):
+        with self._lock:
+            entry = self._requests.pop(key, None)
+        if entry is not None and entry.dumps:
+            logger.warning(json.dumps({
+                'event': 'slow_request_finished',
+                'pid': os.getpid(),
+                'method': entry.method,
+                'path': entry.path,
+                'status': status_code,
+                'elapsedSeconds': round(time.monotonic() - entry.start, 3),
+                'dumps': entry.dumps,
+            }))
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-watchdog', daemon=True)
+                self._thread.start()
+
+    def dump(self, entry, frames, now):
+        frame = frames.get(entry.thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        sql = entry.sql
+        entry.dumps += 1
+        logger.error(json.dumps({
+            'event': 'slow_request',
+            'pid': os.getpid(),
+            'thread': entry.thread_id,
+            'method': entry.method,
+            'path': entry.path,
+            'startedAt': entry.started_at.isoformat(),
+            'elapsedSeconds': round(now - entry.start, 3),
+            'dump': entry.dumps,
+            'sql': sql[:MAX_SQL_LENGTH] if sql else None,
+            'sqlSeconds': round(now - entry.sql_started, 3) if sql and entry.sql_started else None,
+            'stack': [line.rstrip() for line in stack],
+        }))
+
+    def check(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [entry for entry in self._requests.values() if entry.next_dump <= now]
+        if not due:
+            return
+        frames = sys._current_frames()
+        for entry in due:
+            self.dump(entry, frames, now)
+            entry.next_dump = now + self.repeat
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                logger.exception('Request watchdog check failed')
+
+
+_watchdog = None
+_watchdog_lock = threading.Lock()
+
+
+def get_watchdog():
+    """The worker's watchdog, or None when it is disabled"""
+    global _watchdog
+    if not getattr(settings, 'REQUEST_WATCHDOG_ENABLED', False):
+        return None
+    if _watchdog is None:
+        with _watchdog_lock:
+            if _watchdog is None:
+                _watchdog = RequestWatchdog(
+                    threshold=settings.REQUEST_WATCHDOG_THRESHOLD,
+                    interval=settings.REQUEST_WATCHDOG_INTERVAL,
+                    repeat=settings.REQUEST_WATCHDOG_REPEAT,
+                )
+    return _watchdog
+
+
+class RequestWatchdogMiddleware:
+    """Registers in-flight requests with the worker's watchdog (enabled by REQUEST_WATCHDOG_ENABLED)"""
+
+    def __init__(self, get_response):
+        self.watchdog = get_watchdog()
+        if self.watchdog is None:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        entry = InFlightRequest(request)
+        key = self.watchdog.register(entry)
+        status_code = None
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(entry))
+                response = self.get_response(request)
+            status_code = response.status_code
+            return response
+        finally:
+            self.watchdog.unregister(key, status_code)
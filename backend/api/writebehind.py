@@ -0,0 +1,147 @@
+"""
+Write-behind buffer for high-frequency session progress updates
+
+Navigation and pause/resume updates arrive many times per minute during an
+exam. When SESSION_WRITE_BEHIND_ENABLED is set, these updates are coalesced
+per session in worker memory and written with one UPDATE per session when:
+
+- the flush interval elapses (background thread),
+- the session is completed, read back, or written with an explicit version,
+- the number of buffered updates reaches SESSION_WRITE_BEHIND_MAX_PENDING,
+- the worker shuts down (atexit).
+
+The buffer is per worker, so a read served by a different gunicorn worker can
+lag by up to one flush interval. Answers and time spent are never buffered:
+they feed the results summary, which any worker may finalize.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .progress import SessionNotFound, apply_progress
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """Coalesces progress updates per session until they are flushed"""
+
+    def __init__(self, interval, max_pending):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_updates = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self.stats = {'received': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+
+    @property
+    def saved_writes(self):
+        return self.stats['received'] - self.stats['written'] - self._pending_updates
+
+    def add(self, session_id, current_index=None, is_paused=None):
+        """Buffer one update; returns the number of updates pending for the session"""
+        with self._lock:
+            entry = self._pending.setdefault(session_id, {'current_index': None, 'is_paused': None, 'updates': 0})
+            if current_index is not None:
+                entry['current_index'] = current_index
+            if is_paused is not None:
+                entry['is_paused'] = is_paused
+            entry['updates'] += 1
+            self._pending_updates += 1
+            self.stats['received'] += 1
+            pending = entry['updates']
+            over_limit = self._pending_updates >= self.max_pending
+        self._ensure_thread()
+        if over_limit:
+            self.flush()
+        return pending
+
+    def _take(self, session_id=None):
+        with self._lock:
+            if session_id is None:
+                taken, self._pending = self._pending, {}
+            else:
+                entry = self._pending.pop(session_id, None)
+                taken = {session_id: entry} if entry else {}
+            self._pending_updates -= sum(entry['updates'] for entry in taken.values())
+        return taken
+
+    def flush(self, session_id=None):
+        """Write buffered updates (for one session or all) to the database"""
+        taken = self._take(session_id)
+        written = errors = 0
+        for pending_id, entry in taken.items():
+            extra_updates = {}
+            if entry['is_paused'] is not None:
+                extra_updates['is_paused'] = entry['is_paused']
+            try:
+                apply_progress(pending_id, current_index=entry['current_index'], extra_updates=extra_updates)
+            except SessionNotFound:
+                pass
+            except Exception:
+                errors += 1
+                logger.exception('Failed to flush buffered progress for session %s', pending_id)
+                continue
+            written += 1
+        if taken:
+            with self._lock:
+                self.stats['written'] += written
+                self.stats['errors'] += errors
+                self.stats['flushes'] += 1
+        return len(taken)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='session-write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def snapshot_stats(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'pendingSessions': len(self._pending),
+                'pendingUpdates': self._pending_updates,
+                'savedWrites': self.saved_writes,
+            }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_progress_buffer():
+    """The worker's progress buffer, or None when write-behind is disabled"""
+    global _buffer
+    if not getattr(settings, 'SESSION_WRITE_BEHIND_ENABLED', False):
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer(
+                    interval=settings.SESSION_WRITE_BEHIND_INTERVAL,
+                    max_pending=settings.SESSION_WRITE_BEHIND_MAX_PENDING,
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def flush_session(session_id=None):
+    """Flush pending updates for a session (or all sessions) before reading or overwriting it"""
+    if _buffer is not None:
+        _buffer.flush(session_id)
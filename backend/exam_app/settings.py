@@ -36,6 +36,10 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files on Render
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.watchdog.RequestWatchdogMiddleware',  # No-op unless REQUEST_WATCHDOG_ENABLED
+    'api.metrics.MetricsMiddleware',
+    'api.profiling.RequestProfilingMiddleware',  # No-op unless REQUEST_PROFILING_ENABLED
+    'api.profiling.ProfileCaptureMiddleware',  # No-op unless PROFILE_CAPTURE_ENABLED
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -115,6 +119,62 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # WhiteNoise for serving static files on Render
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Memory-mapped question bank snapshot shared by all gunicorn workers
+# (opt-in: writers that bypass model signals must call question_cache.questions_changed())
+QUESTION_SNAPSHOT_ENABLED = os.environ.get('QUESTION_SNAPSHOT_ENABLED', 'False') == 'True'
+QUESTION_SNAPSHOT_PATH = os.environ.get('QUESTION_SNAPSHOT_PATH', os.path.join(BASE_DIR, 'question_snapshot.bin'))
+
+# Precompressed, content-addressed question bank bundles; bundles that left the manifest are
+# kept for QUESTION_BUNDLE_GRACE_SECONDS so clients holding the previous manifest can still fetch them
+QUESTION_BUNDLE_DIR = os.environ.get('QUESTION_BUNDLE_DIR', os.path.join(BASE_DIR, 'question_bundles'))
+QUESTION_BUNDLE_GRACE_SECONDS = float(os.environ.get('QUESTION_BUNDLE_GRACE_SECONDS', '86400'))
+
+# Opt-in write-behind buffering of exam session progress (per worker)
+SESSION_WRITE_BEHIND_ENABLED = os.environ.get('SESSION_WRITE_BEHIND_ENABLED', 'False') == 'True'
+SESSION_WRITE_BEHIND_INTERVAL = float(os.environ.get('SESSION_WRITE_BEHIND_INTERVAL', '5'))
+SESSION_WRITE_BEHIND_MAX_PENDING = int(os.environ.get('SESSION_WRITE_BEHIND_MAX_PENDING', '200'))
+
+# Incomplete sessions untouched for this many days are hidden and archived by expire_sessions (0 disables)
+SESSION_INCOMPLETE_EXPIRY_DAYS = int(os.environ.get('SESSION_INCOMPLETE_EXPIRY_DAYS', '30'))
+SESSION_INCOMPLETE_LIST_LIMIT = int(os.environ.get('SESSION_INCOMPLETE_LIST_LIMIT', '50'))
+
+# Daily plan quotes, shared with the frontend (grouped by theme)
+MOTIVATIONAL_QUOTES_PATH = os.environ.get(
+    'MOTIVATIONAL_QUOTES_PATH', os.path.join(BASE_DIR.parent, 'data', 'motivationalQuotes.json')
+)
+
+# Opt-in per-worker thread that creates the next study day's plan and warms caches before the day boundary
+# (started by the WSGI entry point only, never by management commands or tests)
+STUDY_DAY_SCHEDULER_ENABLED = os.environ.get('STUDY_DAY_SCHEDULER_ENABLED', 'False') == 'True'
+STUDY_DAY_SCHEDULER_LEAD_MINUTES = int(os.environ.get('STUDY_DAY_SCHEDULER_LEAD_MINUTES', '15'))
+
+# Opt-in per-request SQL/latency profiling (Server-Timing header, slow request log at /api/debug/slow/)
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'False') == 'True'
+REQUEST_PROFILING_SLOW_MS = float(os.environ.get('REQUEST_PROFILING_SLOW_MS', '500'))
+REQUEST_PROFILING_KEEP = int(os.environ.get('REQUEST_PROFILING_KEEP', '50'))
+REQUEST_PROFILING_DUPLICATE_THRESHOLD = int(os.environ.get('REQUEST_PROFILING_DUPLICATE_THRESHOLD', '3'))
+
+# Opt-in cProfile capture of requests flagged with X-Profile-Request / ?_profile= (listed at /api/debug/profiles/)
+PROFILE_CAPTURE_ENABLED = os.environ.get('PROFILE_CAPTURE_ENABLED', 'False') == 'True'
+PROFILE_CAPTURE_TOKEN = os.environ.get('PROFILE_CAPTURE_TOKEN', '')  # When set, the flag value must match it
+PROFILE_CAPTURE_DIR = os.environ.get('PROFILE_CAPTURE_DIR', os.path.join(BASE_DIR, 'request_profiles'))
+PROFILE_CAPTURE_KEEP = int(os.environ.get('PROFILE_CAPTURE_KEEP', '20'))
+PROFILE_CAPTURE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_CAPTURE_SAMPLE_INTERVAL', '0.001'))
+
+# Opt-in per-worker watchdog that logs the stack and current SQL of requests running past the threshold
+# (keep the threshold below gunicorn's --timeout)
+REQUEST_WATCHDOG_ENABLED = os.environ.get('REQUEST_WATCHDOG_ENABLED', 'False') == 'True'
+REQUEST_WATCHDOG_THRESHOLD = float(os.environ.get('REQUEST_WATCHDOG_THRESHOLD', '30'))
+REQUEST_WATCHDOG_INTERVAL = float(os.environ.get('REQUEST_WATCHDOG_INTERVAL', '2'))
+REQUEST_WATCHDOG_REPEAT = float(os.environ.get('REQUEST_WATCHDOG_REPEAT', '30'))
+
+# Opt-in Prometheus metrics at /api/debug/metrics/ (unauthenticated, so expose it on an internal network only);
+# METRICS_SHARED_DIR merges all gunicorn workers through files
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_SHARED_DIR = os.environ.get('METRICS_SHARED_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '10'))
+METRICS_STALE_SECONDS = float(os.environ.get('METRICS_STALE_SECONDS', '300'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -159,6 +219,7 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
+    'x-profile-request',
     'x-requested-with',
 ]
 
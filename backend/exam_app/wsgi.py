@@ -10,3 +10,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_app.settings')
 
 application = get_wsgi_application()
 
+# Only processes that serve requests run the study-day scheduler (runserver
+# loads this module in its serving child, not in the autoreloader or in
+# other management commands); gunicorn must not --preload, or the thread
+# would start in the master instead of the workers
+from api.scheduler import start_scheduler  # noqa: E402
+
+start_scheduler()
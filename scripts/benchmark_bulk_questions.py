@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Benchmark POST /api/questions/bulk/ for 50, 500 and 5000 IDs
+
+Runs against the configured database (SQLite by default, Postgres when
+DATABASE_URL is set). Synthetic questions are added inside a transaction
+that is rolled back at the end, so the real bank is left untouched.
+
+Usage: python scripts/benchmark_bulk_questions.py [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+import django
+
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_dir)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_app.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.models import Question
+from api.question_cache import clear_question_cache, questions_changed
+
+SIZES = [50, 500, 5000]
+
+
+class Rollback(Exception):
+    pass
+
+
+def ensure_questions(count):
+    missing = count - Question.objects.count()
+    if missing > 0:
+        Question.objects.bulk_create([
+            Question(
+                question_id=f"q_{uuid.uuid4().hex[:16]}",
+                question=f"Benchmark question {i}",
+                choices=['A', 'B', 'C', 'D'],
+                correct_answer='A',
+                subject=f"Benchmark Subject {i % 15}",
+                topic=f"Topic {i % 40}",
+            )
+            for i in range(missing)
+        ], batch_size=500)
+        questions_changed()  # bulk_create sends no signals
+
+
+def time_bulk(client, question_ids, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post('/api/questions/bulk/', {'questionIds': question_ids}, format='json')
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    client = APIClient()
+    print(f"Database: {connection.vendor}")
+    print(f"{'path':<10} {'ids':>6} {'cold ms':>10} {'warm p50 ms':>12} {'warm max ms':>12}")
+    try:
+        with transaction.atomic():
+            ensure_questions(max(SIZES))
+            all_ids = list(Question.objects.values_list('question_id', flat=True))
+            snapshot_dir = tempfile.mkdtemp(prefix='bulk-benchmark-')
+            for path, enabled in (('database', False), ('snapshot', True)):
+                # Use a throwaway snapshot so the synthetic rows never reach the real one
+                with override_settings(QUESTION_SNAPSHOT_ENABLED=enabled,
+                                       QUESTION_SNAPSHOT_PATH=os.path.join(snapshot_dir, 'snapshot.bin')):
+                    for size in SIZES:
+                        question_ids = random.sample(all_ids, size)
+                        clear_question_cache()
+                        cold = time_bulk(client, question_ids, 1)[0]
+                        warm = time_bulk(client, question_ids, args.repeat)
+                        print(f"{path:<10} {size:>6} {cold:>10.1f} {statistics.median(warm):>12.1f} {max(warm):>12.1f}")
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+"""
+HTTP load test of the API with baselines and regression checks
+
+Virtual users replay the traffic the frontend generates:
+
+- exam:      open an exam, start a session, load its questions, answer
+             --answers questions one by one, complete it, open the results
+- dashboard: subject stats, attempts page, exams with summaries, trend,
+             recent sessions of the first exams
+- plan:      today's plan, recent plans, its questions, subject/topic
+             stats, focus scores and priorities
+
+Throughput and p50/p95/p99 latency are reported per endpoint. --save-baseline
+writes the results as JSON and --compare checks a run against a saved
+baseline, flagging endpoints whose p95/p99 grew or whose throughput or
+error rate got worse beyond --threshold. The exit status is 1 when a
+regression is flagged.
+
+Run it against a local server on a scratch database; it writes attempts,
+sessions and plans and (with --seed) synthetic questions and an exam:
+
+    (cd backend && DATABASE_URL=sqlite:////tmp/loadtest.sqlite3 python manage.py migrate)
+    (cd backend && DATABASE_URL=sqlite:////tmp/loadtest.sqlite3 gunicorn exam_app.wsgi:application --workers 2)
+    python scripts/load_test.py --base-url http://127.0.0.1:8000/api --seed 600 --save-baseline base.json
+    python scripts/load_test.py --base-url http://127.0.0.1:8000/api --compare base.json
+
+(the server runs from backend/, the script from the repository root)
+
+Use a local Postgres the same way with DATABASE_URL=postgres://... SQLite
+serializes writes, so several users answering at once get 'database is
+locked' errors there; keep --users 1 on SQLite or compare on Postgres. Each
+request opens its own connection like it does against gunicorn's sync
+workers; with --keep-alive, note that runserver adds ~40 ms per reused
+connection (headers and body are separate writes, delayed by the client's
+ACK). Only the standard library is needed.
+
+Usage: python scripts/load_test.py [--users 4] [--duration 60] [--mix exam=1,dashboard=2,plan=2]
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+SEED_PREFIX = 'loadtest'
+DEFAULT_MIX = 'exam=1,dashboard=2,plan=2'
+
+
+class Recorder:
+    """Latency samples per endpoint label, shared by all virtual users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, label, ms, ok):
+        with self._lock:
+            self.samples.setdefault(label, []).append(ms)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class ApiClient:
+    """JSON client for one virtual user"""
+
+    def __init__(self, base_url, recorder=None, keep_alive=False, timeout=120):
+        parts = urlsplit(base_url.rstrip('/'))
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.prefix = parts.path
+        self.recorder = recorder
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        self._connection = connection_class(self.host, timeout=self.timeout)
+
+    def request(self, method, path, label=None, body=None, params=None):
+        """Send a request; records its latency under label (default: method + path)"""
+        url = self.prefix + path + (f'?{urlencode(params)}' if params else '')
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Accept': 'application/json'}
+        if payload is not None:
+            headers['Content-Type'] = 'application/json'
+        label = label or f'{method} {path}'
+
+        for attempt in range(2):
+            if self._connection is None:
+                self._connect()
+            start = time.perf_counter()
+            try:
+                self._connection.request(method, url, body=payload, headers=headers)
+                response = self._connection.getresponse()
+                content = response.read()
+                if not self.keep_alive or response.will_close:
+                    self._connection.close()
+                    self._connection = None
+                break
+            except (http.client.HTTPException, OSError):
+                # Keep-alive connection closed by the server: reconnect once
+                self._connection.close()
+                self._connection = None
+                if attempt or not self.keep_alive:
+                    if self.recorder:
+                        self.recorder.add(label, (time.perf_counter() - start) * 1000, False)
+                    raise RequestFailed(f'{method} {url}: connection failed')
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        ok = response.status < 400
+        if self.recorder:
+            self.recorder.add(label, elapsed_ms, ok)
+        if not ok:
+            raise RequestFailed(f'{method} {url}: HTTP {response.status} {content[:200]!r}')
+        return json.loads(content) if content else None
+
+    def get(self, path, label=None, **params):
+        return self.request('GET', path, label, params=params or None)
+
+    def post(self, path, body, label=None):
+        return self.request('POST', path, label, body=body)
+
+    def patch(self, path, body, label=None):
+        return self.request('PATCH', path, label, body=body)
+
+
+def results(payload):
+    """Items of a paginated or plain list response"""
+    return payload['results'] if isinstance(payload, dict) and 'results' in payload else payload
+
+
+def seed(client, count, exam_size):
+    """Create synthetic questions across the official subjects and one exam"""
+    subjects = sorted(client.get('/analytics/focus/')['seedingOrder'])
+    run_id = uuid.uuid4().hex[:8]
+    question_ids = []
+    for start in range(0, count, 200):
+        batch = [
+            {
+                'questionId': f'{SEED_PREFIX}_{run_id}_{i}',
+                'question': f'Load test question {i}',
+                'choices': ['A', 'B', 'C', 'D'],
+                'correctAnswer': random.choice('ABCD'),
+                'subject': subjects[i % len(subjects)],
+                'topic': f'Topic {i % 12}',
+            }
+            for i in range(start, min(start + 200, count))
+        ]
+        created = client.post('/questions/bulk/', {'questions': batch})
+        question_ids.extend(question['questionId'] for question in created['questions'])
+    exam = client.post('/exams/', {
+        'title': f'Load test exam {run_id}',
+        'questionIds': random.sample(question_ids, min(exam_size, len(question_ids))),
+    })
+    print(f'Seeded {len(question_ids)} questions and exam {exam["examId"]}')
+
+
+class Scenarios:
+    """The traffic mixes; each method is one user visit"""
+
+    fallback_subject = 'Computer Programming'  # OFFICIAL_SUBJECTS[0], like PlanPage
+
+    def __init__(self, client, answers):
+        self.client = client
+        self.answers = answers
+        self._exam_ids = None
+
+    def exam_ids(self):
+        if self._exam_ids is None:
+            self._exam_ids = [exam['examId'] for exam in results(self.client.get('/exams/', 'GET /exams/'))]
+            if not self._exam_ids:
+                raise RequestFailed('No exams to run; use --seed')
+        return self._exam_ids
+
+    def exam(self):
+        client = self.client
+        exam_id = random.choice(self.exam_ids())
+        exam = client.get(f'/exams/{exam_id}/', 'GET /exams/{id}/?expand=summary', expand='summary')
+        question_ids = exam['questionIds'][:self.answers]
+        session = client.post('/sessions/', {
+            'examId': exam_id,
+            'mode': 'practice',
+            'config': {'examId': exam_id},
+            'currentIndex': 0,
+            'questionIds': question_ids,
+            'answers': {},
+            'timeSpent': {},
+            'isComplete': False,
+            'isPaused': False,
+        }, 'POST /sessions/')
+        session_id = session['sessionId']
+        client.post('/questions/bulk/', {'questionIds': question_ids}, 'POST /questions/bulk/')
+        for index, question_id in enumerate(question_ids):
+            client.post(f'/sessions/{session_id}/answer/', {
+                'questionId': question_id,
+                'answer': random.choice('ABCD'),
+                'timeSpent': random.randint(5, 90),
+                'currentIndex': index,
+            }, 'POST /sessions/{id}/answer/')
+        client.patch(f'/sessions/{session_id}/progress/', {'isComplete': True}, 'PATCH /sessions/{id}/progress/')
+        client.get(f'/sessions/{session_id}/results/', 'GET /sessions/{id}/results/')
+
+    def dashboard(self):
+        client = self.client
+        client.get('/analytics/subjects/', 'GET /analytics/subjects/')
+        client.get('/attempts/', 'GET /attempts/')
+        exams = results(client.get('/exams/', 'GET /exams/?expand=summary', expand='summary'))
+        client.get('/analytics/trend/', 'GET /analytics/trend/')
+        for exam in exams[:3]:
+            client.get('/sessions/', 'GET /sessions/?view=summary', examId=exam['examId'], view='summary')
+
+    def plan(self):
+        client = self.client
+        # The server picks today's study day key and the focus subject
+        plan = client.post('/plans/today/', {'fallbackSubject': self.fallback_subject}, 'POST /plans/today/')
+        client.get('/plans/recent/', 'GET /plans/recent/', days=7)
+        if plan.get('questionIds'):
+            client.post('/questions/bulk/', {'questionIds': plan['questionIds']}, 'POST /questions/bulk/')
+        client.get('/analytics/subjects/', 'GET /analytics/subjects/')
+        if plan.get('focusSubject'):
+            client.get('/analytics/topics/', 'GET /analytics/topics/', subject=plan['focusSubject'])
+        client.get('/analytics/focus/', 'GET /analytics/focus/')
+        client.get('/subject-priorities/', 'GET /subject-priorities/')
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('exam', 'dashboard', 'plan'):
+            raise argparse.ArgumentTypeError(f'unknown scenario {name!r}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def virtual_user(args, mix, recorder, deadline, counts, counts_lock, failures):
+    client = ApiClient(args.base_url, recorder, keep_alive=args.keep_alive)
+    scenarios = Scenarios(client, args.answers)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    iterations = 0
+    while time.monotonic() < deadline and (not args.iterations or iterations < args.iterations):
+        name = random.choices(names, weights)[0]
+        try:
+            getattr(scenarios, name)()
+        except RequestFailed as e:
+            with counts_lock:
+                failures.append(f'{name}: {e}')
+        except Exception as e:
+            # An unexpected response shape must not end this user's thread silently
+            with counts_lock:
+                failures.append(f'{name}: {type(e).__name__}: {e}')
+        with counts_lock:
+            counts[name] = counts.get(name, 0) + 1
+        iterations += 1
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    every = []
+    total_errors = 0
+    for label, samples in sorted(recorder.samples.items()):
+        values = sorted(samples)
+        every.extend(values)
+        errors = recorder.errors.get(label, 0)
+        total_errors += errors
+        endpoints[label] = {
+            'count': len(values),
+            'errors': errors,
+            'rps': round(len(values) / elapsed, 2),
+            'p50': round(percentile(values, 0.50), 2),
+            'p95': round(percentile(values, 0.95), 2),
+            'p99': round(percentile(values, 0.99), 2),
+            'max': round(values[-1], 2),
+        }
+    every.sort()
+    total = {
+        'count': len(every),
+        'errors': total_errors,
+        'rps': round(len(every) / elapsed, 2) if elapsed else 0,
+        'p50': round(percentile(every, 0.50), 2),
+        'p95': round(percentile(every, 0.95), 2),
+        'p99': round(percentile(every, 0.99), 2),
+        'max': round(every[-1], 2) if every else 0,
+    }
+    return endpoints, total
+
+
+def print_table(endpoints, total):
+    print(f"\n{'endpoint':<38} {'count':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for label, row in list(endpoints.items()) + [('TOTAL', total)]:
+        print(f"{label:<38} {row['count']:>7} {row['errors']:>5} {row['rps']:>8.2f} "
+              f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+
+
+def compare(current, baseline, threshold, min_delta_ms, min_count):
+    """
+    Regressions of current against baseline
+
+    An endpoint regresses when its p95 or p99 grew by more than threshold
+    (and by at least min_delta_ms), its throughput fell by more than
+    threshold, or its error rate rose. Endpoints with fewer than min_count
+    requests in either run are skipped; their tail percentiles are noise.
+
+    Returns:
+        list of (label, message)
+    """
+    regressions = []
+    rows = dict(current['endpoints'], TOTAL=current['total'])
+    base_rows = dict(baseline['endpoints'], TOTAL=baseline['total'])
+    for label, row in rows.items():
+        base = base_rows.get(label)
+        if base is None or min(base['count'], row['count']) < max(min_count, 1):
+            continue
+        for key in ('p95', 'p99'):
+            delta = row[key] - base[key]
+            if delta >= min_delta_ms and base[key] and delta / base[key] > threshold:
+                regressions.append((label, f'{key} {base[key]:.1f} -> {row[key]:.1f} ms (+{delta / base[key]:.0%})'))
+        if base['rps'] and (base['rps'] - row['rps']) / base['rps'] > threshold:
+            regressions.append((label, f"throughput {base['rps']:.2f} -> {row['rps']:.2f} req/s"))
+        error_rate = row['errors'] / row['count'] if row['count'] else 0
+        base_error_rate = base['errors'] / base['count']
+        if error_rate > base_error_rate:
+            regressions.append((label, f'error rate {base_error_rate:.1%} -> {error_rate:.1%}'))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000/api')
+    parser.add_argument('--users', type=int, default=4, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run')
+    parser.add_argument('--iterations', type=int, default=0, help='Stop each user after this many visits (0: no limit)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Scenario weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--answers', type=int, default=50, help='Questions answered per exam visit')
+    parser.add_argument('--keep-alive', action='store_true',
+                        help='Reuse connections (gunicorn sync workers close them after every response)')
+    parser.add_argument('--seed', type=int, default=0, help='Create this many synthetic questions and an exam first')
+    parser.add_argument('--output', help='Write this run as JSON')
+    parser.add_argument('--save-baseline', help='Write this run as a baseline JSON file')
+    parser.add_argument('--compare', help='Baseline JSON to check this run against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative regression (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=5, help='Ignore latency changes below this')
+    parser.add_argument('--min-count', type=int, default=20, help='Skip endpoints with fewer requests when comparing')
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(ApiClient(args.base_url), args.seed, args.answers)
+
+    recorder = Recorder()
+    counts = {}
+    failures = []
+    counts_lock = threading.Lock()
+    started_at = datetime.now(timezone.utc)
+    start = time.monotonic()
+    deadline = start + args.duration
+    users = [
+        threading.Thread(target=virtual_user, args=(args, args.mix, recorder, deadline, counts, counts_lock, failures))
+        for _ in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - start
+
+    endpoints, total = summarize(recorder, elapsed)
+    run = {
+        'meta': {
+            'baseUrl': args.base_url,
+            'startedAt': started_at.isoformat(),
+            'elapsedSeconds': round(elapsed, 2),
+            'users': args.users,
+            'mix': args.mix,
+            'answers': args.answers,
+            'keepAlive': args.keep_alive,
+            'visits': counts,
+        },
+        'endpoints': endpoints,
+        'total': total,
+    }
+    print(f"{args.users} users, {elapsed:.1f} s, visits: {counts}")
+    print_table(endpoints, total)
+    if failures:
+        print(f'\n{len(failures)} failed visit(s), first: {failures[0]}')
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f'\nWrote {path}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(run, baseline, args.threshold, args.min_delta_ms, args.min_count)
+        print(f"\nCompared with {args.compare} ({baseline['meta']['startedAt']}, "
+              f"{baseline['meta']['users']} users, threshold {args.threshold:.0%})")
+        for label, message in regressions:
+            print(f'  REGRESSION {label}: {message}')
+        if not regressions:
+            print('  No regressions')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,6 +19,7 @@ django.setup()
 import firebase_admin
 from firebase_admin import credentials, firestore
 from api.models import Question, Exam, Attempt, ExamSession, DailyPlan, ThemePreferences, FirebaseCollection
+from api.question_cache import questions_changed
 import time
 
 def convert_timestamp(timestamp):
@@ -178,6 +179,7 @@ def migrate_questions(db, progress_interval=50, verbose=False):
     
     try:
         count = migrate_with_retry(_migrate, "questions")
+        questions_changed()
         print(f"[OK] Collection 'questions': {count:,} records migrated\n")
         return count
     except Exception as e:
@@ -58,11 +58,11 @@ const Dashboard = () => {
       const examsWithProgress = await Promise.all(
         exams.slice(0, 3).map(async (exam) => {
           try {
-            const sessions = await getExamSessions(exam.examId);
+            const sessions = await getExamSessions(exam.examId, { limit: 1 });
             if (sessions.length > 0) {
               const latestSession = sessions[0];
-              const answeredCount = Object.keys(latestSession.answers || {}).length;
-              const totalQuestions = latestSession.questionIds?.length || 0;
+              const answeredCount = latestSession.answeredCount || 0;
+              const totalQuestions = latestSession.totalQuestions || 0;
               const progressPercent = totalQuestions > 0 ? (answeredCount / totalQuestions) * 100 : 0;
               
               return {
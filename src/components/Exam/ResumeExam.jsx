@@ -96,8 +96,8 @@ const ResumeExam = () => {
 
         <div className="space-y-4">
           {sessions.map((session) => {
-            const answeredCount = Object.keys(session.answers || {}).length;
-            const totalQuestions = session.questionIds?.length || 0;
+            const answeredCount = session.answeredCount || 0;
+            const totalQuestions = session.totalQuestions || 0;
             const progress = totalQuestions > 0 ? (answeredCount / totalQuestions) * 100 : 0;
 
             return (
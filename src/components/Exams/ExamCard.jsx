@@ -19,13 +19,13 @@ const ExamCard = ({ exam, onStart, onResume, onRestart }) => {
   const loadExamDetails = async () => {
     try {
       // Load progress
-      const sessions = await getExamSessions(exam.examId);
+      const sessions = await getExamSessions(exam.examId, { limit: 1 });
       let currentProgress = null;
       
       if (sessions.length > 0) {
         const latestSession = sessions[0];
-        const answeredCount = Object.keys(latestSession.answers || {}).length;
-        const totalQuestions = latestSession.questionIds?.length || 0;
+        const answeredCount = latestSession.answeredCount || 0;
+        const totalQuestions = latestSession.totalQuestions || 0;
         const progressPercent = totalQuestions > 0 ? (answeredCount / totalQuestions) * 100 : 0;
 
         currentProgress = {
@@ -41,8 +41,10 @@ const ExamCard = ({ exam, onStart, onResume, onRestart }) => {
         setProgress(currentProgress);
       }
 
-      // Load subject breakdown
-      if (exam.questionIds && exam.questionIds.length > 0) {
+      // Load subject breakdown (inlined by the exams list when available)
+      if (exam.summary) {
+        setSubjectBreakdown(exam.summary.subjects);
+      } else if (exam.questionIds && exam.questionIds.length > 0) {
         setIsLoadingStats(true);
         const questions = await getQuestionsByIds(exam.questionIds);
         const subjects = {};
@@ -32,7 +32,7 @@ const ExamConfig = ({ examId, onClose }) => {
   const loadExam = async () => {
     try {
       setIsLoading(true);
-      const examData = await getExamById(examId);
+      const examData = await getExamById(examId, { expand: 'summary' });
       setExam(examData);
       setMaxQuestions(examData.questionIds?.length || 50);
       setQuestionCount(Math.min(50, examData.questionIds?.length || 50));
@@ -46,8 +46,9 @@ const ExamConfig = ({ examId, onClose }) => {
 
   const loadExamSubjects = async () => {
     try {
-      const questions = await getQuestionsByIds(exam.questionIds);
-      const subjects = [...new Set(questions.map(q => q.subject))];
+      const subjects = exam.summary
+        ? Object.keys(exam.summary.subjects)
+        : [...new Set((await getQuestionsByIds(exam.questionIds)).map(q => q.subject))];
       setAvailableSubjects(subjects.sort());
       if (subjects.length > 0 && !selectedSubject) {
         setSelectedSubject(subjects[0]);
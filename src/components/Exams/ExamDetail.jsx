@@ -57,12 +57,12 @@ const ExamDetail = () => {
       setError(null);
 
       // Load exam
-      const examData = await getExamById(examId);
+      const examData = await getExamById(examId, { expand: 'questions' });
       setExam(examData);
 
       // Load questions
       if (examData.questionIds && examData.questionIds.length > 0) {
-        const questionsData = await getQuestionsByIds(examData.questionIds);
+        const questionsData = examData.questions || await getQuestionsByIds(examData.questionIds);
         setQuestions(questionsData);
         
         // Set max questions and default question count
@@ -96,7 +96,8 @@ const ExamDetail = () => {
       }
 
       // Load progress - aggregate across ALL sessions for this exam
-      const sessions = await getExamSessions(examId);
+      // Full sessions: progress is the union of answered questions across all of them
+      const sessions = await getExamSessions(examId, { summary: false });
       if (sessions.length > 0) {
         // Get total questions in the exam (from exam.questionIds)
         const totalExamQuestions = examData.questionIds?.length || 0;
@@ -23,7 +23,7 @@ const ExamsList = () => {
   const loadExams = async () => {
     try {
       setIsLoading(true);
-      const allExams = await getAllExams();
+      const allExams = await getAllExams({ expand: 'summary' });
       setExams(allExams);
     } catch (err) {
       setError(err.message);
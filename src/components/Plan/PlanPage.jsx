@@ -7,9 +7,7 @@ import {
   getOrCreateDailyPlan, 
   getDailyPlan, 
   listRecentDailyPlans, 
-  recomputeDailyPlanStats,
-  filterQuestionsByType,
-  selectFocusSubject
+  filterQuestionsByType
 } from '../../services/dailyPlanService';
 import { getOrGenerateBonusChallenge } from '../../services/bonusChallengeService';
 import { EXAM_MODES, OFFICIAL_SUBJECTS } from '../../utils/constants';
@@ -196,17 +194,11 @@ const PlanPage = () => {
       const stats = await calculateSubjectStats();
       setSubjectStats(stats);
 
-      // Use priority-based selection
-      let focusSubject = await selectFocusSubject();
-      if (!focusSubject) {
-        // Fallback to first subject if no selection
-        focusSubject = OFFICIAL_SUBJECTS[0];
-      }
-
       const currentTodayKey = getDateKey();
       const storedBonusUnlocked = localStorage.getItem(getBonusUnlockKey(currentTodayKey));
       setMoreMoreClicked(storedBonusUnlocked === 'true');
-      const todayPlan = await getOrCreateDailyPlan(currentTodayKey, focusSubject);
+      // Focus subject and question selection happen on the server
+      const todayPlan = await getOrCreateDailyPlan(currentTodayKey, OFFICIAL_SUBJECTS[0]);
       setCurrentDailyPlan(todayPlan);
       setSelectedDateKey(currentTodayKey);
 
@@ -214,11 +206,6 @@ const PlanPage = () => {
       const recent = await listRecentDailyPlans(14); // Get more to ensure we have all 7 days
       setRecentPlans(recent);
 
-      await recomputeDailyPlanStats(currentTodayKey);
-      const updatedPlan = await getDailyPlan(currentTodayKey);
-      if (updatedPlan) {
-        setCurrentDailyPlan(updatedPlan);
-      }
     } catch (err) {
       console.error('Error loading plan data:', err);
       setError(err.message || 'Failed to load plan data');
@@ -235,16 +222,10 @@ const PlanPage = () => {
       }
       const plan = await getDailyPlan(dateKey);
       if (plan) {
-        await recomputeDailyPlanStats(dateKey);
-        const updated = await getDailyPlan(dateKey);
-        setCurrentDailyPlan(updated || plan);
+        // Counters are kept current by the server as attempts are saved
+        setCurrentDailyPlan(plan);
       } else if (dateKey === todayKey) {
-        // Use priority-based selection
-        let focusSubject = await selectFocusSubject();
-        if (!focusSubject) {
-          focusSubject = OFFICIAL_SUBJECTS[0];
-        }
-        const newPlan = await getOrCreateDailyPlan(dateKey, focusSubject);
+        const newPlan = await getOrCreateDailyPlan(dateKey, OFFICIAL_SUBJECTS[0]);
         setCurrentDailyPlan(newPlan);
       } else {
         setCurrentDailyPlan(null);
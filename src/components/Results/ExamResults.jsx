@@ -5,6 +5,27 @@ import QuestionReview from './QuestionReview';
 import ExamAnalytics from './ExamAnalytics';
 import { formatDuration } from '../../utils/analyticsHelpers';
 import { calculateExamSubjectStats } from '../../services/analyticsService';
+import { getSessionResults } from '../../services/examEngine';
+import { calculateStatus } from '../../utils/statusHelpers';
+
+/**
+ * Map the per-subject buckets of a session results summary to ExamAnalytics stats
+ */
+const toExamSubjectStats = (bySubject = {}) => {
+  const subjectStats = {};
+  Object.entries(bySubject).forEach(([subject, bucket]) => {
+    if (bucket.answered === 0) return;
+    subjectStats[subject] = {
+      subject,
+      totalAttempted: bucket.answered,
+      correctCount: bucket.correct,
+      wrongCount: bucket.wrong,
+      accuracy: bucket.accuracy,
+      status: calculateStatus(bucket.accuracy)
+    };
+  });
+  return subjectStats;
+};
 
 const ExamResults = () => {
   const location = useLocation();
@@ -49,69 +70,77 @@ const ExamResults = () => {
   const loadResults = async (examData) => {
     try {
       setIsLoading(true);
-      const { questions, answers, timeSpent, examId } = examData;
-
-      let correctCount = 0;
-      let wrongCount = 0;
-      const wrongQuestionIds = [];
-      const correctQuestionIds = [];
-
-      questions.forEach((question) => {
-        const selectedAnswer = answers[question.questionId];
-        if (selectedAnswer) {
-          if (selectedAnswer === question.correctAnswer) {
-            correctCount++;
-            correctQuestionIds.push(question.questionId);
-          } else {
-            wrongCount++;
-            wrongQuestionIds.push(question.questionId);
-          }
-        }
-      });
-
-      const totalQuestions = questions.length;
-      const score = totalQuestions > 0 ? (correctCount / totalQuestions) * 100 : 0;
-      const totalTime = Object.values(timeSpent || {}).reduce((sum, time) => sum + time, 0);
+      const { questions, answers, timeSpent, examId, sessionId, isPaused } = examData;
 
-      const wrongQuestionsData = questions.filter(q => 
-        wrongQuestionIds.includes(q.questionId)
-      ).map(q => ({
-        ...q,
-        selectedAnswer: answers[q.questionId],
-        timeSpent: timeSpent[q.questionId] || 0,
-        isCorrect: false
-      }));
+      // Graded server-side once per session; older results without a session ID are graded here
+      let summary = null;
+      if (sessionId) {
+        try {
+          summary = await getSessionResults(sessionId);
+        } catch (error) {
+          console.error('Error loading session results, grading locally:', error);
+        }
+      }
 
-      const correctQuestionsData = questions.filter(q => 
-        correctQuestionIds.includes(q.questionId)
-      ).map(q => ({
+      const answeredQuestions = questions.filter(q => answers[q.questionId]);
+      const wrongQuestionIds = new Set(summary
+        ? summary.wrongQuestionIds
+        : answeredQuestions.filter(q => answers[q.questionId] !== q.correctAnswer).map(q => q.questionId));
+      const toReviewItem = (q, isCorrect) => ({
         ...q,
         selectedAnswer: answers[q.questionId],
         timeSpent: timeSpent[q.questionId] || 0,
-        isCorrect: true
-      }));
-
-      setResults({
-        totalQuestions,
-        correctCount,
-        wrongCount,
-        score: Math.round(score * 100) / 100,
-        totalTime,
-        examId
+        isCorrect
       });
 
-      setWrongQuestions(wrongQuestionsData);
-      setCorrectQuestions(correctQuestionsData);
+      const wrongQuestionsData = answeredQuestions
+        .filter(q => wrongQuestionIds.has(q.questionId))
+        .map(q => toReviewItem(q, false));
+      const correctQuestionsData = answeredQuestions
+        .filter(q => !wrongQuestionIds.has(q.questionId))
+        .map(q => toReviewItem(q, true));
 
-      // Load exam-specific analytics if examId is available
-      if (examId) {
-        try {
-          const stats = await calculateExamSubjectStats(examId);
-          setExamSubjectStats(stats);
-        } catch (error) {
-          console.error('Error loading exam analytics:', error);
+      if (summary) {
+        // Paused results only cover the questions answered so far
+        const totalQuestions = isPaused ? summary.answered : summary.total;
+        const score = isPaused
+          ? (totalQuestions > 0 ? (summary.correct / totalQuestions) * 100 : 0)
+          : summary.score;
+        setResults({
+          totalQuestions,
+          correctCount: summary.correct,
+          wrongCount: summary.wrong,
+          score: Math.round(score * 100) / 100,
+          totalTime: summary.time.total,
+          examId
+        });
+        setExamSubjectStats(toExamSubjectStats(summary.bySubject));
+      } else {
+        const totalQuestions = questions.length;
+        const correctCount = correctQuestionsData.length;
+        const score = totalQuestions > 0 ? (correctCount / totalQuestions) * 100 : 0;
+        setResults({
+          totalQuestions,
+          correctCount,
+          wrongCount: wrongQuestionsData.length,
+          score: Math.round(score * 100) / 100,
+          totalTime: Object.values(timeSpent || {}).reduce((sum, time) => sum + time, 0),
+          examId
+        });
+
+        // Load exam-specific analytics if examId is available
+        if (examId) {
+          try {
+            const stats = await calculateExamSubjectStats(examId);
+            setExamSubjectStats(stats);
+          } catch (error) {
+            console.error('Error loading exam analytics:', error);
+          }
         }
       }
+
+      setWrongQuestions(wrongQuestionsData);
+      setCorrectQuestions(correctQuestionsData);
     } catch (error) {
       console.error('Error loading results:', error);
     } finally {
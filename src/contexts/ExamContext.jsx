@@ -3,14 +3,38 @@ import {
   createExamSession, 
   resumeExamSession, 
   saveExamProgress, 
+  submitAnswer,
   updateCurrentIndex, 
   completeExamSession 
 } from '../services/examEngine';
-import { saveAttempt } from '../services/attemptService';
+import { saveAttemptsBatch } from '../services/attemptService';
 import { getQuestionsByIds } from '../services/questionService';
 
 const ExamContext = createContext(null);
 
+/**
+ * Attempts for the answered questions of a session, keyed like the attempts
+ * recorded by submitAnswer so the server skips the ones it already has
+ */
+const buildSessionAttempts = (session, sessionQuestions, answers, timeSpent) => sessionQuestions
+  .filter((question) => answers[question.questionId])
+  .map((question) => {
+    const questionId = question.questionId;
+    const selectedAnswer = answers[questionId];
+    return {
+      idempotencyKey: `${session.sessionId}:${questionId}`,
+      questionId,
+      selectedAnswer,
+      timeSpent: timeSpent[questionId] || 0,
+      isCorrect: selectedAnswer === question.correctAnswer,
+      examId: session.examId || null,
+      mode: session.mode,
+      subject: question.subject,
+      topic: question.topic || 'Unknown',
+      planDateKey: session.planDateKey || session.config?.planDateKey || null // Tag with plan date for daily isolation
+    };
+  });
+
 export const useExam = () => {
   const context = useContext(ExamContext);
   if (!context) {
@@ -32,7 +56,9 @@ export const ExamProvider = ({ children }) => {
 
   // Load questions when session changes
   useEffect(() => {
-    if (currentSession && currentSession.questionIds) {
+    if (currentSession && currentSession.questions) {
+      setQuestions(currentSession.questions);
+    } else if (currentSession && currentSession.questionIds) {
       loadQuestions(currentSession.questionIds);
     }
   }, [currentSession]);
@@ -116,9 +142,9 @@ export const ExamProvider = ({ children }) => {
     setAnswers(newAnswers);
     setTimeSpent(newTimeSpent);
 
-    // Auto-save to API
+    // Auto-save to API (grades, records the attempt and saves progress in one request)
     try {
-      await saveExamProgress(currentSession.sessionId, questionId, answer, elapsed);
+      await submitAnswer(currentSession.sessionId, questionId, answer, elapsed);
     } catch (err) {
       console.error('Error auto-saving progress:', err);
     }
@@ -230,57 +256,19 @@ export const ExamProvider = ({ children }) => {
         questions: [...questions], // Create a copy
         answers: { ...answers }, // Create a copy
         timeSpent: { ...finalTimeSpent }, // Use updated timeSpent
-        examId: currentSession.examId || null
+        examId: currentSession.examId || null,
+        sessionId: currentSession.sessionId
       };
 
-      // Save all attempts to attempts collection (don't let errors stop the process)
-      const saveAttemptsPromises = [];
-      for (const question of questions) {
-        const questionId = question.questionId;
-        const selectedAnswer = answers[questionId];
-        
-        if (selectedAnswer) {
-          const isCorrect = selectedAnswer === question.correctAnswer;
-          const time = finalTimeSpent[questionId] || 0;
-
-          // Don't await each one - save in parallel and continue even if some fail
-          saveAttemptsPromises.push(
-            saveAttempt({
-              questionId,
-              selectedAnswer,
-              timeSpent: time,
-              isCorrect,
-              examId: currentSession.examId || null,
-              mode: currentSession.mode,
-              subject: question.subject,
-              topic: question.topic || 'Unknown',
-              planDateKey: currentSession.planDateKey || currentSession.config?.planDateKey || null // Tag with plan date for daily isolation
-            }).catch(err => {
-              console.error(`Error saving attempt for question ${questionId}:`, err);
-            })
-          );
-        }
-      }
-
-      // Wait for all attempts to save (but don't fail if some errors occur)
+      // Save all attempts in one batch (don't let errors stop the process)
       try {
-        await Promise.all(saveAttemptsPromises);
+        await saveAttemptsBatch(buildSessionAttempts(currentSession, questions, answers, finalTimeSpent));
       } catch (err) {
         console.error('Some attempts failed to save:', err);
         // Continue anyway - we still have the examData
       }
 
-      // If this was a daily plan session, recompute daily plan stats and mark complete if needed
-      const planDateKey = currentSession.planDateKey || currentSession.config?.planDateKey;
-      if (planDateKey) {
-        try {
-          const { recomputeDailyPlanStats } = await import('../services/dailyPlanService');
-          await recomputeDailyPlanStats(planDateKey);
-        } catch (err) {
-          console.error('Error recomputing daily plan stats:', err);
-          // Continue anyway
-        }
-      }
+      // Daily plan counters are updated by the server as the attempts are saved
 
       // Mark session as complete (non-blocking)
       try {
@@ -361,40 +349,13 @@ export const ExamProvider = ({ children }) => {
         answers: { ...answers },
         timeSpent: { ...finalTimeSpent },
         examId: currentSession.examId || null,
+        sessionId: currentSession.sessionId,
         isPaused: true // Mark as paused
       };
 
-      // Save all attempts to attempts collection (up to current point)
-      const saveAttemptsPromises = [];
-      for (const question of answeredQuestions) {
-        const questionId = question.questionId;
-        const selectedAnswer = answers[questionId];
-        
-        if (selectedAnswer) {
-          const isCorrect = selectedAnswer === question.correctAnswer;
-          const time = finalTimeSpent[questionId] || 0;
-
-          saveAttemptsPromises.push(
-            saveAttempt({
-              questionId,
-              selectedAnswer,
-              timeSpent: time,
-              isCorrect,
-              examId: currentSession.examId || null,
-              mode: currentSession.mode,
-              subject: question.subject,
-              topic: question.topic || 'Unknown',
-              planDateKey: currentSession.planDateKey || currentSession.config?.planDateKey || null // Tag with plan date for daily isolation
-            }).catch(err => {
-              console.error(`Error saving attempt for question ${questionId}:`, err);
-            })
-          );
-        }
-      }
-
-      // Wait for all attempts to save
+      // Save all attempts up to the current point in one batch
       try {
-        await Promise.all(saveAttemptsPromises);
+        await saveAttemptsBatch(buildSessionAttempts(currentSession, answeredQuestions, answers, finalTimeSpent));
       } catch (err) {
         console.error('Some attempts failed to save:', err);
       }
@@ -171,6 +171,20 @@ export const calculateOverallTrend = async () => {
   }
 };
 
+/**
+ * Server-computed focus scores (weakness + priority boost), the weighted
+ * focus-subject candidates and the priority seeding order
+ * Uses API endpoint
+ */
+export const getFocusScores = async () => {
+  try {
+    return await get('/analytics/focus/');
+  } catch (error) {
+    console.error('Error fetching focus scores:', error);
+    return { scores: [], candidates: [], fallbackSubject: null, seedingOrder: [] };
+  }
+};
+
 /**
  * Identify weak topics across all subjects
  * Returns topics sorted by weakness (lowest accuracy first)
@@ -1,4 +1,17 @@
 import { get, post } from './apiClient';
+import { decodeIdList } from '../utils/idSets';
+
+let questionDictionary = null;
+
+/**
+ * Get the question ordinal dictionary (cached until its version changes)
+ */
+const getQuestionDictionary = async (version) => {
+  if (!questionDictionary || questionDictionary.version !== version) {
+    questionDictionary = await get('/questions/dictionary/');
+  }
+  return questionDictionary;
+};
 
 /**
  * Save an attempt (answer to a question)
@@ -17,6 +30,31 @@ export const saveAttempt = async (attemptData) => {
   }
 };
 
+const ATTEMPT_BATCH_LIMIT = 1000;
+
+/**
+ * Save many attempts in one request per ATTEMPT_BATCH_LIMIT items
+ * Every attempt must carry the idempotencyKey it was given when it was
+ * queued (and may carry its original timestamp), so re-sending the same
+ * items after a failure never creates duplicates.
+ */
+export const saveAttemptsBatch = async (attempts) => {
+  const unkeyed = attempts.filter((attempt) => !attempt.idempotencyKey);
+  if (unkeyed.length > 0) {
+    throw new Error(`${unkeyed.length} queued attempt(s) have no idempotencyKey`);
+  }
+  try {
+    const results = [];
+    for (let start = 0; start < attempts.length; start += ATTEMPT_BATCH_LIMIT) {
+      results.push(await post('/attempts/batch/', { attempts: attempts.slice(start, start + ATTEMPT_BATCH_LIMIT) }));
+    }
+    return results;
+  } catch (error) {
+    console.error('Error saving attempt batch:', error);
+    throw error;
+  }
+};
+
 /**
  * Get all attempts
  */
@@ -61,8 +99,12 @@ export const getAttemptsByTopic = async (subject, topic) => {
  */
 export const getAnsweredQuestionIds = async () => {
   try {
-    const answeredIds = await get('/attempts/answered_ids/');
-    return answeredIds;
+    const answeredIds = await get('/attempts/answered_ids/', { idset: 'compact' });
+    if (Array.isArray(answeredIds)) {
+      return answeredIds;
+    }
+    const dictionary = await getQuestionDictionary(answeredIds.dictionary);
+    return decodeIdList(answeredIds, dictionary);
   } catch (error) {
     console.error('Error fetching answered question IDs:', error);
     throw error;
@@ -1,189 +1,23 @@
 import { get, post, patch } from './apiClient';
-import { getQuestionsBySubject } from './questionService';
-import { getAllAttempts } from './attemptService';
-import { calculateSubjectStats } from './analyticsService';
-import { getRandomQuote } from '../utils/motivationalQuotes';
-import { getAnsweredQuestionIds } from './attemptService';
-import { getSubjectPriorities } from './subjectPriorityService';
+import { filterQuestionIdsBySeen } from './questionService';
+import { getQuoteCandidates } from '../utils/motivationalQuotes';
 
-const MAX_PLANNED_QUESTIONS = 35;
+const QUOTE_CANDIDATES = 20;
 
 /**
- * Deterministic shuffle using a seed (for consistent daily selection)
+ * Get or create the daily plan for dateKey
+ * The server selects the focus subject, shuffles the subject's questions with
+ * a seed derived from dateKey + subject, and avoids quotes used by recent plans.
+ * @param {string} dateKey - Ethiopian date key (YYYY-MM-DD)
+ * @param {string} fallbackSubject - used when no focus subject can be selected
  */
-function seededShuffle(array, seed) {
-  const shuffled = [...array];
-  let rng = seed;
-  for (let i = shuffled.length - 1; i > 0; i--) {
-    rng = (rng * 9301 + 49297) % 233280;
-    const j = Math.floor((rng / 233280) * (i + 1));
-    [shuffled[i], shuffled[j]] = [shuffled[j], shuffled[i]];
-  }
-  return shuffled;
-}
-
-/**
- * Generate a numeric seed from dateKey + subject
- */
-function getSeed(dateKey, subject) {
-  let hash = 0;
-  const str = `${dateKey}_${subject}`;
-  for (let i = 0; i < str.length; i++) {
-    const char = str.charCodeAt(i);
-    hash = ((hash << 5) - hash) + char;
-    hash = hash & hash;
-  }
-  return Math.abs(hash);
-}
-
-/**
- * Select focus subject using priorities and weakness scores
- * Top priority subjects get more consideration, but not always #1
- */
-export const selectFocusSubject = async () => {
-  try {
-    // Get subject priorities and stats
-    const [priorities, stats] = await Promise.all([
-      getSubjectPriorities().catch(() => []), // Fallback to empty if priorities don't exist
-      calculateSubjectStats()
-    ]);
-
-    // Filter out completed subjects
-    const completedSubjects = new Set(
-      priorities.filter(p => p.isCompleted).map(p => p.subject)
-    );
-
-    // Get active (non-completed) subjects with data
-    const activeSubjects = Object.values(stats).filter(
-      s => s && s.totalAttempted > 0 && !completedSubjects.has(s.subject)
-    );
-
-    // If no active subjects with data, use any non-completed subject
-    if (activeSubjects.length === 0) {
-      const allPriorities = priorities.length > 0 
-        ? priorities.sort((a, b) => a.priorityOrder - b.priorityOrder)
-        : [];
-      const firstActive = allPriorities.find(p => !p.isCompleted);
-      return firstActive ? firstActive.subject : null;
-    }
-
-    // Create a map of priority order for quick lookup
-    const priorityMap = {};
-    priorities.forEach(p => {
-      priorityMap[p.subject] = p.priorityOrder;
-    });
-
-    // Calculate weakness scores with priority weighting
-    // Top priority subjects (lower priority_order) get a boost
-    const subjectScores = activeSubjects.map(stat => {
-      const priorityOrder = priorityMap[stat.subject] ?? 999; // High number if not in priorities
-      const weaknessScore = (100 - (stat.accuracy || 0)) * Math.log1p(stat.totalAttempted);
-      
-      // Priority boost: subjects with lower priority_order get a boost
-      // But we still consider weakness score, so it's not always #1
-      const priorityBoost = (15 - priorityOrder) * 2; // Max boost of ~30 for top priority
-      const finalScore = weaknessScore + priorityBoost;
-      
-      return {
-        subject: stat.subject,
-        weaknessScore,
-        priorityOrder,
-        finalScore
-      };
-    });
-
-    // Sort by final score (higher = weaker + higher priority)
-    subjectScores.sort((a, b) => b.finalScore - a.finalScore);
-
-    // Use weighted random selection: top 3 subjects have higher chance
-    // This ensures top priority gets more consideration but not always #1
-    const topCandidates = subjectScores.slice(0, Math.min(3, subjectScores.length));
-    if (topCandidates.length > 0) {
-      // 60% chance for #1, 30% for #2, 10% for #3
-      const rand = Math.random();
-      if (rand < 0.6) {
-        return topCandidates[0].subject;
-      } else if (rand < 0.9 && topCandidates.length > 1) {
-        return topCandidates[1].subject;
-      } else if (topCandidates.length > 2) {
-        return topCandidates[2].subject;
-      }
-      return topCandidates[0].subject;
-    }
-
-    return subjectScores[0]?.subject || null;
-  } catch (error) {
-    console.error('Error selecting focus subject:', error);
-    // Fallback to old method
-    const stats = await calculateSubjectStats();
-    const subjectsWithData = Object.values(stats).filter(s => s && s.totalAttempted > 0);
-    if (subjectsWithData.length > 0) {
-      const weaknessScores = subjectsWithData.map(stat => ({
-        subject: stat.subject,
-        weaknessScore: (100 - (stat.accuracy || 0)) * Math.log1p(stat.totalAttempted),
-      }));
-      weaknessScores.sort((a, b) => b.weaknessScore - a.weaknessScore);
-      return weaknessScores[0].subject;
-    }
-    return null;
-  }
-};
-
-/**
- * Get or create today's daily plan (lazy initialization)
- */
-export const getOrCreateDailyPlan = async (dateKey, focusSubject) => {
+export const getOrCreateDailyPlan = async (dateKey, fallbackSubject = null) => {
   try {
-    // Try to get existing plan first
-    try {
-      const plan = await get(`/plans/${dateKey}/`);
-      return {
-        planId: plan.dateKey,
-        ...plan
-      };
-    } catch (error) {
-      // Plan doesn't exist, will create it below
-    }
-
-    // Create a new plan
-    if (!focusSubject) {
-      throw new Error('focusSubject is required to create a new daily plan');
-    }
-
-    // Get all questions for the subject
-    const allQuestions = await getQuestionsBySubject(focusSubject);
-    const totalAvailable = allQuestions.length;
-
-    // Select up to 35 questions deterministically
-    const seed = getSeed(dateKey, focusSubject);
-    const shuffled = seededShuffle(allQuestions, seed);
-    const selectedQuestions = shuffled.slice(0, Math.min(MAX_PLANNED_QUESTIONS, totalAvailable));
-    const questionIds = selectedQuestions.map(q => q.questionId);
-
-    // Get a random motivational quote (avoiding recent quotes if possible)
-    const recentPlans = await listRecentDailyPlans(14); // Get last 14 days
-    const recentQuotes = recentPlans
-      .map(plan => plan.motivationalQuote)
-      .filter(quote => quote && quote.trim().length > 0);
-    const motivationalQuote = getRandomQuote(recentQuotes);
-
-    const planData = {
+    const plan = await post('/plans/today/', {
       dateKey,
-      focusSubject,
-      totalAvailableInSubject: totalAvailable,
-      maxPlannedQuestions: MAX_PLANNED_QUESTIONS,
-      questionIds,
-      answeredCount: 0,
-      correctCount: 0,
-      wrongCount: 0,
-      accuracy: 0,
-      isComplete: false,
-      motivationalQuote
-    };
-
-    // Create plan - API will return existing if dateKey already exists
-    const plan = await post(`/plans/`, planData);
-
+      ...(fallbackSubject ? { fallbackSubject } : {}),
+      quoteCandidates: getQuoteCandidates(QUOTE_CANDIDATES)
+    });
     return {
       planId: plan.dateKey,
       ...plan
@@ -270,15 +104,12 @@ export const filterQuestionsByType = async (questionIds, filterType = 'all') =>
       return questionIds;
     }
     
-    const answeredIds = await getAnsweredQuestionIds();
-    const answeredSet = new Set(answeredIds);
-    
     if (filterType === 'answered') {
       // Only return questions that have been answered
-      return questionIds.filter(id => answeredSet.has(id));
+      return await filterQuestionIdsBySeen(questionIds, 'seen');
     } else if (filterType === 'never-seen') {
       // Only return questions that have never been answered
-      return questionIds.filter(id => !answeredSet.has(id));
+      return await filterQuestionIdsBySeen(questionIds, 'unseen');
     }
     
     return questionIds;
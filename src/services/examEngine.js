@@ -1,9 +1,11 @@
 import { get, post, patch, del } from './apiClient';
-import { getAllQuestions, getQuestionsBySubject, getQuestionsByTopic, getQuestionsByIds } from './questionService';
-import { getAnsweredQuestionIds } from './attemptService';
+import { getAllQuestions, getQuestionsBySubject, getQuestionsByTopic, getQuestionsByIds, getUnseenQuestionIds } from './questionService';
 import { getWeakTopics } from './analyticsService';
 import { EXAM_MODES, WEAK_AREA_PROBABILITIES, STATUS_THRESHOLDS } from '../utils/constants';
 
+// Sessions fetched for an exam's progress history (the server's maximum limit)
+const EXAM_SESSION_HISTORY_LIMIT = 100;
+
 /**
  * Shuffle array using Fisher-Yates algorithm
  */
@@ -16,6 +18,27 @@ const shuffleArray = (array) => {
   return shuffled;
 };
 
+/**
+ * Never-answered IDs among the subjects of the given questions, filtered on the server
+ */
+const getUnseenIdSetForSubjects = async (questions) => {
+  const subjects = [...new Set(questions.map((q) => q.subject).filter(Boolean))];
+  const idLists = await Promise.all(subjects.map((subject) => getUnseenQuestionIds(subject)));
+  return new Set(idLists.flat());
+};
+
+/**
+ * Never-answered IDs of an exam in exam order, optionally limited to a subject
+ */
+const getUnseenExamQuestionIds = async (examId, subject = null) => {
+  const params = { unseen: 'true' };
+  if (subject) {
+    params.subject = subject;
+  }
+  const { questionIds } = await get(`/exams/${examId}/question-ids/`, params);
+  return questionIds;
+};
+
 /**
  * Generate subject-only random exam
  */
@@ -30,9 +53,8 @@ export const generateSubjectExam = async (subject, excludeIds = [], questionCoun
     let available = questions.filter((q) => !excludeSet.has(q.questionId));
 
     if (!allowReattempts) {
-      const answeredIds = await getAnsweredQuestionIds();
-      const answeredSet = new Set(answeredIds);
-      available = available.filter((q) => !answeredSet.has(q.questionId));
+      const unseenSet = await getUnseenIdSetForSubjects(available);
+      available = available.filter((q) => unseenSet.has(q.questionId));
 
       if (available.length === 0) {
         available = questions.filter((q) => !excludeSet.has(q.questionId));
@@ -79,9 +101,10 @@ export const generateRandomExam = async (excludeIds = [], questionCount = 50, ex
     let available = allQuestions.filter((q) => !excludeSet.has(q.questionId));
 
     if (!allowReattempts) {
-      const answeredIds = await getAnsweredQuestionIds();
-      const answeredSet = new Set(answeredIds);
-      available = available.filter((q) => !answeredSet.has(q.questionId));
+      const unseenSet = new Set(examId
+        ? await getUnseenExamQuestionIds(examId)
+        : await getUnseenQuestionIds());
+      available = available.filter((q) => unseenSet.has(q.questionId));
 
       if (available.length === 0) {
         available = allQuestions.filter((q) => !excludeSet.has(q.questionId));
@@ -175,9 +198,8 @@ export const generateTopicFocusedExam = async (subject, topics, excludeIds = [],
     let available = questions.filter((q) => !excludeSet.has(q.questionId));
 
     if (!allowReattempts) {
-      const answeredIds = await getAnsweredQuestionIds();
-      const answeredSet = new Set(answeredIds);
-      available = available.filter((q) => !answeredSet.has(q.questionId));
+      const unseenSet = await getUnseenIdSetForSubjects(available);
+      available = available.filter((q) => unseenSet.has(q.questionId));
 
       if (available.length === 0) {
         available = questions.filter((q) => !excludeSet.has(q.questionId));
@@ -208,33 +230,23 @@ export const generateExamSubjectPractice = async (examId, subject, excludeIds =
       throw new Error('Subject is required for exam-specific subject practice');
     }
 
-    // Get exam and its questions
-    const { getExamById } = await import('./examService');
-    const exam = await getExamById(examId);
-    if (!exam.questionIds || exam.questionIds.length === 0) {
-      throw new Error('Exam has no questions');
-    }
-
-    // Load all exam questions
-    const allExamQuestions = await getQuestionsByIds(exam.questionIds);
+    // Subject members of the exam, in exam order (indexed join on the server)
+    const params = new URLSearchParams({ subject });
+    const { questionIds: subjectQuestionIds } = await get(`/exams/${examId}/question-ids/?${params.toString()}`);
     
-    // Filter by subject
-    const subjectQuestions = allExamQuestions.filter((q) => q.subject === subject);
-    
-    if (subjectQuestions.length === 0) {
+    if (subjectQuestionIds.length === 0) {
       throw new Error(`No questions found for subject "${subject}" in this exam.`);
     }
 
     const excludeSet = new Set(excludeIds);
-    let available = subjectQuestions.filter((q) => !excludeSet.has(q.questionId));
+    let available = subjectQuestionIds.filter((id) => !excludeSet.has(id));
 
     if (!allowReattempts) {
-      const answeredIds = await getAnsweredQuestionIds();
-      const answeredSet = new Set(answeredIds);
-      available = available.filter((q) => !answeredSet.has(q.questionId));
+      const unseenSet = new Set(await getUnseenExamQuestionIds(examId, subject));
+      available = available.filter((id) => unseenSet.has(id));
 
       if (available.length === 0) {
-        available = subjectQuestions.filter((q) => !excludeSet.has(q.questionId));
+        available = subjectQuestionIds.filter((id) => !excludeSet.has(id));
       }
     }
 
@@ -245,7 +257,7 @@ export const generateExamSubjectPractice = async (examId, subject, excludeIds =
     // If questionCount is not specified, use all available questions
     const targetCount = questionCount || available.length;
     const shuffled = shuffleArray(available);
-    return shuffled.slice(0, Math.min(targetCount, shuffled.length)).map((q) => q.questionId);
+    return shuffled.slice(0, Math.min(targetCount, shuffled.length));
   } catch (error) {
     console.error('Error generating exam-specific subject practice:', error);
     throw error;
@@ -354,23 +366,14 @@ export const createExamSession = async (mode, config = {}) => {
 
 /**
  * Save exam progress (auto-save on every interaction)
+ * The server merges the single answer into the session in one write
  */
 export const saveExamProgress = async (sessionId, questionId, answer, timeSpent) => {
   try {
-    const session = await get(`/sessions/${sessionId}/`);
-    
-    const updatedAnswers = {
-      ...session.answers,
-      [questionId]: answer
-    };
-    const updatedTimeSpent = {
-      ...session.timeSpent,
-      [questionId]: timeSpent
-    };
-
-    await patch(`/sessions/${sessionId}/progress/`, {
-      answers: updatedAnswers,
-      timeSpent: updatedTimeSpent
+    await patch(`/sessions/${sessionId}/delta/`, {
+      questionId,
+      answer,
+      timeSpent
     });
   } catch (error) {
     console.error('Error saving exam progress:', error);
@@ -378,6 +381,24 @@ export const saveExamProgress = async (sessionId, questionId, answer, timeSpent)
   }
 };
 
+/**
+ * Submit an answer in one round trip: the server grades it, records the
+ * attempt, merges session progress and updates the linked daily plan
+ */
+export const submitAnswer = async (sessionId, questionId, answer, timeSpent, currentIndex = null) => {
+  try {
+    return await post(`/sessions/${sessionId}/answer/`, {
+      questionId,
+      answer,
+      timeSpent,
+      ...(currentIndex !== null ? { currentIndex } : {})
+    });
+  } catch (error) {
+    console.error('Error submitting answer:', error);
+    throw error;
+  }
+};
+
 /**
  * Update current question index
  */
@@ -406,6 +427,18 @@ export const completeExamSession = async (sessionId) => {
   }
 };
 
+/**
+ * Get the results summary of a session (stored server-side once the session is complete)
+ */
+export const getSessionResults = async (sessionId) => {
+  try {
+    return await get(`/sessions/${sessionId}/results/`);
+  } catch (error) {
+    console.error('Error getting session results:', error);
+    throw error;
+  }
+};
+
 /**
  * Mark session as paused
  */
@@ -425,7 +458,8 @@ export const pauseExamSession = async (sessionId) => {
  */
 export const resumeExamSession = async (sessionId) => {
   try {
-    const session = await get(`/sessions/${sessionId}/`);
+    // Questions come inline so the exam screen needs no second request
+    const session = await get(`/sessions/${sessionId}/?expand=questions`);
     
     await patch(`/sessions/${sessionId}/progress/`, {
       isPaused: false
@@ -452,18 +486,17 @@ export const getIncompleteSessions = async () => {
 };
 
 /**
- * Get exam sessions for a specific exam ID
+ * Get the most recently updated sessions of an exam, newest first
+ * (sorted and limited server-side; the server caps limit at 100)
  */
-export const getExamSessions = async (examId) => {
+export const getExamSessions = async (examId, { summary = true, limit = EXAM_SESSION_HISTORY_LIMIT } = {}) => {
   try {
-    const allSessions = await get('/sessions/');
-    const sessions = Array.isArray(allSessions.results) ? allSessions.results : allSessions;
-    const filtered = sessions.filter(s => s.examId === examId);
-    return filtered.sort((a, b) => {
-      const aTime = new Date(a.lastUpdated || a.startedAt).getTime();
-      const bTime = new Date(b.lastUpdated || b.startedAt).getTime();
-        return bTime - aTime;
-      });
+    const params = { examId, ordering: '-last_updated', limit };
+    if (summary) {
+      params.view = 'summary';
+    }
+    const sessions = await get('/sessions/', params);
+    return Array.isArray(sessions) ? sessions : [];
   } catch (error) {
     console.error('Error fetching exam sessions:', error);
     return [];
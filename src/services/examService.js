@@ -2,10 +2,11 @@ import { get, post } from './apiClient';
 
 /**
  * Get all exams from API
+ * @param {Object} options - expand: 'summary' adds per-exam subject counts
  */
-export const getAllExams = async () => {
+export const getAllExams = async ({ expand } = {}) => {
   try {
-    const response = await get('/exams/');
+    const response = await get(expand ? `/exams/?expand=${expand}` : '/exams/');
     return response.results || response; // Handle pagination if present
   } catch (error) {
     console.error('Error fetching all exams:', error);
@@ -15,10 +16,11 @@ export const getAllExams = async () => {
 
 /**
  * Get a single exam by ID
+ * @param {Object} options - expand: 'questions' inlines the ordered questions, 'summary' adds subject counts
  */
-export const getExamById = async (examId) => {
+export const getExamById = async (examId, { expand } = {}) => {
   try {
-    const exam = await get(`/exams/${examId}/`);
+    const exam = await get(expand ? `/exams/${examId}/?expand=${expand}` : `/exams/${examId}/`);
     return exam;
   } catch (error) {
     console.error('Error fetching exam by ID:', error);
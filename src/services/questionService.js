@@ -103,15 +103,108 @@ export const getQuestionById = async (questionId) => {
   }
 };
 
+const MANIFEST_MAX_AGE_MS = 60 * 1000;
+
+let questionBank = null;
+let bundleManifest = null;
+
+/**
+ * Get the bundle manifest, reusing it for MANIFEST_MAX_AGE_MS
+ * (concurrent callers share one request)
+ */
+const getBundleManifest = () => {
+  const now = Date.now();
+  if (!bundleManifest || now - bundleManifest.fetchedAt > MANIFEST_MAX_AGE_MS) {
+    const request = get('/bundles/questions/manifest/');
+    bundleManifest = { fetchedAt: now, request };
+    request.catch(() => {
+      if (bundleManifest && bundleManifest.request === request) {
+        bundleManifest = null;
+      }
+    });
+  }
+  return bundleManifest.request;
+};
+
 /**
- * Get multiple questions by IDs
+ * Load the whole question bank from its content-addressed bundle
+ * The manifest is revalidated at most once a minute; the bundle itself is
+ * immutable and only downloaded again when its hash changes. Questions added
+ * in between are picked up by the bulk fallback in getQuestionsByIds.
+ */
+export const getQuestionBank = async () => {
+  const manifest = await getBundleManifest();
+  if (!questionBank || questionBank.hash !== manifest.bank.hash) {
+    const questions = await get(manifest.bank.path);
+    questionBank = {
+      hash: manifest.bank.hash,
+      byId: new Map(questions.map((q) => [q.questionId, q]))
+    };
+  }
+  return questionBank.byId;
+};
+
+/**
+ * Get multiple questions by IDs (in the requested order)
  */
 export const getQuestionsByIds = async (questionIds) => {
   try {
-    const response = await post('/questions/bulk/', { questionIds });
-    return response;
+    let bank = null;
+    try {
+      bank = await getQuestionBank();
+    } catch (error) {
+      console.error('Error loading question bank bundle, falling back to bulk fetch:', error);
+    }
+    if (!bank) {
+      return await post('/questions/bulk/', { questionIds });
+    }
+
+    const missingIds = questionIds.filter((id) => !bank.has(id));
+    const fetched = new Map();
+    if (missingIds.length > 0) {
+      const missing = await post('/questions/bulk/', { questionIds: missingIds });
+      missing.forEach((q) => fetched.set(q.questionId, q));
+    }
+    return questionIds
+      .map((id) => bank.get(id) || fetched.get(id))
+      .filter(Boolean);
   } catch (error) {
     console.error('Error fetching questions by IDs:', error);
     throw error;
   }
 };
+
+/**
+ * Get the IDs of never-answered questions, optionally within a subject
+ * (NOT EXISTS filter on the server; no question or attempt lists are transferred)
+ */
+export const getUnseenQuestionIds = async (subject = null) => {
+  try {
+    const params = { unseen: 'true', idsOnly: 'true' };
+    if (subject) {
+      params.subject = subject;
+    }
+    return await get('/questions/', params);
+  } catch (error) {
+    console.error('Error fetching unseen question IDs:', error);
+    throw error;
+  }
+};
+
+/**
+ * Filter question IDs by answer history on the server ('seen' | 'unseen')
+ * Returns the matching IDs in the order they were passed in
+ */
+export const filterQuestionIdsBySeen = async (questionIds, seenFilter = 'unseen') => {
+  try {
+    if (!questionIds || questionIds.length === 0) {
+      return [];
+    }
+    const matchingIds = await post(`/questions/bulk/?${seenFilter}=true&idsOnly=true`, { questionIds });
+    const matchingSet = new Set(matchingIds);
+    return questionIds.filter((id) => matchingSet.has(id));
+  } catch (error) {
+    console.error('Error filtering question IDs by seen status:', error);
+    throw error;
+  }
+};
@@ -0,0 +1,76 @@
+/**
+ * Compact ID set decoding
+ * Mirrors backend/api/idsets.py: ID lists are sent as ordinals into the
+ * question dictionary (/questions/dictionary/), delta-varint or bitmap encoded
+ */
+
+function base64ToBytes(data) {
+  const binary = atob(data);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+function readVarints(bytes) {
+  const values = [];
+  let value = 0;
+  let multiplier = 1;
+  for (const byte of bytes) {
+    value += (byte & 0x7f) * multiplier;
+    if (byte & 0x80) {
+      multiplier *= 128;
+    } else {
+      values.push(value);
+      value = 0;
+      multiplier = 1;
+    }
+  }
+  return values;
+}
+
+function decodeOrdinals(payload) {
+  const bytes = base64ToBytes(payload.data);
+
+  if (payload.encoding === 'bitmap') {
+    const ordinals = [];
+    bytes.forEach((byte, idx) => {
+      for (let bit = 0; bit < 8; bit++) {
+        if (byte & (1 << bit)) {
+          ordinals.push(idx * 8 + bit);
+        }
+      }
+    });
+    return ordinals;
+  }
+
+  const zigzag = payload.encoding === 'zigzag-delta-varint';
+  const ordinals = [];
+  let previous = 0;
+  for (let delta of readVarints(bytes)) {
+    if (zigzag) {
+      delta = delta % 2 === 0 ? delta / 2 : -(delta + 1) / 2;
+    }
+    previous += delta;
+    ordinals.push(previous);
+  }
+  return ordinals;
+}
+
+/**
+ * Decode an ID list payload using the question dictionary
+ * Plain arrays (IDs outside the dictionary) are returned unchanged
+ * @param {Array|Object} payload - Plain ID array or compact payload
+ * @param {{version: string, questionIds: string[]}} dictionary
+ * @returns {string[]} Question IDs
+ */
+export function decodeIdList(payload, dictionary) {
+  if (Array.isArray(payload)) {
+    return payload;
+  }
+  if (!dictionary || payload.dictionary !== dictionary.version) {
+    throw new Error('ID set was encoded against a different question dictionary');
+  }
+  return decodeOrdinals(payload).map((ordinal) => dictionary.questionIds[ordinal]);
+}
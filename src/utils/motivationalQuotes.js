@@ -1,159 +1,11 @@
+import QUOTE_GROUPS from '../../data/motivationalQuotes.json';
+
 /**
  * Curated collection of powerful motivational quotes focused on consistency, success, planning, and emotional drive
  * Quotes from famous speeches and leaders that push you to work harder and be better
+ * Grouped by theme in data/motivationalQuotes.json, which the backend reads too
  */
-
-export const MOTIVATIONAL_QUOTES = [
-  // Consistency & Daily Action
-  "A fool with a plan can beat a genius without a plan. Every single time.",
-  "Success is the sum of small efforts repeated day in and day out. - Robert Collier",
-  "The secret of your future is hidden in your daily routine. - Mike Murdock",
-  "We are what we repeatedly do. Excellence, then, is not an act, but a habit. - Aristotle",
-  "Small daily improvements are the key to staggering long-term results. - John Maxwell",
-  "Consistency is the mother of mastery. Show up every single day.",
-  "The difference between ordinary and extraordinary is that little extra. - Jimmy Johnson",
-  "It does not matter how slowly you go as long as you do not stop. - Confucius",
-  "Continuous improvement is better than delayed perfection. - Mark Twain",
-  "The journey of a thousand miles begins with one step. - Lao Tzu",
-  "Don't watch the clock; do what it does. Keep going. - Sam Levenson",
-  "The only way to do great work is to love what you do. - Steve Jobs",
-  "Success is walking from failure to failure with no loss of enthusiasm. - Winston Churchill",
-  "I have not failed. I've just found 10,000 ways that won't work. - Thomas Edison",
-  "Our greatest weakness lies in giving up. The most certain way to succeed is always to try just one more time. - Thomas Edison",
-  
-  // Planning & Strategy
-  "Give me six hours to chop down a tree and I will spend the first four sharpening the axe. - Abraham Lincoln",
-  "By failing to prepare, you are preparing to fail. - Benjamin Franklin",
-  "A goal without a plan is just a wish. - Antoine de Saint-Exupéry",
-  "Plans are worthless, but planning is everything. - Dwight D. Eisenhower",
-  "The best time to plant a tree was 20 years ago. The second best time is now. - Chinese Proverb",
-  "If you fail to plan, you are planning to fail. - Benjamin Franklin",
-  "Strategy without tactics is the slowest route to victory. Tactics without strategy is the noise before defeat. - Sun Tzu",
-  "A plan is what, a schedule is when. It takes both a plan and a schedule to get things done. - Tom Gilb",
-  
-  // Hard Work & Persistence
-  "Hard work beats talent when talent doesn't work hard. - Tim Notke",
-  "The only place where success comes before work is in the dictionary. - Vidal Sassoon",
-  "I attribute my success to this: I never gave or took any excuse. - Florence Nightingale",
-  "The successful warrior is the average man with laser-like focus. - Bruce Lee",
-  "Push yourself, because no one else is going to do it for you.",
-  "Don't stop when you're tired. Stop when you're done.",
-  "Wake up with determination. Go to bed with satisfaction.",
-  "The harder you work for something, the greater you'll feel when you achieve it.",
-  "It's going to be hard, but hard does not mean impossible.",
-  "Don't wait for opportunity. Create it.",
-  "Sometimes we're tested not to show our weaknesses, but to discover our strengths.",
-  "The key to success is to focus on goals, not obstacles.",
-  "If the plan doesn't work, change the plan, but never the goal.",
-  
-  // Famous Speeches & Emotional Drive
-  "I have a dream that one day this nation will rise up and live out the true meaning of its creed. - Martin Luther King Jr.",
-  "We choose to go to the moon in this decade and do the other things, not because they are easy, but because they are hard. - John F. Kennedy",
-  "Ask not what your country can do for you—ask what you can do for your country. - John F. Kennedy",
-  "The only thing we have to fear is fear itself. - Franklin D. Roosevelt",
-  "We shall fight on the beaches, we shall fight on the landing grounds, we shall fight in the fields and in the streets. We shall never surrender. - Winston Churchill",
-  "I came, I saw, I conquered. - Julius Caesar",
-  "The only impossible journey is the one you never begin. - Tony Robbins",
-  "You miss 100% of the shots you don't take. - Wayne Gretzky",
-  "It always seems impossible until it's done. - Nelson Mandela",
-  "I never lose. Either I win or I learn. - Nelson Mandela",
-  "The future belongs to those who believe in the beauty of their dreams. - Eleanor Roosevelt",
-  "Believe you can and you're halfway there. - Theodore Roosevelt",
-  
-  // Self-Improvement & Growth
-  "The expert in anything was once a beginner. - Helen Hayes",
-  "You don't have to be great to start, but you have to start to be great. - Zig Ziglar",
-  "The only person you are destined to become is the person you decide to be. - Ralph Waldo Emerson",
-  "What lies behind us and what lies before us are tiny matters compared to what lies within us. - Ralph Waldo Emerson",
-  "The mind is everything. What you think you become. - Buddha",
-  "Whether you think you can or think you can't, you're right. - Henry Ford",
-  "I am not a product of my circumstances. I am a product of my decisions. - Stephen Covey",
-  "The two most important days in your life are the day you are born and the day you find out why. - Mark Twain",
-  "Your limitation—it's only your imagination.",
-  "Great things never come from comfort zones.",
-  "Dream bigger. Do bigger.",
-  "Do something today that your future self will thank you for.",
-  "Little things make big things happen.",
-  
-  // Action & Execution
-  "The way to get started is to quit talking and begin doing. - Walt Disney",
-  "All our dreams can come true, if we have the courage to pursue them. - Walt Disney",
-  "If you can dream it, you can do it. - Walt Disney",
-  "The future depends on what you do today. - Mahatma Gandhi",
-  "Start where you are. Use what you have. Do what you can. - Arthur Ashe",
-  "Don't let yesterday take up too much of today. - Will Rogers",
-  "You learn more from failure than from success. Don't let it stop you. Failure builds character. - Unknown",
-  "If you are working on something exciting that you really care about, you don't have to be pushed. The vision pulls you. - Steve Jobs",
-  "We generate fears while we sit. We overcome them by action. - Dr. Henry Link",
-  "Go confidently in the direction of your dreams. Live the life you have imagined. - Henry David Thoreau",
-  "Challenges are what make life interesting and overcoming them is what makes life meaningful. - Joshua J. Marine",
-  "To live is the rarest thing in the world. Most people just exist. - Oscar Wilde",
-  "Either you run the day, or the day runs you. - Jim Rohn",
-  "I have been impressed with the urgency of doing. Knowing is not enough; we must apply. Being willing is not enough; we must do. - Leonardo da Vinci",
-  "Limitations live only in our minds. But if we use our imaginations, our possibilities become limitless. - Jamie Paolinetti",
-  
-  // Excellence & Mastery
-  "Excellence is not a skill, it's an attitude. - Ralph Marston",
-  "The difference between ordinary and extraordinary is that little extra. - Jimmy Johnson",
-  "Excellence is never an accident. It is always the result of high intention, sincere effort, and intelligent execution. - Aristotle",
-  "Mediocrity is a disease. Excellence is a habit. Choose your habit wisely.",
-  "The only way to do great work is to love what you do. - Steve Jobs",
-  "Innovation distinguishes between a leader and a follower. - Steve Jobs",
-  "Stay hungry. Stay foolish. - Steve Jobs",
-  "Your time is limited, so don't waste it living someone else's life. - Steve Jobs",
-  "People who are crazy enough to think they can change the world, are the ones who do. - Rob Siltanen",
-  "The future belongs to those who learn more skills and combine them in creative ways. - Robert Greene",
-  
-  // Determination & Willpower
-  "Failure will never overtake me if my determination to succeed is strong enough. - Og Mandino",
-  "We may encounter many defeats but we must not be defeated. - Maya Angelou",
-  "Knowing is not enough; we must apply. Wishing is not enough; we must do. - Johann Wolfgang von Goethe",
-  "The person who says it cannot be done should not interrupt the person who is doing it. - Chinese Proverb",
-  "There are no traffic jams along the extra mile. - Roger Staubach",
-  "If you are not willing to risk the usual, you will have to settle for the ordinary. - Jim Rohn",
-  "Take up one idea. Make that one idea your life. Think of it, dream of it, live on that idea. - Swami Vivekananda",
-  "A person who never made a mistake never tried anything new. - Albert Einstein",
-  "In the middle of difficulty lies opportunity. - Albert Einstein",
-  "It is never too late to be what you might have been. - George Eliot",
-  "You become what you believe. - Oprah Winfrey",
-  "I would rather die of passion than of boredom. - Vincent van Gogh",
-  "Build your own dreams, or someone else will hire you to build theirs. - Farrah Gray",
-  "The battles that count aren't the ones for gold medals. The struggles within yourself—the invisible, inevitable battles inside all of us—that's where it's at. - Jesse Owens",
-  "The most difficult thing is the decision to act, the rest is merely tenacity. - Amelia Earhart",
-  "It is during our darkest moments that we must focus to see the light. - Aristotle Onassis",
-  
-  // Education & Learning
-  "Education is the most powerful weapon which you can use to change the world. - Nelson Mandela",
-  "The beautiful thing about learning is that no one can take it away from you. - B.B. King",
-  "Live as if you were to die tomorrow. Learn as if you were to live forever. - Mahatma Gandhi",
-  "The capacity to learn is a gift; the ability to learn is a skill; the willingness to learn is a choice. - Brian Herbert",
-  "Learning never exhausts the mind. - Leonardo da Vinci",
-  "The more that you read, the more things you will know. The more that you learn, the more places you'll go. - Dr. Seuss",
-  "An investment in knowledge pays the best interest. - Benjamin Franklin",
-  "Education costs money. But then so does ignorance. - Sir Claus Moser",
-  "You have to learn the rules of the game. And then you have to play better than anyone else. - Albert Einstein",
-  
-  // Motivation & Inspiration
-  "People often say that motivation doesn't last. Well, neither does bathing. That's why we recommend it daily. - Zig Ziglar",
-  "We become what we think about. - Earl Nightingale",
-  "The most common way people give up their power is by thinking they don't have any. - Alice Walker",
-  "If you want to lift yourself up, lift up someone else. - Booker T. Washington",
-  "Life is not measured by the number of breaths we take, but by the moments that take our breath away. - Maya Angelou",
-  "I've learned that people will forget what you said, people will forget what you did, but people will never forget how you made them feel. - Maya Angelou",
-  "When I stand before God at the end of my life, I would hope that I would not have a single bit of talent left and could say, I used everything you gave me. - Erma Bombeck",
-  "Few things can help an individual more than to place responsibility on him, and to let him know that you trust him. - Booker T. Washington",
-  "You can never cross the ocean until you have the courage to lose sight of the shore. - Christopher Columbus",
-  "Whatever you can do, or dream you can, begin it. Boldness has genius, power and magic in it. - Johann Wolfgang von Goethe",
-  "The best revenge is massive success. - Frank Sinatra",
-  "Life is what happens to you while you're busy making other plans. - John Lennon",
-  "An unexamined life is not worth living. - Socrates",
-  "Eighty percent of success is showing up. - Woody Allen",
-  "Winning isn't everything, but wanting to win is. - Vince Lombardi",
-  "Every child is an artist. The problem is how to remain an artist once we grow up. - Pablo Picasso",
-  "What's money? A man is a success if he gets up in the morning and goes to bed at night and in between does what he wants to do. - Bob Dylan",
-  "I didn't fail the test. I just found 100 ways to do it wrong. - Benjamin Franklin",
-  "In order to succeed, your desire for success should be greater than your fear of failure. - Bill Cosby"
-];
+export const MOTIVATIONAL_QUOTES = Object.values(QUOTE_GROUPS).flat();
 
 /**
  * Energetic bonus challenge quotes - 100% pushing and energetic
@@ -267,6 +119,21 @@ export const getRandomBonusQuote = (excludeQuotes = []) => {
   return quotesToUse[randomIndex];
 };
 
+/**
+ * Get a random sample of motivational quotes
+ * Sent with daily plan creation so the server can skip recently used quotes
+ * @param {number} count - Number of quotes to sample
+ * @returns {string[]} Distinct quotes in random order
+ */
+export const getQuoteCandidates = (count = 20) => {
+  const quotes = [...MOTIVATIONAL_QUOTES];
+  for (let i = quotes.length - 1; i > 0; i--) {
+    const j = Math.floor(Math.random() * (i + 1));
+    [quotes[i], quotes[j]] = [quotes[j], quotes[i]];
+  }
+  return quotes.slice(0, count);
+};
+
 /**
  * Get a random quote from the collection
  * @param {string[]} excludeQuotes - Quotes to exclude (recently used)